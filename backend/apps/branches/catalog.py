@@ -0,0 +1,81 @@
+"""
+Catálogo compacto de una sucursal para el punto de venta.
+
+Reúne en una sola respuesta lo que una terminal necesita para vender: productos
+activos de la sucursal, métodos de pago activos y vendedores asignados. Cada
+sección va en columnas (`fields`) y filas (`rows`) para no repetir las llaves
+en cada registro.
+
+Los clientes no van en el catálogo: crecen con cada venta y el bundle pesaría
+lo mismo que la cartera completa. El punto de venta los busca por prefijo con
+/clients/autocomplete/.
+
+La versión del catálogo sale de los sellos de cambios (apps.core.change_stamps)
+de los modelos que incluye, así que cualquier escritura que lo afecte genera
+una versión nueva. Cada versión se arma una sola vez y se guarda en la caché.
+"""
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from apps.core.change_stamps import get_change_stamps
+from apps.payments.models import PaymentMethod
+from apps.products.models import Product
+from apps.sellers.models import Seller
+from .models import Branch
+
+CATALOG_MODELS = (Branch, Product, PaymentMethod, Seller)
+
+PRODUCT_FIELDS = ('id', 'name', 'price', 'category', 'sku', 'barcode')
+PAYMENT_METHOD_FIELDS = ('id', 'name', 'commission_percentage')
+SELLER_FIELDS = ('id', 'name', 'numeric_code')
+
+
+def catalog_version(branch):
+    """Versión del catálogo de la sucursal: cambia con cualquier escritura que lo afecte."""
+    return branch_catalog_version(branch.organization_id, branch.id)
+
+
+def branch_catalog_version(organization_id, branch_id):
+    """catalog_version sin cargar la sucursal: una sola consulta a change_stamps."""
+    stamps = get_change_stamps(organization_id, CATALOG_MODELS)
+    raw = ':'.join([str(branch_id), *(f'{label}={version}' for label, (version, _) in stamps.items())])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def catalog_key(branch, version):
+    return f'branch-catalog:{branch.id}:{version}'
+
+
+def rows(queryset, fields):
+    return {'fields': list(fields), 'rows': [list(row) for row in queryset.values_list(*fields)]}
+
+
+def build_catalog(branch, version):
+    organization_id = branch.organization_id
+    return {
+        'version': version,
+        'branch': {'id': branch.id, 'name': branch.name, 'code': branch.code},
+        'products': rows(
+            Product.objects.filter(organization_id=organization_id, active=True, branches=branch)
+            .order_by('category', 'name'),
+            PRODUCT_FIELDS
+        ),
+        'payment_methods': rows(
+            PaymentMethod.objects.filter(organization_id=organization_id, active=True).order_by('name'),
+            PAYMENT_METHOD_FIELDS
+        ),
+        'sellers': rows(
+            branch.sellers.filter(active=True).order_by('name'),
+            SELLER_FIELDS
+        ),
+    }
+
+
+def get_catalog(branch, version):
+    """Catálogo de la versión indicada, desde la caché o armado y guardado."""
+    key = catalog_key(branch, version)
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build_catalog(branch, version)
+        cache.set(key, catalog, settings.BRANCH_CATALOG_CACHE_TTL)
+    return catalog
@@ -2,9 +2,13 @@
 Comando para crear sucursales por defecto y migrar datos existentes.
 """
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
 from apps.organizations.models import Organization
 from apps.branches.models import Branch
 from apps.sales.models import Sale
+from apps.core.change_stamps import bump_change_stamps
+from apps.sales.rollups import rebuild_sales_rollup
 from apps.products.models import Product
 from apps.sellers.models import Seller
 
@@ -49,7 +53,13 @@ class Command(BaseCommand):
             sales_updated = Sale.objects.filter(
                 organization=org,
                 branch__isnull=True
-            ).update(branch=branch)
+            ).update(branch=branch, updated_at=timezone.now())
             self.stdout.write(f'  ✓ {sales_updated} ventas asignadas')
+            
+            # Las ventas cambiaron de sucursal; recalcular su resumen diario
+            if sales_updated:
+                bump_change_stamps(org.id, Sale)
+                with transaction.atomic():
+                    rebuild_sales_rollup(org.id)
         
         self.stdout.write(self.style.SUCCESS(f'\n✅ Proceso completado para {organizations.count()} organizaciones'))
@@ -1,11 +1,21 @@
 from rest_framework import serializers
+from django.db.models import OuterRef, Prefetch
+from apps.core.eager_loading import EagerLoadingMixin, SubqueryCount
+from apps.products.models import Product
+from apps.sellers.models import Seller
 from .models import Branch
 
 
-class BranchSerializer(serializers.ModelSerializer):
+class BranchSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     seller_count = serializers.SerializerMethodField()
     product_count = serializers.SerializerMethodField()
     
+    # Solo se necesitan los IDs para los campos sellers/products
+    prefetch_related_fields = (
+        Prefetch('sellers', queryset=Seller.objects.only('id')),
+        Prefetch('products', queryset=Product.objects.only('id')),
+    )
+    
     class Meta:
         model = Branch
         fields = [
@@ -16,17 +26,27 @@ class BranchSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_seller_count(self, obj):
-        return obj.sellers.count()
+        return len(obj.sellers.all())
     
     def get_product_count(self, obj):
-        return obj.products.count()
+        return len(obj.products.all())
 
 
-class BranchListSerializer(serializers.ModelSerializer):
+class BranchListSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer simplificado para listados"""
     seller_count = serializers.SerializerMethodField()
     product_count = serializers.SerializerMethodField()
     
+    # Conteos como subconsultas para no traer las relaciones completas
+    annotation_fields = {
+        'seller_total': SubqueryCount(
+            Branch.sellers.through.objects.filter(branch_id=OuterRef('pk')).values('pk')
+        ),
+        'product_total': SubqueryCount(
+            Branch.products.through.objects.filter(branch_id=OuterRef('pk')).values('pk')
+        ),
+    }
+    
     class Meta:
         model = Branch
         fields = [
@@ -35,7 +55,7 @@ class BranchListSerializer(serializers.ModelSerializer):
         ]
     
     def get_seller_count(self, obj):
-        return obj.sellers.count()
+        return obj.seller_total
     
     def get_product_count(self, obj):
-        return obj.products.count()
+        return obj.product_total
@@ -1,10 +1,20 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from django.utils.cache import patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.change_stamps import ConditionalGetMixin, is_not_modified
+from apps.core.eager_loading import EagerLoadingViewSetMixin
+from apps.core.sync import ChangeFeedMixin
+from apps.products.models import Product
+from apps.sellers.models import Seller
+from .catalog import catalog_version, get_catalog
 from .models import Branch
 from .serializers import BranchSerializer, BranchListSerializer
 
 
-class BranchViewSet(viewsets.ModelViewSet):
+class BranchViewSet(ConditionalGetMixin, ChangeFeedMixin, EagerLoadingViewSetMixin, viewsets.ModelViewSet):
     serializer_class = BranchSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -12,9 +22,11 @@ class BranchViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'code', 'address']
     ordering_fields = ['name', 'code', 'created_at']
     ordering = ['name']
+    # Los conteos de vendedores y productos cambian al borrarlos
+    change_stamp_models = (Branch, Seller, Product)
     
     def get_queryset(self):
-        queryset = Branch.objects.all().prefetch_related('sellers', 'products')
+        queryset = Branch.objects.all()
         
         if self.request.user.is_authenticated and hasattr(self.request.user, 'organization'):
             queryset = queryset.filter(organization=self.request.user.organization)
@@ -35,3 +47,22 @@ class BranchViewSet(viewsets.ModelViewSet):
             serializer.save(organization=self.request.user.organization)
         else:
             serializer.save()
+    
+    @action(detail=True, methods=['get'])
+    def catalog(self, request, pk=None):
+        """
+        Catálogo del punto de venta para la sucursal (ver apps.branches.catalog).
+        Con If-None-Match de la versión actual responde 304.
+        """
+        # Sin la carga anticipada del serializer de detalle
+        branch = get_object_or_404(self.get_queryset(), pk=pk)
+        version = catalog_version(branch)
+        etag = f'W/"{version}"'
+        
+        if is_not_modified(request, etag, None):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(get_catalog(branch, version))
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,104 @@
+"""
+Autocompletado de clientes por prefijo para el punto de venta.
+
+Los candidatos salen de índices por (organización, nombre plegado) y
+(organización, referencia plegada) con COLLATE "C" (migración clients 0003),
+que resuelven `LIKE 'prefijo%'` leyendo solo las primeras filas en orden, más
+los clientes que coinciden entre las últimas ventas del vendedor. El texto se
+pliega con vnts_search_fold (minúsculas y sin acentos), igual que la búsqueda
+de apps.core.search.
+
+El orden favorece a los clientes que el vendedor atiende seguido y hace poco:
+cada una de sus últimas SELLER_HISTORY_SALES ventas suma
+1 / (1 + días / RECENCY_DAYS) al cliente. Los demás quedan después, por nombre.
+Todo se resuelve en una sola consulta.
+"""
+from django.db import connection
+from apps.core.search import fold_search_text
+from apps.sales.models import Sale
+from .models import Client
+
+AUTOCOMPLETE_LIMIT = 10
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+# Ventas más recientes del vendedor que cuentan para el orden (índice
+# seller, -created_at); los clientes se filtran por organización
+SELLER_HISTORY_SALES = 500
+
+# A los RECENCY_DAYS días una compra pesa la mitad
+RECENCY_DAYS = 30
+
+AUTOCOMPLETE_SQL = """
+    WITH recent AS (
+        SELECT client_id, created_at
+        FROM {sales}
+        WHERE seller_id = %(seller_id)s
+        ORDER BY created_at DESC
+        LIMIT %(history)s
+    ), history AS (
+        SELECT client_id,
+               COUNT(*) AS purchases,
+               MAX(created_at) AS last_purchase,
+               SUM(1 / (1 + EXTRACT(EPOCH FROM NOW() - created_at) / 86400 / %(recency_days)s)) AS score
+        FROM recent
+        GROUP BY client_id
+    ), candidates AS (
+        (SELECT id FROM {clients}
+         WHERE organization_id = %(organization_id)s AND vnts_search_fold(name) COLLATE "C" LIKE %(pattern)s
+         ORDER BY vnts_search_fold(name) COLLATE "C"
+         LIMIT %(limit)s)
+        UNION
+        (SELECT id FROM {clients}
+         WHERE organization_id = %(organization_id)s AND vnts_search_fold(reference) COLLATE "C" LIKE %(pattern)s
+         ORDER BY vnts_search_fold(reference) COLLATE "C"
+         LIMIT %(limit)s)
+        UNION
+        SELECT c.id
+        FROM history h JOIN {clients} c ON c.id = h.client_id
+        WHERE c.organization_id = %(organization_id)s
+          AND (vnts_search_fold(c.name) LIKE %(pattern)s OR vnts_search_fold(c.reference) LIKE %(pattern)s)
+    )
+    SELECT c.id, c.name, c.reference,
+           COALESCE(h.purchases, 0), h.last_purchase, COALESCE(h.score, 0)::float AS score
+    FROM candidates
+    JOIN {clients} c ON c.id = candidates.id
+    LEFT JOIN history h ON h.client_id = c.id
+    ORDER BY score DESC, vnts_search_fold(c.name) COLLATE "C", c.id
+    LIMIT %(limit)s
+""".format(sales=Sale._meta.db_table, clients=Client._meta.db_table)
+
+
+def like_prefix(text):
+    """Patrón LIKE 'texto%' con los comodines del texto escapados."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def autocomplete_clients(organization_id, prefix, seller_id=None, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Hasta `limit` clientes de la organización cuyo nombre o referencia empieza
+    con `prefix`. Sin prefijo: los clientes frecuentes del vendedor y después
+    los primeros por nombre.
+    """
+    params = {
+        'organization_id': organization_id,
+        'seller_id': seller_id,
+        'pattern': like_prefix(fold_search_text(prefix.strip())),
+        'history': SELLER_HISTORY_SALES,
+        'recency_days': RECENCY_DAYS,
+        'limit': limit,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(AUTOCOMPLETE_SQL, params)
+        rows = cursor.fetchall()
+
+    return [
+        {
+            'id': client_id,
+            'name': name,
+            'reference': reference,
+            'seller_purchases': purchases,
+            'seller_last_purchase': last_purchase,
+            'score': round(score, 4),
+        }
+        for client_id, name, reference, purchases, last_purchase, score in rows
+    ]
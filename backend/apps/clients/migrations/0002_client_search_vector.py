@@ -0,0 +1,67 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_TRIGGER = """
+    CREATE FUNCTION clients_search_vector_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('spanish', vnts_search_fold(coalesce(NEW.name, ''))), 'A') ||
+            setweight(to_tsvector('simple', vnts_search_fold(coalesce(NEW.reference, ''))), 'A');
+        RETURN NEW;
+    END
+    $$;
+
+    CREATE TRIGGER clients_search_vector_update
+    BEFORE INSERT OR UPDATE ON clients
+    FOR EACH ROW EXECUTE FUNCTION clients_search_vector_update();
+
+    UPDATE clients SET search_vector = NULL;
+"""
+
+DROP_TRIGGER = """
+    DROP TRIGGER IF EXISTS clients_search_vector_update ON clients;
+    DROP FUNCTION IF EXISTS clients_search_vector_update();
+"""
+
+
+def create_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS clients_name_trgm '
+                'ON clients USING gin (vnts_search_fold(name) gin_trgm_ops)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS clients_reference_trgm '
+                'ON clients USING gin (vnts_search_fold(reference) gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    schema_editor.execute('DROP INDEX IF EXISTS clients_name_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS clients_reference_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_search_fold'),
+        ('clients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='clients_search_vector_gin'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
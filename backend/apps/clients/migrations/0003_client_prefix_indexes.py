@@ -0,0 +1,29 @@
+from django.db import migrations
+
+# Autocompletado por prefijo (apps.clients.autocomplete) sobre el texto plegado,
+# dentro de la organización. Con COLLATE "C" el índice resuelve LIKE 'prefijo%'
+# como text_pattern_ops y además entrega las filas en el orden del ORDER BY,
+# así que el LIMIT se detiene en las primeras.
+CREATE_INDEXES = """
+    CREATE INDEX clients_org_name_prefix
+    ON clients (organization_id, (vnts_search_fold(name) COLLATE "C"));
+
+    CREATE INDEX clients_org_reference_prefix
+    ON clients (organization_id, (vnts_search_fold(reference) COLLATE "C"));
+"""
+
+DROP_INDEXES = """
+    DROP INDEX IF EXISTS clients_org_name_prefix;
+    DROP INDEX IF EXISTS clients_org_reference_prefix;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEXES, DROP_INDEXES),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from apps.core.models import UUIDModel, TenantModel
 
@@ -5,6 +7,8 @@ from apps.core.models import UUIDModel, TenantModel
 class Client(UUIDModel, TenantModel):
     name = models.CharField(max_length=255, verbose_name='Nombre')
     reference = models.CharField(max_length=100, blank=True, verbose_name='Referencia')
+    # Nombre y referencia sin acentos; lo mantiene un trigger (apps.core.search)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         db_table = 'clients'
@@ -13,6 +17,7 @@ class Client(UUIDModel, TenantModel):
         ordering = ['name']
         indexes = [
             models.Index(fields=['organization', 'name']),
+            GinIndex(fields=['search_vector'], name='clients_search_vector_gin'),
         ]
     
     def __str__(self):
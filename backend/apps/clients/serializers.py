@@ -1,11 +1,29 @@
 from rest_framework import serializers
+from apps.core.eager_loading import EagerLoadingMixin
 from .models import Client
 
 
-class ClientSerializer(serializers.ModelSerializer):
+class ClientSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     organization = serializers.PrimaryKeyRelatedField(read_only=True)
+    # Estadísticas de compras mantenidas al registrar ventas (apps.sales.rollups)
+    purchase_count = serializers.IntegerField(source='purchase_stats.purchase_count', read_only=True, default=0)
+    total_spent = serializers.DecimalField(
+        source='purchase_stats.total_spent', max_digits=14, decimal_places=2,
+        coerce_to_string=False, read_only=True, default=0
+    )
+    average_ticket = serializers.DecimalField(
+        source='purchase_stats.average_ticket', max_digits=14, decimal_places=2,
+        coerce_to_string=False, read_only=True, default=0
+    )
+    last_purchase = serializers.DateTimeField(source='purchase_stats.last_purchase', read_only=True, default=None)
+    
+    select_related_fields = ('purchase_stats',)
     
     class Meta:
         model = Client
-        fields = ['id', 'name', 'reference', 'organization', 'created_at', 'updated_at']
+        fields = [
+            'id', 'name', 'reference', 'organization',
+            'purchase_count', 'total_spent', 'average_ticket', 'last_purchase',
+            'created_at', 'updated_at'
+        ]
         read_only_fields = ['id', 'organization', 'created_at', 'updated_at']
@@ -0,0 +1,47 @@
+"""
+Autocompletado de clientes (/clients/autocomplete/).
+"""
+from decimal import Decimal
+from rest_framework.test import APITestCase
+from apps.branches.models import Branch
+from apps.clients.models import Client
+from apps.organizations.models import Organization
+from apps.payments.models import PaymentMethod
+from apps.sales.models import Sale
+from apps.sellers.models import Seller
+
+
+class ClientAutocompleteTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name='Autocompletado', slug='autocompletado')
+        cls.organization = organization
+        cls.seller = Seller.objects.create(organization=organization, name='Vendedor', numeric_code='100')
+        cls.regular = Client.objects.create(organization=organization, name='Zoila Núñez', reference='Z-1')
+        Client.objects.create(organization=organization, name='Zacarías Pérez')
+        Client.objects.create(organization=organization, name='Alberto Zúñiga')
+        Sale.objects.create(
+            organization=organization, seller=cls.seller, client=cls.regular,
+            payment_method=PaymentMethod.objects.create(organization=organization, name='Efectivo'),
+            branch=Branch.objects.get(organization=organization, code='PRINCIPAL'), total=Decimal('10.00')
+        )
+
+    def names(self, query):
+        url = f'/api/v1/clients/autocomplete/?organization_id={self.organization.id}&{query}'
+        return [item['name'] for item in self.client.get(url).json()]
+
+    def test_client_autocomplete_prefers_seller_clients(self):
+        """Los clientes frecuentes del vendedor van primero; el resto, por nombre."""
+        self.assertEqual(self.names('q=z'), ['Zacarías Pérez', 'Zoila Núñez'])
+
+        url = f'/api/v1/clients/autocomplete/?organization_id={self.organization.id}&q=z&seller_id={self.seller.id}'
+        response = self.client.get(url).json()
+        self.assertEqual([item['name'] for item in response], ['Zoila Núñez', 'Zacarías Pérez'])
+        self.assertEqual(response[0]['seller_purchases'], 1)
+
+    def test_prefix_matches_reference_without_accents(self):
+        """Por referencia, y sin distinguir acentos ni mayúsculas."""
+        for term, expected in (('z-', 'Zoila Núñez'), ('ZACARÍAS', 'Zacarías Pérez'), ('zacarias', 'Zacarías Pérez')):
+            with self.subTest(term=term):
+                self.assertEqual(self.names(f'q={term}'), [expected])
@@ -1,19 +1,44 @@
-from rest_framework import viewsets, permissions, filters
+import uuid
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db.models import F
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.change_stamps import ConditionalGetMixin
+from apps.core.eager_loading import EagerLoadingViewSetMixin
+from apps.core.filters import NullsLastOrderingFilter
+from apps.core.idempotency import IdempotentModelMixin
+from apps.core.search import TenantSearchFilter
+from apps.core.utils import request_organization_id
+from apps.core.sync import ChangeFeedMixin
+from apps.sales.models import ClientPurchaseStats
+from .autocomplete import AUTOCOMPLETE_LIMIT, MAX_AUTOCOMPLETE_LIMIT, autocomplete_clients
 from .models import Client
 from .serializers import ClientSerializer
 
 
-class ClientViewSet(viewsets.ModelViewSet):
+# Campos de estadísticas de compras por los que se puede ordenar (?ordering=-total_spent)
+STATS_ORDERING_FIELDS = ['purchase_count', 'total_spent', 'average_ticket', 'last_purchase']
+
+
+class ClientViewSet(ConditionalGetMixin, ChangeFeedMixin, EagerLoadingViewSetMixin, IdempotentModelMixin, viewsets.ModelViewSet):
     serializer_class = ClientSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, NullsLastOrderingFilter, TenantSearchFilter]
     search_fields = ['name', 'reference']
-    ordering_fields = ['name', 'created_at']
+    search_vector_field = 'search_vector'
+    search_substring_fields = ['name', 'reference']
+    ordering_fields = ['name', 'created_at'] + STATS_ORDERING_FIELDS
     ordering = ['name']
+    change_stamp_models = (Client, ClientPurchaseStats)
+    # Una compra cambia las estadísticas del cliente
+    updated_since_fields = ('updated_at', 'purchase_stats__updated_at')
     
     def get_queryset(self):
-        queryset = Client.objects.all()
+        # Alias (sin columnas extra en el SELECT) para ordenar por las estadísticas
+        queryset = Client.objects.defer('search_vector').alias(**{
+            field: F(f'purchase_stats__{field}') for field in STATS_ORDERING_FIELDS
+        })
         
         if self.request.user.is_authenticated and hasattr(self.request.user, 'organization'):
             queryset = queryset.filter(organization=self.request.user.organization)
@@ -49,3 +74,35 @@ class ClientViewSet(viewsets.ModelViewSet):
             serializer.save(organization=organization)
         else:
             serializer.save()
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Clientes cuyo nombre o referencia empieza con `q`, primero los que el
+        vendedor (`seller_id`) atiende seguido y hace poco. Acepta `limit`
+        (máximo 50). Ver apps.clients.autocomplete.
+        """
+        organization_id = request_organization_id(request)
+        if not organization_id:
+            return Response({'error': 'organization_id es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_AUTOCOMPLETE_LIMIT:
+            return Response(
+                {'error': f'limit debe ser un entero entre 1 y {MAX_AUTOCOMPLETE_LIMIT}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        seller_id = request.query_params.get('seller_id') or None
+        if seller_id:
+            try:
+                seller_id = uuid.UUID(seller_id)
+            except ValueError:
+                return Response({'error': 'seller_id inválido'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(autocomplete_clients(
+            organization_id, request.query_params.get('q', ''), seller_id, limit
+        ))
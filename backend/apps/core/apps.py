@@ -5,3 +5,12 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'Core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .change_stamps import connect_change_stamp_signals
+        from .reference_data import connect_reference_data_signals
+        from .sync import connect_sync_signals
+        connect_change_stamp_signals()
+        connect_reference_data_signals()
+        connect_sync_signals()
@@ -0,0 +1,173 @@
+"""
+Sellos de cambios por organización y modelo para peticiones condicionales.
+
+Cada escritura de un TenantModel incrementa, al confirmar la transacción, la
+versión del modelo en su organización (tabla change_stamps). Los ViewSets con
+ConditionalGetMixin calculan el ETag y Last-Modified de list y retrieve a partir
+de los sellos de los modelos que muestran, y si el cliente ya tiene esa versión
+(If-None-Match / If-Modified-Since) responden 304 con una sola consulta, sin
+ejecutar el queryset ni serializar.
+
+Las escrituras masivas que no emiten signals (bulk_create, update, SQL) deben
+llamar a bump_change_stamps explícitamente.
+"""
+import hashlib
+from django.db import connection, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .models import ChangeStamp, IdempotencyKey, TenantModel, Tombstone
+from .utils import request_organization_id
+
+# Modelos que no tienen listados propios o cuya escritura no cambia datos visibles
+EXCLUDED_MODELS = (ChangeStamp, IdempotencyKey, Tombstone)
+
+STAMP_UPSERT = """
+    INSERT INTO {table} (id, organization_id, model, version, created_at, updated_at)
+    SELECT gen_random_uuid(), %s, label, 1, NOW(), NOW()
+    FROM unnest(%s::text[]) AS label
+    WHERE EXISTS (SELECT 1 FROM {organizations} WHERE id = %s)
+    ON CONFLICT (organization_id, model)
+    DO UPDATE SET version = {table}.version + 1, updated_at = NOW()
+"""
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def bump_change_stamps(organization_id, *models):
+    """
+    Marca los modelos como modificados en la organización al confirmar la
+    transacción actual (de inmediato si no hay una abierta). Si la transacción
+    se revierte no se marca nada.
+    """
+    if not organization_id or not models:
+        return
+    labels = sorted({model_label(model) for model in models})
+    transaction.on_commit(lambda: write_change_stamps(organization_id, labels))
+
+
+def write_change_stamps(organization_id, labels):
+    from apps.organizations.models import Organization
+
+    sql = STAMP_UPSERT.format(table=ChangeStamp._meta.db_table, organizations=Organization._meta.db_table)
+    with connection.cursor() as cursor:
+        # La organización pudo borrarse en la misma transacción (CASCADE)
+        cursor.execute(sql, [organization_id, labels, organization_id])
+
+
+def stamp_instance_change(sender, instance, **kwargs):
+    bump_change_stamps(instance.organization_id, sender)
+
+
+def stamp_m2m_change(sender, instance, action, model, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_change_stamps(instance.organization_id, type(instance), model)
+
+
+def connect_change_stamp_signals():
+    """Conecta los signals de escritura de todos los TenantModel concretos."""
+    from django.apps import apps
+
+    for model in apps.get_models():
+        if not issubclass(model, TenantModel) or issubclass(model, EXCLUDED_MODELS):
+            continue
+        uid = f'change_stamp:{model_label(model)}'
+        post_save.connect(stamp_instance_change, sender=model, dispatch_uid=uid)
+        post_delete.connect(stamp_instance_change, sender=model, dispatch_uid=uid)
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            m2m_changed.connect(stamp_m2m_change, sender=through, dispatch_uid=f'change_stamp:{model_label(through)}')
+
+
+def get_change_stamps(organization_id, models):
+    """
+    Versiones y última modificación de los modelos en la organización. Un modelo
+    sin sello (sin escrituras desde que existe la tabla) cuenta como versión 0.
+    """
+    labels = sorted(model_label(model) for model in models)
+    rows = dict.fromkeys(labels, (0, None))
+    rows.update(
+        (label, (version, updated_at))
+        for label, version, updated_at in ChangeStamp.objects.filter(
+            organization_id=organization_id, model__in=labels
+        ).values_list('model', 'version', 'updated_at')
+    )
+    return rows
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para ViewSets de TenantModel: ETag y Last-Modified en list y retrieve,
+    y 304 Not Modified si el cliente ya tiene la versión actual.
+
+    change_stamp_models son todos los modelos cuyos datos aparecen en la
+    respuesta (por defecto, el del queryset). Los sellos se leen antes que los
+    datos, así que una escritura concurrente a lo sumo provoca un 200 de más.
+    """
+    change_stamp_models = None
+
+    def get_change_stamp_models(self):
+        return self.change_stamp_models or (self.get_queryset().model,)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def get_validators(self, request):
+        """(etag, last_modified) de la petición, o None si no hay organización."""
+        organization_id = request_organization_id(request)
+        if not organization_id:
+            return None
+
+        stamps = get_change_stamps(organization_id, self.get_change_stamp_models())
+        raw = ':'.join([
+            organization_id,
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            *(f'{label}={version}' for label, (version, _) in stamps.items()),
+        ])
+        etag = 'W/' + quote_etag(hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32])
+        changed = [updated_at for _, updated_at in stamps.values() if updated_at]
+        return etag, max(changed) if changed else None
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        validators = self.get_validators(request)
+        if validators is None:
+            return view(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        if is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        # Siempre revalidar: sin esto el navegador podría reusar la copia sin preguntar
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    If-None-Match con comparación débil; si no viene, If-Modified-Since
+    (resolución de un segundo).
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or any(tag.removeprefix('W/') == etag.removeprefix('W/') for tag in etags)
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since is None or last_modified is None:
+        return False
+    return int(last_modified.timestamp()) <= if_modified_since
@@ -0,0 +1,23 @@
+"""
+Verificaciones de configuración (python manage.py check --deploy).
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Las versiones de la caché de analítica, del catálogo de sucursal y de los
+    datos de referencia viven en la caché `default`. Con LocMemCache cada
+    worker tiene su copia y no ve los cambios de versión de los demás.
+    """
+    if settings.CACHES['default']['BACKEND'] != LOCMEM_BACKEND:
+        return []
+    return [Warning(
+        'La caché default es LocMemCache: con varios workers cada uno ve solo sus propias invalidaciones.',
+        hint='Usar CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache con un CACHE_LOCATION común.',
+        id='core.W001',
+    )]
@@ -0,0 +1,54 @@
+"""
+Carga anticipada declarativa para serializers.
+
+Cada serializer declara las relaciones y anotaciones que necesita y los ViewSets
+las aplican al queryset, de modo que los listados ejecutan un número constante
+de consultas sin importar el tamaño de la página.
+"""
+from django.db.models import IntegerField, Subquery
+
+
+class SubqueryCount(Subquery):
+    """COUNT(*) de un subquery correlacionado, sin multiplicar filas con JOINs."""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+
+
+class EagerLoadingMixin:
+    """
+    Mixin para serializers.
+
+    Atributos:
+        select_related_fields: relaciones ForeignKey a traer con JOIN
+        prefetch_related_fields: relaciones a traer con una consulta adicional
+            (nombres o instancias de Prefetch)
+        annotation_fields: dict de nombre -> expresión para annotate()
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    annotation_fields = {}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        if cls.select_related_fields:
+            queryset = queryset.select_related(*cls.select_related_fields)
+        if cls.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*cls.prefetch_related_fields)
+        if cls.annotation_fields:
+            queryset = queryset.annotate(**cls.annotation_fields)
+        return queryset
+
+
+class EagerLoadingViewSetMixin:
+    """
+    Mixin para ViewSets: aplica la carga anticipada del serializer de la acción
+    actual en filter_queryset, que usan list, retrieve, update y destroy.
+    Las acciones de agregación usan get_queryset y no se ven afectadas.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
@@ -0,0 +1,168 @@
+"""
+Generadores de archivos CSV y XLSX para respuestas en streaming.
+Escriben fila por fila sin mantener el archivo completo en memoria.
+"""
+import csv
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+# Cantidad de filas que se acumulan antes de entregar un fragmento al cliente
+ROWS_PER_CHUNK = 500
+
+# Caracteres de control no permitidos en XML 1.0
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _Echo:
+    """Pseudo-buffer que regresa lo escrito, para usar csv.writer en streaming."""
+
+    def write(self, value):
+        return value
+
+
+class _ChunkBuffer:
+    """
+    Buffer de solo escritura y sin posición. zipfile lo detecta como no
+    navegable y escribe descriptores de datos, lo que permite transmitir el ZIP.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_csv(header, rows):
+    """
+    Genera un CSV en UTF-8 (con BOM para que Excel respete los acentos).
+    """
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(header)
+
+    chunk = []
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _column_name(index):
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def _xlsx_cell(reference, value):
+    if value is None or value == '':
+        return ''
+    if isinstance(value, bool):
+        value = 'Sí' if value else 'No'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        value = value.strftime('%Y-%m-%d %H:%M:%S')
+    text = escape(ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number, values):
+    cells = ''.join(
+        _xlsx_cell(f'{_column_name(index)}{number}', value)
+        for index, value in enumerate(values)
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+
+XLSX_SHEET_FOOTER = '</sheetData></worksheet>'
+
+
+def stream_xlsx(header, rows, sheet_name='Hoja1'):
+    """
+    Genera un libro XLSX mínimo (una hoja, celdas en línea) sin dependencias
+    externas. La hoja se comprime y entrega conforme se escriben las filas.
+    """
+    buffer = _ChunkBuffer()
+
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_ROOT_RELS)
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(sheet_name=escape(sheet_name[:31])))
+        yield buffer.pop()
+
+        with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write((XLSX_SHEET_HEADER + _xlsx_row(1, header)).encode('utf-8'))
+
+            for number, row in enumerate(rows, start=2):
+                sheet.write(_xlsx_row(number, row).encode('utf-8'))
+                if number % ROWS_PER_CHUNK == 0:
+                    data = buffer.pop()
+                    if data:
+                        yield data
+
+            sheet.write(XLSX_SHEET_FOOTER.encode('utf-8'))
+
+    yield buffer.pop()
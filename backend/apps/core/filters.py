@@ -0,0 +1,26 @@
+"""
+Filtros compartidos por los ViewSets.
+"""
+from django.db.models import F
+from rest_framework.filters import OrderingFilter
+
+
+class NullsLastOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter que deja los NULL al final en ambos sentidos y desempata por
+    id, para que las páginas sean estables al ordenar por columnas con muchos
+    valores repetidos (por ejemplo, clientes sin compras).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+
+        expressions = []
+        for term in ordering:
+            if term.startswith('-'):
+                expressions.append(F(term[1:]).desc(nulls_last=True))
+            else:
+                expressions.append(F(term).asc(nulls_last=True))
+        return queryset.order_by(*expressions, 'id')
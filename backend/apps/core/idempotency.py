@@ -0,0 +1,174 @@
+"""
+Soporte para el encabezado Idempotency-Key en escrituras de la API.
+Un reintento con la misma llave devuelve la respuesta guardada sin repetir la escritura.
+"""
+import functools
+import hashlib
+import json
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import JSONField, Value
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from .models import IdempotencyKey
+from .singleflight import lock_id
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+def get_request_organization_id(view, request):
+    """
+    Organización de la petición: la del usuario autenticado, la enviada en el
+    body o query params, o la del objeto en rutas de detalle.
+    """
+    user = request.user
+    if user.is_authenticated and getattr(user, 'organization_id', None):
+        return user.organization_id
+
+    data = request.data if hasattr(request.data, 'get') else {}
+    org_id = (
+        data.get('organization_id')
+        or data.get('organization')
+        or request.query_params.get('organization_id')
+    )
+    if org_id:
+        return org_id
+
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    if lookup_url_kwarg in view.kwargs:
+        return view.get_object().organization_id
+
+    return None
+
+
+def request_fingerprint(request):
+    """Hash de método, ruta y body para detectar llaves reutilizadas con otra petición."""
+    body = json.dumps(request.data, sort_keys=True, default=str) if request.data else ''
+    raw = f'{request.method}:{request.path}:{body}'
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def idempotent(view_method):
+    """
+    Decorador para acciones de escritura de un ViewSet.
+
+    Sin encabezado Idempotency-Key la acción se ejecuta normalmente. Con encabezado,
+    la primera petición guarda su respuesta y los reintentos la reciben tal cual
+    con una sola lectura por índice (organización, llave). Un reintento mientras
+    la primera sigue en proceso recibe 409.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > 255:
+            return Response(
+                {'error': 'Idempotency-Key no puede exceder 255 caracteres'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        organization_id = get_request_organization_id(self, request)
+        try:
+            organization_id = uuid.UUID(str(organization_id))
+        except ValueError:
+            return Response(
+                {'error': 'Idempotency-Key requiere una organización válida'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        try:
+            return execute_once(self, request, view_method, organization_id, key, fingerprint, *args, **kwargs)
+        except IntegrityError:
+            # La FK a la organización se verifica al confirmar
+            from apps.organizations.models import Organization
+            if Organization.objects.filter(pk=organization_id).exists():
+                raise
+            return Response(
+                {'error': 'Idempotency-Key requiere una organización válida'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    return wrapper
+
+
+@transaction.atomic
+def execute_once(view, request, view_method, organization_id, key, fingerprint, *args, **kwargs):
+    """
+    Ejecuta la acción y guarda su respuesta en la misma transacción que sus
+    escrituras: si el proceso muere a la mitad (timeout del worker, OOM,
+    reinicio) no queda ni la escritura ni la llave, y el reintento se procesa
+    de nuevo. Mientras tanto la llave está tomada por un advisory lock de la
+    transacción, que Postgres libera solo si la conexión se cierra.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_try_advisory_xact_lock(%s)',
+            [lock_id(f'idempotency:{organization_id}:{key}')]
+        )
+        acquired = cursor.fetchone()[0]
+    if not acquired:
+        return Response(
+            {'error': 'Hay una petición con esta Idempotency-Key en proceso'},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    now = timezone.now()
+    stored = IdempotencyKey.objects.filter(organization_id=organization_id, key=key).first()
+    if stored and stored.expires_at <= now:
+        stored.delete()
+        stored = None
+
+    if stored:
+        if stored.request_hash != fingerprint:
+            return Response(
+                {'error': 'Idempotency-Key ya se usó con una petición distinta'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        response = Response(stored.response_body, status=stored.response_status)
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    response = view_method(view, request, *args, **kwargs)
+
+    # Los errores del servidor no se guardan (ni sus escrituras) para que el
+    # reintento se procese de nuevo
+    if response.status_code >= 500:
+        transaction.set_rollback(True)
+        return response
+
+    body = getattr(response, 'data', None)
+    IdempotencyKey.objects.create(
+        organization_id=organization_id,
+        key=key,
+        request_hash=fingerprint,
+        response_status=response.status_code,
+        # Sin cuerpo (p. ej. 204) se guarda el null de JSON, no NULL de SQL
+        response_body=json.loads(JSONRenderer().render(body)) if body is not None else Value(None, JSONField()),
+        expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    )
+    return response
+
+
+class IdempotentModelMixin:
+    """
+    Aplica Idempotency-Key a create, update (incluye partial_update) y destroy.
+    """
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @idempotent
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
+
+    @idempotent
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
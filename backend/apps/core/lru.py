@@ -0,0 +1,73 @@
+"""
+Caché LRU en memoria del proceso.
+
+Guarda hasta `maxsize` entradas y, al llenarse, descarta la usada hace más
+tiempo, así que la memoria por worker queda acotada. Con `ttl` (segundos) una
+entrada además deja de servirse a los `ttl` segundos de guardada. Es segura
+entre hilos y lleva contadores de aciertos, fallos y descartes para exponerlos
+en endpoints de estadísticas. Como cada worker tiene su copia, la invalidación
+va en la llave (por ejemplo, una versión de datos): las entradas de versiones
+viejas simplemente dejan de pedirse y salen por antigüedad.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Valor de get() cuando la llave no está (None es un valor válido para guardar)
+MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Valor guardado en `key`, o MISSING."""
+        with self._lock:
+            try:
+                expires_at, value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return MISSING
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,298 @@
+"""
+Comando para medir la latencia de los endpoints con las mismas secuencias de
+llamadas que hace el frontend y compararla contra una línea base guardada.
+
+Por defecto usa el cliente de pruebas de Django dentro del proceso; con
+--base-url mide contra un servidor en ejecución (p. ej. gunicorn local).
+"""
+import json
+import math
+import os
+import statistics
+import time
+import urllib.request
+from contextlib import nullcontext
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.organizations.models import Organization
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'endpoint_baseline.json'
+
+# Secuencias de llamadas por pantalla: (paso, método, ruta)
+SCENARIOS = {
+    'admin_dashboard': [
+        ('organization', 'GET', '/api/v1/organizations/{slug}/'),
+        ('branches', 'GET', '/api/v1/branches/'),
+        ('dashboard', 'GET', '/api/v1/sales/dashboard/'),
+    ],
+    'seller_new_sale': [
+        ('seller', 'GET', '/api/v1/sellers/{seller}/'),
+        ('branches', 'GET', '/api/v1/branches/'),
+        ('products', 'GET', '/api/v1/products/?active=true&branch_id={branch}'),
+        ('payment_methods', 'GET', '/api/v1/payments/methods/?active=true'),
+        ('client_search', 'GET', '/api/v1/clients/?search={client_name}'),
+        ('create_sale', 'POST', '/api/v1/sales/'),
+        ('sales_history', 'GET', '/api/v1/sales/?seller_id={seller}'),
+    ],
+    'reports': [
+        ('summary', 'GET', '/api/v1/sales/summary/'),
+        ('by_seller', 'GET', '/api/v1/sales/by_seller/'),
+        ('by_payment_method', 'GET', '/api/v1/sales/by_payment_method/'),
+        ('seller_commissions', 'GET', '/api/v1/sales/seller_commissions/?date={today}'),
+        ('top_products', 'GET', '/api/v1/sales/top_products/'),
+        ('top_products_month', 'GET', '/api/v1/sales/top_products/?start={month_start}&end={today}&branch_id={branch}&limit=20'),
+        ('by_category', 'GET', '/api/v1/sales/by_category/'),
+        ('client_stats', 'GET', '/api/v1/sales/client_stats/'),
+        ('timeseries_day', 'GET', '/api/v1/sales/timeseries/?granularity=day&start={month_start}&end={today}'),
+        ('timeseries_month', 'GET', '/api/v1/sales/timeseries/?granularity=month'),
+        ('sales_list', 'GET', '/api/v1/sales/'),
+    ],
+    'catalog_search': [
+        ('product_search', 'GET', '/api/v1/products/?search={product_name}'),
+        ('client_search', 'GET', '/api/v1/clients/?search={client_name}'),
+        ('client_list', 'GET', '/api/v1/clients/'),
+    ],
+}
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por rango más cercano: el menor valor que cubre la fracción pedida."""
+    return sorted_values[max(0, math.ceil(len(sorted_values) * fraction) - 1)]
+
+
+def current_rss_bytes():
+    """RSS actual del proceso (Linux, /proc/self/statm); None si no está disponible."""
+    try:
+        with open('/proc/self/statm') as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class Command(BaseCommand):
+    help = 'Mide p50/p95/p99, consultas y crecimiento de RSS de los endpoints y los compara con la línea base'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', help='Slugs separados por coma (por defecto: chica, mediana y grande por ventas)')
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Escenarios a ejecutar, separados por coma')
+        parser.add_argument('--iterations', type=int, default=100, help='Repeticiones medidas de cada escenario')
+        parser.add_argument('--warmup', type=int, default=2, help='Repeticiones de calentamiento sin medir')
+        parser.add_argument('--base-url', help='Medir contra un servidor en ejecución (los pasos POST se omiten)')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Archivo JSON de la línea base')
+        parser.add_argument('--save-baseline', action='store_true', help='Guardar los resultados como nueva línea base')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Aumento relativo de p95 permitido')
+        parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Aumento absoluto de p95 que se ignora')
+        parser.add_argument(
+            '--cache', action='store_true',
+            help='Medir con la caché de analítica activa (por defecto se desactiva para medir las consultas)'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'Escenarios desconocidos: {", ".join(sorted(unknown))}')
+
+        self.base_url = options['base_url'].rstrip('/') if options['base_url'] else None
+        self.client = APIClient(SERVER_NAME='localhost')
+
+        results = {}
+        # En modo HTTP la caché depende de la configuración del servidor
+        with override_settings(ANALYTICS_CACHE_ENABLED=options['cache']):
+            for label, organization in self.get_tenants(options['organizations']):
+                context = self.get_context(organization)
+                self.stdout.write(f'\n{label}: {organization.name} ({organization.sales_count} ventas)')
+                self.stdout.write(
+                    f'  {"escenario/paso":<36} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"consultas":>10} {"ΔRSS MB":>8}'
+                )
+                for scenario in scenarios:
+                    for step, metrics in self.run_scenario(scenario, context, options).items():
+                        results[f'{label}/{scenario}/{step}'] = metrics
+                        queries = '-' if metrics['queries'] is None else metrics['queries']
+                        rss = '-' if metrics['rss_delta_mb'] is None else metrics['rss_delta_mb']
+                        self.stdout.write(
+                            f'  {scenario + "/" + step:<36} {metrics["p50_ms"]:>9.2f} {metrics["p95_ms"]:>9.2f} '
+                            f'{metrics["p99_ms"]:>9.2f} {queries:>10} {rss:>8}'
+                        )
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({
+                'generated_at': timezone.now().isoformat(timespec='seconds'),
+                'iterations': options['iterations'],
+                'mode': 'http' if self.base_url else 'in-process',
+                'results': results,
+            }, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'\n✅ Línea base guardada en {baseline_path}'))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'\nSin línea base en {baseline_path}; usa --save-baseline'))
+            return
+
+        baseline = json.loads(baseline_path.read_text())['results']
+        regressions = self.compare(results, baseline, options['tolerance'], options['min_delta_ms'])
+        if regressions:
+            for message in regressions:
+                self.stdout.write(self.style.ERROR(f'  ✗ {message}'))
+            raise CommandError(f'{len(regressions)} regresiones contra {baseline_path}')
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Sin regresiones contra {baseline_path}'))
+
+    def get_tenants(self, slugs):
+        organizations = Organization.objects.annotate(sales_count=Count('sale_set'))
+        if slugs:
+            found = {org.slug: org for org in organizations.filter(slug__in=slugs.split(','))}
+            missing = [slug for slug in slugs.split(',') if slug not in found]
+            if missing:
+                raise CommandError(f'Organizaciones no encontradas: {", ".join(missing)}')
+            return [(slug, found[slug]) for slug in slugs.split(',')]
+
+        # Tres tamaños de tenant según el número de ventas
+        ranked = list(organizations.filter(sales_count__gt=0).order_by('sales_count'))
+        if not ranked:
+            raise CommandError('No hay organizaciones con ventas; genera datos con generate_load_data')
+        tenants = {'small': ranked[0], 'medium': ranked[len(ranked) // 2], 'large': ranked[-1]}
+        seen = set()
+        result = []
+        for label, organization in tenants.items():
+            if organization.id not in seen:
+                seen.add(organization.id)
+                result.append((label, organization))
+        return result
+
+    def get_context(self, organization):
+        from apps.branches.models import Branch
+        from apps.payments.models import PaymentMethod
+        from apps.products.models import Product
+
+        branch = Branch.objects.filter(organization=organization, code='PRINCIPAL').first()
+        seller = organization.seller_set.filter(active=True, branches=branch).first() or organization.seller_set.first()
+        client = organization.client_set.order_by('name').first()
+        payment_method = PaymentMethod.objects.filter(organization=organization, active=True).first()
+        products = list(Product.objects.filter(organization=organization, active=True, branches=branch)[:3])
+        if not (branch and seller and client and payment_method and products):
+            raise CommandError(f'{organization.slug} necesita sucursal, vendedor, cliente, método de pago y productos')
+
+        today = timezone.localdate()
+        return {
+            'organization': organization.id,
+            'slug': organization.slug,
+            'branch': branch.id,
+            'seller': seller.id,
+            'client_name': client.name,
+            'product_name': products[0].name,
+            'today': today.isoformat(),
+            'month_start': (today - timedelta(days=29)).isoformat(),
+            'sale': {
+                'organization_id': str(organization.id),
+                'branch_id': str(branch.id),
+                'seller_id': str(seller.id),
+                'client_id': str(client.id),
+                'payment_method_id': str(payment_method.id),
+                'total': str(sum(product.price for product in products)),
+                'items': [
+                    {'product_id': str(product.id), 'quantity': 1, 'price': str(product.price)}
+                    for product in products
+                ],
+            },
+        }
+
+    def build_url(self, path, context):
+        url = path.format(**context)
+        separator = '&' if '?' in url else '?'
+        return f'{url}{separator}organization_id={context["organization"]}'
+
+    def request(self, method, url, body):
+        if self.base_url:
+            with urllib.request.urlopen(self.base_url + url) as response:
+                response.read()
+                return response.status
+
+        if method == 'POST':
+            response = self.client.post(url, body, format='json')
+        else:
+            response = self.client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response.status_code
+
+    def run_scenario(self, scenario, context, options):
+        steps = [
+            (step, method, self.build_url(path, context))
+            for step, method, path in SCENARIOS[scenario]
+            if not (self.base_url and method != 'GET')
+        ]
+        timings = {step: [] for step, _, _ in steps}
+        # Mayor crecimiento del RSS durante una petición de cada paso. El pico
+        # del proceso (ru_maxrss) solo sube, así que después del paso más
+        # pesado todos los demás mostrarían el mismo valor
+        rss_delta = {}
+
+        # Los pasos de escritura se revierten para no alterar los datos medidos
+        writes = any(method != 'GET' for _, method, _ in steps)
+        with transaction.atomic() if writes else nullcontext():
+            for iteration in range(options['warmup'] + options['iterations']):
+                for step, method, url in steps:
+                    rss_before = None if self.base_url else current_rss_bytes()
+                    start = time.perf_counter()
+                    status = self.request(method, url, context['sale'])
+                    elapsed = (time.perf_counter() - start) * 1000
+                    rss_after = None if rss_before is None else current_rss_bytes()
+                    if status >= 400:
+                        raise CommandError(f'{scenario}/{step}: {method} {url} respondió {status}')
+                    if iteration >= options['warmup']:
+                        timings[step].append(elapsed)
+                        if rss_after is not None:
+                            rss_delta[step] = max(rss_delta.get(step, 0), rss_after - rss_before)
+
+            queries = {step: self.count_queries(method, url, context['sale']) for step, method, url in steps}
+            if writes:
+                transaction.set_rollback(True)
+
+        metrics = {}
+        for step, values in timings.items():
+            values.sort()
+            metrics[step] = {
+                'p50_ms': round(statistics.median(values), 2),
+                'p95_ms': round(percentile(values, 0.95), 2),
+                'p99_ms': round(percentile(values, 0.99), 2),
+                'queries': queries[step],
+                'rss_delta_mb': round(rss_delta[step] / 2 ** 20, 1) if step in rss_delta else None,
+            }
+        return metrics
+
+    def count_queries(self, method, url, body):
+        """
+        Consultas por petición en una pasada aparte y sin hilos, para que
+        CaptureQueriesContext vea también las consultas de run_parallel.
+        """
+        if self.base_url:
+            return None
+        with override_settings(ANALYTICS_PARALLEL_QUERIES=False), CaptureQueriesContext(connection) as context:
+            self.request(method, url, body)
+        return len(context.captured_queries)
+
+    def compare(self, results, baseline, tolerance, min_delta_ms):
+        regressions = []
+        for key, metrics in results.items():
+            previous = baseline.get(key)
+            if not previous:
+                continue
+            p95_delta = metrics['p95_ms'] - previous['p95_ms']
+            if p95_delta > min_delta_ms and metrics['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                regressions.append(f'{key}: p95 {previous["p95_ms"]} -> {metrics["p95_ms"]} ms')
+            if (
+                metrics['queries'] is not None and previous.get('queries') is not None
+                and metrics['queries'] > previous['queries']
+            ):
+                regressions.append(f'{key}: consultas {previous["queries"]} -> {metrics["queries"]}')
+        return regressions
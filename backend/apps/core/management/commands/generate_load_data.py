@@ -0,0 +1,282 @@
+"""
+Comando para generar datos sintéticos multi-organización para pruebas de carga.
+
+Reparte las ventas entre organizaciones con una distribución sesgada (pocas
+organizaciones grandes y muchas chicas), con estacionalidad anual, semanal y por
+hora. Las ventas y sus líneas se cargan con COPY por bloques.
+"""
+import io
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.branches.models import Branch
+from apps.clients.models import Client
+from apps.organizations.models import Organization
+from apps.payments.models import PaymentMethod
+from apps.products.models import Product
+from apps.sales.models import Sale, SaleItem
+from apps.sales.rollups import rebuild_sales_rollup
+from apps.sellers.models import Seller
+
+CATEGORIES = ['Bebidas', 'Abarrotes', 'Lácteos', 'Panadería', 'Limpieza', 'Snacks', 'Farmacia', 'Papelería']
+
+PAYMENT_METHODS = [
+    # (nombre, comisión %, peso)
+    ('Efectivo', Decimal('0'), 50),
+    ('Tarjeta', Decimal('3.50'), 35),
+    ('Transferencia', Decimal('1.00'), 15),
+]
+
+# Peso relativo por día de la semana (lunes=0) y por hora del día
+WEEKDAY_WEIGHTS = [0.85, 0.85, 0.9, 0.95, 1.2, 1.35, 0.9]
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 0.1, 0.3, 0.7, 1, 1.1, 1.3, 1.6, 1.7, 1.4, 1.1, 1, 1.1, 1.4, 1.5, 1.2, 0.7, 0.3, 0.1]
+
+# Probabilidad relativa de 1, 2, 3... líneas por ticket
+LINES_WEIGHTS = [30, 25, 17, 11, 7, 5, 3, 2]
+
+
+def zipf_weights(count, exponent):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def cumulative(weights):
+    total = 0
+    result = []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+def clamp(value, low, high):
+    return max(low, min(high, int(value)))
+
+
+class Command(BaseCommand):
+    help = 'Genera organizaciones, catálogos y millones de ventas sintéticas para pruebas de escala'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=20, help='Número de organizaciones a crear')
+        parser.add_argument('--sales', type=int, default=1_000_000, help='Ventas totales a repartir entre organizaciones')
+        parser.add_argument('--days', type=int, default=365, help='Días hacia atrás en los que se reparten las ventas')
+        parser.add_argument('--skew', type=float, default=1.1, help='Exponente Zipf del tamaño de las organizaciones')
+        parser.add_argument('--batch-size', type=int, default=50_000, help='Ventas por bloque de COPY')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla para generar datos reproducibles')
+        parser.add_argument('--prefix', default='carga', help='Prefijo del slug de las organizaciones generadas')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('generate_load_data requiere PostgreSQL (usa COPY)')
+        if options['organizations'] < 1 or options['sales'] < 0 or options['days'] < 1:
+            raise CommandError('--organizations y --days deben ser mayores a 0 y --sales no puede ser negativo')
+
+        self.rng = random.Random(options['seed'])
+        # Los IDs no dependen de la semilla para poder repetir una carga con otro prefijo
+        self.id_rng = random.Random()
+        self.batch_size = options['batch_size']
+        prefix = f'{options["prefix"]}-{options["seed"]}'
+        if Organization.objects.filter(slug__startswith=f'{prefix}-').exists():
+            raise CommandError(f'Ya existen organizaciones con el prefijo "{prefix}"; usa otro --prefix o --seed')
+
+        self.prepare_calendar(options['days'])
+
+        weights = zipf_weights(options['organizations'], options['skew'])
+        total_weight = sum(weights)
+        started = time.perf_counter()
+        total_items = 0
+
+        for index, weight in enumerate(weights):
+            sales_count = round(options['sales'] * weight / total_weight)
+            organization = Organization.objects.create(
+                name=f'Carga {index + 1}',
+                slug=f'{prefix}-{index + 1}'
+            )
+            catalog = self.create_catalog(organization, sales_count)
+            items_count = self.load_sales(organization, catalog, sales_count)
+            # COPY no pasa por la aplicación; reconstruir los resúmenes de la organización
+            with transaction.atomic():
+                rebuild_sales_rollup(organization.id)
+            total_items += items_count
+            self.stdout.write(
+                f'  ✓ {organization.slug}: {len(catalog["branches"])} sucursales, '
+                f'{len(catalog["products"])} productos, {len(catalog["clients"])} clientes, '
+                f'{sales_count} ventas, {items_count} líneas'
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Sale._meta.db_table}')
+            cursor.execute(f'ANALYZE {SaleItem._meta.db_table}')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ {options["sales"]} ventas y {total_items} líneas generadas en {elapsed:.1f}s'
+        ))
+
+    def prepare_calendar(self, days):
+        """Pesos por día con estacionalidad anual (pico en diciembre) y semanal."""
+        tz = timezone.get_current_timezone()
+        today = timezone.localdate()
+        self.days = []
+        day_weights = []
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            annual = 1 + 0.35 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 350) / 365)
+            self.days.append(datetime(day.year, day.month, day.day, tzinfo=tz))
+            day_weights.append(annual * WEEKDAY_WEIGHTS[day.weekday()])
+        self.day_cum_weights = cumulative(day_weights)
+        self.hour_cum_weights = cumulative(HOUR_WEIGHTS)
+        self.lines_cum_weights = cumulative(LINES_WEIGHTS)
+
+    def new_id(self):
+        # Texto UUID v4 armado directo; más barato que uuid.UUID + str()
+        digits = '%032x' % self.id_rng.getrandbits(128)
+        return f'{digits[:8]}-{digits[8:12]}-4{digits[13:16]}-{digits[16:20]}-{digits[20:]}'
+
+    def create_catalog(self, organization, sales_count):
+        """Catálogo proporcional al volumen de ventas de la organización."""
+        rng = self.rng
+        branch_count = clamp(sales_count / 200_000, 1, 25)
+        seller_count = clamp(branch_count * 3, 2, 150)
+        product_count = clamp(math.sqrt(sales_count) * 3, 20, 5000)
+        client_count = clamp(sales_count / 25, 10, 100_000)
+
+        with transaction.atomic():
+            # La señal de post_save ya creó la sucursal principal
+            branches = list(Branch.objects.filter(organization=organization))
+            branches += Branch.objects.bulk_create([
+                Branch(organization=organization, name=f'Sucursal {i}', code=f'SUC{i:02d}')
+                for i in range(1, branch_count)
+            ])
+
+            sellers = Seller.objects.bulk_create([
+                Seller(
+                    organization=organization,
+                    name=f'Vendedor {i}',
+                    numeric_code=str(1000 + i),
+                    commission_percentage=Decimal(rng.choice(['0', '2.50', '5.00', '7.50']))
+                )
+                for i in range(seller_count)
+            ])
+
+            payment_methods = PaymentMethod.objects.bulk_create([
+                PaymentMethod(organization=organization, name=name, commission_percentage=commission)
+                for name, commission, _ in PAYMENT_METHODS
+            ])
+
+            products = Product.objects.bulk_create([
+                Product(
+                    organization=organization,
+                    name=f'Producto {i}',
+                    price=Decimal(rng.randint(500, 50_000)) / 100,
+                    category=rng.choice(CATEGORIES)
+                )
+                for i in range(product_count)
+            ], batch_size=5000)
+
+            clients = Client.objects.bulk_create([
+                Client(organization=organization, name=f'Cliente {i}', reference=f'REF-{i}')
+                for i in range(client_count)
+            ], batch_size=5000)
+
+            Branch.sellers.through.objects.bulk_create([
+                Branch.sellers.through(branch_id=branch.id, seller_id=seller.id)
+                for position, seller in enumerate(sellers)
+                for branch in {branches[position % len(branches)], branches[0]}
+            ])
+            Product.branches.through.objects.bulk_create([
+                Product.branches.through(product_id=product.id, branch_id=branch.id)
+                for product in products
+                for branch in branches
+            ], batch_size=10_000)
+
+        # Los vendedores solo venden en sus sucursales
+        sellers_by_branch = {branch.id: [] for branch in branches}
+        for position, seller in enumerate(sellers):
+            for branch in {branches[position % len(branches)], branches[0]}:
+                sellers_by_branch[branch.id].append(str(seller.id))
+
+        return {
+            'branches': [str(branch.id) for branch in branches],
+            'branch_cum_weights': cumulative(zipf_weights(len(branches), 0.8)),
+            'sellers_by_branch': {str(key): value for key, value in sellers_by_branch.items()},
+            'payment_methods': [str(method.id) for method in payment_methods],
+            'payment_cum_weights': cumulative([weight for _, _, weight in PAYMENT_METHODS]),
+            # Pocos productos y clientes concentran la mayoría de las ventas
+            'products': [(str(product.id), int(product.price * 100)) for product in products],
+            'product_cum_weights': cumulative(zipf_weights(len(products), 1.0)),
+            'clients': [str(client.id) for client in clients],
+            'client_cum_weights': cumulative(zipf_weights(len(clients), 0.7)),
+        }
+
+    def load_sales(self, organization, catalog, sales_count):
+        items_count = 0
+        for offset in range(0, sales_count, self.batch_size):
+            items_count += self.copy_chunk(organization, catalog, min(self.batch_size, sales_count - offset))
+        return items_count
+
+    def copy_chunk(self, organization, catalog, count):
+        rng = self.rng
+        organization_id = str(organization.id)
+        choices = rng.choices
+
+        days = choices(self.days, cum_weights=self.day_cum_weights, k=count)
+        hours = choices(range(24), cum_weights=self.hour_cum_weights, k=count)
+        branches = choices(catalog['branches'], cum_weights=catalog['branch_cum_weights'], k=count)
+        clients = choices(catalog['clients'], cum_weights=catalog['client_cum_weights'], k=count)
+        payment_methods = choices(catalog['payment_methods'], cum_weights=catalog['payment_cum_weights'], k=count)
+        line_counts = choices(range(1, len(LINES_WEIGHTS) + 1), cum_weights=self.lines_cum_weights, k=count)
+
+        products = catalog['products']
+        product_cum_weights = catalog['product_cum_weights']
+        sellers_by_branch = catalog['sellers_by_branch']
+
+        sales_buffer = io.StringIO()
+        items_buffer = io.StringIO()
+        items_count = 0
+
+        for position in range(count):
+            created_at = (
+                days[position]
+                + timedelta(hours=hours[position], seconds=rng.randrange(3600))
+            ).isoformat()
+            sale_id = self.new_id()
+            branch_id = branches[position]
+
+            total = 0
+            for product_id, price in choices(products, cum_weights=product_cum_weights, k=line_counts[position]):
+                quantity = 1 if rng.random() < 0.8 else rng.randint(2, 5)
+                subtotal = price * quantity
+                total += subtotal
+                items_buffer.write(
+                    f'{self.new_id()}\t{organization_id}\t{created_at}\t{created_at}\t{sale_id}\t'
+                    f'{product_id}\t{quantity}\t{price // 100}.{price % 100:02d}\t'
+                    f'{subtotal // 100}.{subtotal % 100:02d}\n'
+                )
+                items_count += 1
+
+            sales_buffer.write(
+                f'{sale_id}\t{organization_id}\t{created_at}\t{created_at}\t{branch_id}\t'
+                f'{rng.choice(sellers_by_branch[branch_id])}\t{clients[position]}\t'
+                f'{payment_methods[position]}\t{total // 100}.{total % 100:02d}\t\n'
+            )
+
+        sales_buffer.seek(0)
+        items_buffer.seek(0)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {Sale._meta.db_table} (id, organization_id, created_at, updated_at, branch_id, '
+                f'seller_id, client_id, payment_method_id, total, notes) FROM STDIN',
+                sales_buffer
+            )
+            cursor.copy_expert(
+                f'COPY {SaleItem._meta.db_table} (id, organization_id, created_at, updated_at, sale_id, '
+                f'product_id, quantity, price, subtotal) FROM STDIN',
+                items_buffer
+            )
+
+        return items_count
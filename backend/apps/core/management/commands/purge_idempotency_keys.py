@@ -0,0 +1,14 @@
+"""
+Comando para eliminar las llaves de idempotencia expiradas.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.core.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Elimina las llaves de idempotencia expiradas'
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ {deleted} llaves expiradas eliminadas'))
@@ -0,0 +1,17 @@
+"""
+Comando para eliminar los registros de eliminación más antiguos que la retención.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.core.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Elimina los registros de eliminación anteriores a TOMBSTONE_RETENTION_DAYS'
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = Tombstone.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ {deleted} registros de eliminación purgados'))
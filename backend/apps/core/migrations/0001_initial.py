@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=255, verbose_name='Llave')),
+                ('request_hash', models.CharField(max_length=64, verbose_name='Hash de la petición')),
+                ('response_status', models.PositiveSmallIntegerField(verbose_name='Código de respuesta')),
+                ('response_body', models.JSONField(verbose_name='Respuesta')),
+                ('expires_at', models.DateTimeField(verbose_name='Expira')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='Organización')),
+            ],
+            options={
+                'verbose_name': 'Llave de idempotencia',
+                'verbose_name_plural': 'Llaves de idempotencia',
+                'db_table': 'idempotency_keys',
+                'indexes': [models.Index(fields=['expires_at'], name='idempotency_expires_6c9d28_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('organization', 'key'), name='unique_idempotency_key_per_org'),
+        ),
+    ]
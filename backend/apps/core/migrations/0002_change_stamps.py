@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeStamp',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Versión')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='Organización')),
+            ],
+            options={
+                'verbose_name': 'Sello de cambios',
+                'verbose_name_plural': 'Sellos de cambios',
+                'db_table': 'change_stamps',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='changestamp',
+            constraint=models.UniqueConstraint(fields=('organization', 'model'), name='unique_change_stamp_per_org'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('core', '0002_change_stamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=100, verbose_name='Modelo')),
+                ('object_id', models.UUIDField(verbose_name='ID del objeto')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='Organización')),
+            ],
+            options={
+                'verbose_name': 'Registro de eliminación',
+                'verbose_name_plural': 'Registros de eliminación',
+                'db_table': 'tombstones',
+                'indexes': [models.Index(fields=['organization', 'model', 'created_at'], name='tombstones_organiz_bdb197_idx'), models.Index(fields=['created_at'], name='tombstones_created_69d20e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Minúsculas y sin acentos. IMMUTABLE para poder usarla en índices y triggers;
+# debe coincidir con apps.core.search.fold_search_text.
+CREATE_FOLD_FUNCTION = """
+    CREATE OR REPLACE FUNCTION vnts_search_fold(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT translate(
+            lower(value),
+            'ÁÀÄÂÃÉÈËÊÍÌÏÎÓÒÖÔÕÚÙÜÛÑÇáàäâãéèëêíìïîóòöôõúùüûñç',
+            'aaaaaeeeeiiiiooooouuuuncaaaaaeeeeiiiiooooouuuunc'
+        )
+    $$;
+"""
+
+
+def create_trigram_extension(apps, schema_editor):
+    """pg_trgm es opcional: sin él la búsqueda funciona sin índices trigram."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_tombstones'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_FOLD_FUNCTION, 'DROP FUNCTION IF EXISTS vnts_search_fold(text)'),
+        migrations.RunPython(create_trigram_extension, migrations.RunPython.noop),
+    ]
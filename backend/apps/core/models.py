@@ -47,3 +47,77 @@ class UUIDModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class IdempotencyKey(UUIDModel, TenantModel):
+    """
+    Respuesta guardada para una petición de escritura con encabezado Idempotency-Key.
+    Un reintento con la misma llave devuelve esta respuesta sin volver a ejecutar la escritura.
+    """
+    key = models.CharField(max_length=255, verbose_name='Llave')
+    request_hash = models.CharField(max_length=64, verbose_name='Hash de la petición')
+    response_status = models.PositiveSmallIntegerField(verbose_name='Código de respuesta')
+    response_body = models.JSONField(verbose_name='Respuesta')
+    expires_at = models.DateTimeField(verbose_name='Expira')
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = 'Llave de idempotencia'
+        verbose_name_plural = 'Llaves de idempotencia'
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'key'],
+                name='unique_idempotency_key_per_org'
+            )
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class ChangeStamp(UUIDModel, TenantModel):
+    """
+    Versión de los datos de un modelo dentro de una organización. Cada escritura
+    del modelo la incrementa y actualiza updated_at, de modo que los listados y
+    detalles pueden responder 304 a peticiones condicionales con una sola consulta.
+    """
+    model = models.CharField(max_length=100, verbose_name='Modelo')
+    version = models.BigIntegerField(default=0, verbose_name='Versión')
+
+    class Meta:
+        db_table = 'change_stamps'
+        verbose_name = 'Sello de cambios'
+        verbose_name_plural = 'Sellos de cambios'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'model'],
+                name='unique_change_stamp_per_org'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.model} v{self.version}'
+
+
+class Tombstone(UUIDModel, TenantModel):
+    """
+    Registro de un objeto eliminado. Permite que los clientes que sincronizan
+    con ?updated_since= también se enteren de las bajas.
+    """
+    model = models.CharField(max_length=100, verbose_name='Modelo')
+    object_id = models.UUIDField(verbose_name='ID del objeto')
+
+    class Meta:
+        db_table = 'tombstones'
+        verbose_name = 'Registro de eliminación'
+        verbose_name_plural = 'Registros de eliminación'
+        indexes = [
+            models.Index(fields=['organization', 'model', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
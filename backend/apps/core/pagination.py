@@ -0,0 +1,129 @@
+"""
+Paginación para los listados de la API.
+"""
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Paginación por número de página con un modo opcional por cursor (keyset).
+
+    El modo cursor se activa con `?pagination=cursor` o al recibir `?cursor=`.
+    Ordena por (created_at, id) descendente y filtra con la última fila vista
+    en lugar de usar OFFSET, de modo que cada página cuesta lo mismo sin importar
+    su profundidad y aprovecha los índices (organization, -created_at).
+    No ejecuta COUNT(*). Como el orden lo fija el cursor, `?ordering=` en modo
+    cursor responde 400 en lugar de ignorarse.
+
+    Un ViewSet puede imponer el modo cursor con otra llave definiendo
+    get_pagination_keyset() -> (campo, descendente), o None para el
+    comportamiento normal (ver apps.core.sync).
+    """
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'Cursor inválido'
+    ordering_not_allowed_message = 'ordering no se puede combinar con la paginación por cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.mode_query_param)
+        forced_keyset = view.get_pagination_keyset() if hasattr(view, 'get_pagination_keyset') else None
+        self.keyset_field, self.keyset_descending = forced_keyset or ('created_at', True)
+        self.keyset = (
+            forced_keyset is not None
+            or mode == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            raise ValidationError({'error': self.ordering_not_allowed_message})
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        position, reverse = self.decode_cursor(request)
+        field = self.keyset_field
+        # Sentido del recorrido de esta página: hacia atrás se invierte
+        descending = self.keyset_descending != reverse
+        after, order = ('lt', '-') if descending else ('gt', '')
+
+        if position is not None:
+            value, pk = position
+            queryset = queryset.filter(**{f'{field}__{after}e': value}).filter(
+                Q(**{f'{field}__{after}': value}) | Q(**{f'id__{after}': pk})
+            )
+        queryset = queryset.order_by(f'{order}{field}', f'{order}id')
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page_results = results
+        return results
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(encoded + padding).decode('ascii'))
+            value = datetime.fromisoformat(data['c'])
+            return (value, data['i']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance, reverse):
+        data = json.dumps({
+            'c': getattr(instance, self.keyset_field).isoformat(),
+            'i': str(instance.pk),
+            'r': 1 if reverse else 0,
+        }, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('ascii')).decode('ascii').rstrip('=')
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not getattr(self, 'keyset', False):
+            return super().get_next_link()
+        if not self.has_next or not self.page_results:
+            return None
+        return self.encode_cursor(self.page_results[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not getattr(self, 'keyset', False):
+            return super().get_previous_link()
+        if not self.has_previous or not self.page_results:
+            return None
+        return self.encode_cursor(self.page_results[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not getattr(self, 'keyset', False):
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
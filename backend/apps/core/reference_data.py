@@ -0,0 +1,159 @@
+"""
+Caché de datos de referencia por organización.
+
+Las rutas de escritura (ventas, lotes, alta de productos y vendedores) buscan
+una y otra vez la sucursal PRINCIPAL de la organización. Aquí se guarda en dos
+niveles:
+
+- una caché LRU en memoria del proceso (apps.core.lru) con
+  REFERENCE_CACHE_SIZE entradas, así que la memoria por worker queda acotada;
+- la caché `default` de Django, compartida entre workers si el backend lo es.
+
+Cada organización tiene una versión `tenant` en la caché de Django que cambia
+al confirmar una escritura de sus sucursales; las llaves incluyen la versión,
+así que no hace falta borrar nada. Las escrituras masivas que no emiten
+signals deben llamar a bump_reference_data.
+
+Igual que la caché de analítica, con LocMemCache cada worker solo ve los
+cambios de versión de sus propias escrituras; las entradas vencen a los
+REFERENCE_CACHE_TTL segundos en ambos niveles, lo que acota cuánto puede
+tardar otro worker en ver un cambio. Nombres, estados y porcentajes de
+comisión no se guardan aquí: se leen en la misma consulta que los usa.
+"""
+import threading
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from .lru import MISSING, LRUCache
+
+DEFAULT_BRANCH_CODE = 'PRINCIPAL'
+
+# Modelo -> versión que cambia al escribirlo
+REFERENCE_MODELS = {
+    'branches.Branch': 'tenant',
+}
+
+_local = LRUCache(settings.REFERENCE_CACHE_SIZE, ttl=settings.REFERENCE_CACHE_TTL)
+
+# Contadores del proceso además de los del LRU: shared_hit (encontrado en la
+# caché de Django) y load (leído de la base de datos)
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def count(name, amount=1):
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def reference_data_stats():
+    """
+    Contadores de este proceso. `hits`/`misses` son de la memoria del proceso;
+    cada miss se resuelve con la caché de Django (`shared_hits`) o con la base
+    de datos (`loads`).
+    """
+    with _counters_lock:
+        counters = dict(_counters)
+    return {
+        **_local.stats(),
+        'shared_hits': counters.get('shared_hit', 0),
+        'loads': counters.get('load', 0),
+    }
+
+
+def clear_local_reference_data():
+    _local.clear()
+
+
+def version_key(organization_id, kind):
+    return f'reference:version:{organization_id}:{kind}'
+
+
+def get_reference_version(organization_id, kind):
+    """Versión actual; si la caché no la tiene se genera una nueva."""
+    key = version_key(organization_id, kind)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_reference_data(organization_id, *kinds):
+    """
+    Cambia las versiones `kinds` ('tenant') de la organización al
+    confirmar la transacción actual (de inmediato si no hay una abierta).
+    """
+    if organization_id:
+        transaction.on_commit(lambda: cache.set_many(
+            {version_key(organization_id, kind): uuid.uuid4().hex for kind in kinds}, None
+        ))
+
+
+def invalidate_reference_data(sender, instance, **kwargs):
+    bump_reference_data(instance.organization_id, REFERENCE_MODELS[sender._meta.label])
+
+
+def connect_reference_data_signals():
+    from django.apps import apps
+
+    for label in REFERENCE_MODELS:
+        model = apps.get_model(label)
+        uid = f'reference_data:{model._meta.label_lower}'
+        post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=uid)
+        post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=uid)
+
+
+def get_many(keys, load):
+    """
+    Valores de `keys` desde la memoria del proceso, la caché de Django o, para
+    las que falten, `load(llaves faltantes)` -> dict llave -> valor.
+    """
+    values = {}
+    missing = []
+    for key in keys:
+        value = _local.get(key)
+        if value is MISSING:
+            missing.append(key)
+        else:
+            values[key] = value
+    if not missing:
+        return values
+
+    shared = cache.get_many(missing)
+    count('shared_hit', len(shared))
+    for key, value in shared.items():
+        _local.set(key, value)
+    values.update(shared)
+
+    missing = [key for key in missing if key not in shared]
+    if missing:
+        count('load', len(missing))
+        loaded = load(missing)
+        cache.set_many(loaded, settings.REFERENCE_CACHE_TTL)
+        for key, value in loaded.items():
+            _local.set(key, value)
+        values.update(loaded)
+    return values
+
+
+def load_default_branch_id(organization_id):
+    from apps.branches.models import Branch
+
+    branch_id = Branch.objects.filter(
+        organization_id=organization_id,
+        code=DEFAULT_BRANCH_CODE
+    ).values_list('id', flat=True).first()
+    return str(branch_id) if branch_id else None
+
+
+def get_default_branch_id(organization_id):
+    """ID de la sucursal PRINCIPAL de la organización, o None."""
+    if not organization_id:
+        return None
+    organization_id = str(organization_id)
+    key = f'reference:{organization_id}:default_branch:{get_reference_version(organization_id, "tenant")}'
+    return get_many([key], lambda keys: {key: load_default_branch_id(organization_id)})[key]
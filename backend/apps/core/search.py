@@ -0,0 +1,115 @@
+"""
+Búsqueda de texto con índices de Postgres para los listados (`?search=`).
+
+El SearchFilter de DRF busca con ILIKE '%término%' en cada columna, lo que
+ningún índice B-tree resuelve. Con SEARCH_BACKEND = 'postgres' los ViewSets
+que declaran `search_vector_field` buscan en cambio en:
+
+- una columna tsvector mantenida por un trigger (configuración `spanish`, con
+  raíces de palabras) sobre el texto plegado: minúsculas y sin acentos, con la
+  función SQL vnts_search_fold (ver la migración core 0004). Cada palabra del
+  término se busca como prefijo (`zapat:*`), con índice GIN;
+- y, si la base tiene pg_trgm, en `search_substring_fields` plegados con
+  LIKE '%término%' (subcadenas dentro de una palabra, como "cola" en
+  "Cocacola"), con los índices GIN trigram que crean las migraciones. Sin
+  pg_trgm esa parte se omite: recorrería todas las filas de la organización.
+
+Sin `?ordering=` explícito los resultados se ordenan por relevancia (ts_rank,
+con más peso al nombre) y después por el orden por defecto del ViewSet. Con
+SEARCH_BACKEND = 'basic' se usa el SearchFilter de DRF con `search_fields`.
+"""
+import re
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Func, Q, TextField
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+SEARCH_CONFIG = 'spanish'
+
+# Debe coincidir con la función SQL vnts_search_fold (migración core 0004)
+FOLD_FROM = 'ÁÀÄÂÃÉÈËÊÍÌÏÎÓÒÖÔÕÚÙÜÛÑÇáàäâãéèëêíìïîóòöôõúùüûñç'
+FOLD_TO = 'aaaaaeeeeiiiiooooouuuuncaaaaaeeeeiiiiooooouuuunc'
+FOLD_TABLE = str.maketrans(FOLD_FROM, FOLD_TO)
+
+# pg_trgm instalado, por alias de base de datos (se consulta una vez por proceso)
+_trigram_available = {}
+
+
+def fold_search_text(text):
+    """Igual que vnts_search_fold: minúsculas y sin acentos."""
+    return text.lower().translate(FOLD_TABLE)
+
+
+def prefix_tsquery(text):
+    """
+    tsquery en formato `raw` que exige todas las palabras como prefijo, o None
+    si el texto no tiene palabras. Solo se usan caracteres de palabra, así que
+    el término no puede inyectar operadores de tsquery.
+    """
+    words = re.findall(r'\w+', fold_search_text(text))
+    if not words:
+        return None
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def trigram_available(using):
+    if using not in _trigram_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[using] = cursor.fetchone() is not None
+    return _trigram_available[using]
+
+
+class SearchFold(Func):
+    function = 'vnts_search_fold'
+    output_field = TextField()
+
+
+class TenantSearchFilter(SearchFilter):
+    """
+    SearchFilter con el backend de SEARCH_BACKEND. Va después del filtro de
+    ordenamiento para poder anteponer la relevancia al orden por defecto.
+
+    Atributos del ViewSet:
+    - search_vector_field: columna tsvector mantenida por trigger.
+    - search_substring_fields: columnas con índice trigram sobre
+      vnts_search_fold(columna), si hay pg_trgm.
+    - search_ranked: False para conservar el orden del ViewSet en lugar de
+      ordenar por relevancia.
+    - search_fields: se usan con SEARCH_BACKEND = 'basic'.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        vector_field = getattr(view, 'search_vector_field', None)
+        if settings.SEARCH_BACKEND != 'postgres' or not vector_field:
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        text = fold_search_text(' '.join(terms))
+        raw_query = prefix_tsquery(text)
+        query = SearchQuery(raw_query, config=SEARCH_CONFIG, search_type='raw') if raw_query else None
+
+        matches = Q(**{vector_field: query}) if query else Q()
+        substring_fields = getattr(view, 'search_substring_fields', ())
+        if substring_fields and trigram_available(queryset.db):
+            for field in substring_fields:
+                matches |= Q(**{f'{field}_folded__contains': text})
+            queryset = queryset.alias(**{f'{field}_folded': SearchFold(field) for field in substring_fields})
+        if not matches:
+            return queryset.none()
+        queryset = queryset.filter(matches)
+
+        if (
+            query is None
+            or not getattr(view, 'search_ranked', True)
+            or request.query_params.get(api_settings.ORDERING_PARAM)
+        ):
+            return queryset
+        return queryset.alias(search_rank=SearchRank(F(vector_field), query)).order_by(
+            '-search_rank', *queryset.query.order_by
+        )
@@ -0,0 +1,77 @@
+"""
+Agrupación de llamadas idénticas concurrentes (single-flight).
+
+Si varias peticiones del mismo proceso piden a la vez el mismo resultado, solo
+la primera lo calcula y las demás esperan y reciben ese mismo resultado. Entre
+procesos se puede serializar el cálculo con un advisory lock de Postgres.
+"""
+import hashlib
+import threading
+from contextlib import contextmanager
+from django.db import connection
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Ejecuta `fn` una sola vez por llave entre los hilos que la piden al mismo tiempo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Devuelve (resultado, compartido). `compartido` es True si el resultado
+        lo calculó otro hilo. Las excepciones también se comparten.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def lock_id(key):
+    """Entero de 64 bits con signo para pg_advisory_lock a partir de una llave de texto."""
+    digest = hashlib.sha256(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+
+@contextmanager
+def advisory_lock(key):
+    """
+    Advisory lock de sesión en Postgres: entre workers, solo uno a la vez
+    ejecuta el bloque para la misma llave.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', [lock_id(key)])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_id(key)])
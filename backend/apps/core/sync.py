@@ -0,0 +1,206 @@
+"""
+Sincronización incremental por cambios (change feed).
+
+Los listados con ChangeFeedMixin aceptan `?updated_since=<fecha ISO>` y
+devuelven solo los objetos creados o modificados después de esa fecha, los IDs
+eliminados desde entonces (tabla tombstones, solo en la primera página y hasta
+SYNC_MAX_TOMBSTONES; con más se responde 410 y el cliente recarga la colección
+completa) y `synced_at`, el valor a enviar
+como updated_since en la siguiente sincronización. Así el costo depende de
+cuántos objetos cambiaron y no del tamaño del catálogo. Con `?updated_since=`
+vacío se obtiene la colección completa junto con el primer `synced_at`.
+
+El cambio se pagina por cursor sobre (updated_at, id) y no con OFFSET: un
+objeto modificado mientras el cliente recorre las páginas pasa al final, y con
+OFFSET las filas siguientes se recorrerían una posición y una quedaría sin
+enviarse.
+
+`synced_at` nunca es posterior al inicio de la transacción abierta más antigua
+de las conexiones de la aplicación: una escritura que todavía no confirma puede
+tener un updated_at anterior al momento de la consulta y no debe quedar atrás
+del cursor. Por eso una sincronización puede repetir algunos objetos, y el
+cliente debe aplicar los cambios como reemplazos. Los procesos internos de
+Postgres (autovacuum) y la conexión propia no cuentan, y una transacción muy
+larga (una sesión `idle in transaction`, un comando de mantenimiento) solo
+atrasa `synced_at` hasta SYNC_CURSOR_MAX_LAG_SECONDS.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from .models import Tombstone
+from .utils import request_organization_id
+
+UPDATED_SINCE_PARAM = 'updated_since'
+
+# Modelos con ViewSet sincronizable: sus eliminaciones se registran en tombstones
+SYNC_MODELS = (
+    'branches.Branch',
+    'clients.Client',
+    'payments.PaymentMethod',
+    'products.Product',
+    'sales.Sale',
+    'sellers.Seller',
+)
+
+SYNC_CURSOR_SQL = """
+    SELECT GREATEST(
+        LEAST(NOW(), COALESCE(MIN(xact_start), NOW())),
+        NOW() - make_interval(secs => %s)
+    )
+    FROM pg_stat_activity
+    WHERE datname = current_database()
+      AND backend_type = 'client backend'
+      AND pid <> pg_backend_pid()
+      AND xact_start IS NOT NULL
+"""
+
+
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    from apps.organizations.models import Organization
+
+    # Al borrar la organización se borra todo; no hay a quién avisar
+    if isinstance(origin, Organization) or getattr(origin, 'model', None) is Organization:
+        return
+    Tombstone.objects.create(
+        organization_id=instance.organization_id,
+        model=sender._meta.label_lower,
+        object_id=instance.pk
+    )
+
+
+def touch_m2m_change(sender, instance, action, model, pk_set, **kwargs):
+    """
+    Asignar o quitar sucursales cambia los datos de ambos lados (branch_ids,
+    assigned_branches, conteos), así que se actualiza su updated_at.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    now = timezone.now()
+    type(instance).objects.filter(pk=instance.pk).update(updated_at=now)
+    if pk_set:
+        model.objects.filter(pk__in=pk_set).update(updated_at=now)
+
+
+def connect_sync_signals():
+    from django.apps import apps
+
+    models = [apps.get_model(label) for label in SYNC_MODELS]
+    for model in models:
+        post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'tombstone:{model._meta.label_lower}')
+        for field in model._meta.local_many_to_many:
+            if field.related_model in models:
+                through = field.remote_field.through
+                m2m_changed.connect(touch_m2m_change, sender=through, dispatch_uid=f'sync:{through._meta.label_lower}')
+
+
+def sync_cursor():
+    """Fecha hasta la que los cambios ya son visibles para todas las transacciones."""
+    with connection.cursor() as cursor:
+        cursor.execute(SYNC_CURSOR_SQL, [settings.SYNC_CURSOR_MAX_LAG_SECONDS])
+        cursor_time = cursor.fetchone()[0]
+    return cursor_time - timedelta(seconds=settings.SYNC_CURSOR_MARGIN_SECONDS)
+
+
+def parse_updated_since(value):
+    """Fecha con zona horaria, o None si el valor no es una fecha válida."""
+    value = value.strip()
+    # Un "+" sin codificar en la URL llega como espacio: 2026-01-01T10:00:00 06:00
+    if 'T' in value:
+        value = value.replace(' ', '+')
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ChangeFeedMixin:
+    """
+    Mixin para ViewSets de TenantModel: `?updated_since=` en list.
+
+    updated_since_fields son las columnas cuya modificación cuenta como cambio
+    del objeto (por ejemplo, las estadísticas de compra de un cliente).
+    """
+    updated_since_fields = ('updated_at',)
+
+    def is_change_feed(self):
+        return self.action == 'list' and UPDATED_SINCE_PARAM in self.request.query_params
+
+    def get_pagination_keyset(self):
+        """En el cambio, cursor por (updated_at, id) ascendente (ver KeysetPagination)."""
+        return ('updated_at', False) if self.is_change_feed() else None
+
+    def get_updated_since(self):
+        value = self.request.query_params.get(UPDATED_SINCE_PARAM)
+        return parse_updated_since(value) if value else None
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.is_change_feed():
+            return queryset
+
+        since = self.get_updated_since()
+        if since is not None:
+            changed = Q()
+            for field in self.updated_since_fields:
+                changed |= Q(**{f'{field}__gt': since})
+            queryset = queryset.filter(changed)
+        # Orden estable para recorrer las páginas del cambio
+        return queryset.order_by('updated_at', 'id')
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_change_feed():
+            return super().list(request, *args, **kwargs)
+
+        since = self.get_updated_since()
+        if since is None and request.query_params[UPDATED_SINCE_PARAM]:
+            return Response(
+                {'error': 'updated_since debe ser una fecha ISO 8601'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if since and since < timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS):
+            # Las eliminaciones más antiguas ya se purgaron: hace falta una carga completa
+            return Response(
+                {'error': f'updated_since es anterior a {settings.TOMBSTONE_RETENTION_DAYS} días; descarga la colección completa'},
+                status=status.HTTP_410_GONE
+            )
+
+        # Antes de leer los datos, para no perder cambios que confirmen durante la consulta
+        synced_at = sync_cursor()
+
+        # Las eliminaciones van solo en la primera página; las siguientes llegan con ?cursor=
+        first_page = self.paginator.cursor_query_param not in request.query_params
+        deleted = []
+        organization_id = request_organization_id(request)
+        if first_page and organization_id and since:
+            limit = settings.SYNC_MAX_TOMBSTONES
+            deleted = list(Tombstone.objects.filter(
+                organization_id=organization_id,
+                model=self.get_queryset().model._meta.label_lower,
+                created_at__gt=since
+            ).values_list('object_id', flat=True).distinct()[:limit + 1])
+            if len(deleted) > limit:
+                # Más eliminaciones de las que conviene enviar: sale más barato recargar todo
+                return Response(
+                    {'error': f'Más de {limit} eliminaciones desde updated_since; descarga la colección completa'},
+                    status=status.HTTP_410_GONE
+                )
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+
+        data = response.data if isinstance(response.data, dict) else {'results': response.data}
+        if first_page:
+            data['deleted'] = deleted
+        data['synced_at'] = synced_at.isoformat()
+        response.data = data
+        return response
@@ -0,0 +1,62 @@
+"""
+Encabezado Idempotency-Key (apps.core.idempotency).
+"""
+from decimal import Decimal
+from unittest import mock
+from rest_framework.test import APITestCase
+from apps.core.models import IdempotencyKey
+from apps.organizations.models import Organization
+from apps.products.models import Product
+from apps.products.views import ProductViewSet
+from apps.users.models import User
+
+
+class IdempotencyTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Idempotencia', slug='idempotencia')
+        cls.user = User.objects.create_user(email='caja@idempotencia.test', organization=cls.organization)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def post(self, key, name='Producto'):
+        return self.client.post(
+            '/api/v1/products/',
+            {'name': name, 'price': '10.00'},
+            format='json',
+            HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_response(self):
+        first = self.post('llave-1')
+        self.assertEqual(first.status_code, 201, first.content)
+
+        retry = self.post('llave-1')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json()['id'], first.json()['id'])
+        self.assertEqual(Product.objects.filter(organization=self.organization).count(), 1)
+
+        self.assertEqual(self.post('llave-1', name='Otro').status_code, 422)
+
+    def test_failed_request_leaves_no_key(self):
+        """La llave se guarda con la escritura: si la acción falla no queda reservada."""
+        with mock.patch.object(ProductViewSet, 'perform_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post('llave-2')
+        self.assertFalse(IdempotencyKey.objects.filter(key='llave-2').exists())
+
+        retry = self.post('llave-2')
+        self.assertEqual(retry.status_code, 201, retry.content)
+        self.assertNotIn('Idempotent-Replayed', retry)
+
+    def test_retry_of_delete_replays_empty_response(self):
+        product = Product.objects.create(organization=self.organization, name='Producto', price=Decimal('10.00'))
+        url = f'/api/v1/products/{product.id}/'
+        self.assertEqual(self.client.delete(url, HTTP_IDEMPOTENCY_KEY='llave-3').status_code, 204)
+
+        retry = self.client.delete(url, HTTP_IDEMPOTENCY_KEY='llave-3')
+        self.assertEqual(retry.status_code, 204)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
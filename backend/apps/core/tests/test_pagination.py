@@ -0,0 +1,65 @@
+"""
+Paginación por cursor (apps.core.pagination.KeysetPagination).
+"""
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.core.pagination import KeysetPagination
+from apps.organizations.models import Organization
+from apps.products.models import Product
+
+
+@mock.patch.object(KeysetPagination, 'page_size', 2)
+class KeysetPaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Cursor', slug='cursor')
+        products = [
+            Product.objects.create(organization=cls.organization, name=f'Producto {i}', price=Decimal('10.00'))
+            for i in range(7)
+        ]
+        # Dos pares con el mismo created_at: el ID desempata
+        now = timezone.now()
+        for i, product in enumerate(products):
+            product.created_at = now - timedelta(minutes=i // 2 * 2 if i < 4 else i)
+        Product.objects.bulk_update(products, ['created_at'])
+        cls.expected = [
+            str(product.id)
+            for product in sorted(products, key=lambda p: (p.created_at, uuid.UUID(str(p.id))), reverse=True)
+        ]
+
+    def fetch(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, page):
+        return [item['id'] for item in page['results']]
+
+    def test_cursor_round_trip(self):
+        """Siguiendo `next` se recorren todas las filas una vez, en orden; `previous` regresa por las mismas páginas."""
+        page = self.fetch(f'/api/v1/products/?organization_id={self.organization.id}&pagination=cursor')
+        self.assertNotIn('count', page)
+        self.assertIsNone(page['previous'])
+
+        pages = [self.ids(page)]
+        while page['next']:
+            page = self.fetch(page['next'])
+            pages.append(self.ids(page))
+        self.assertEqual([item for ids in pages for item in ids], self.expected)
+        self.assertEqual([len(ids) for ids in pages], [2, 2, 2, 1])
+
+        for expected in reversed(pages[:-1]):
+            page = self.fetch(page['previous'])
+            self.assertEqual(self.ids(page), expected)
+        self.assertIsNone(page['previous'])
+        self.assertIsNotNone(page['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'/api/v1/products/?organization_id={self.organization.id}&cursor=no-es-un-cursor')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['detail'], 'Cursor inválido')
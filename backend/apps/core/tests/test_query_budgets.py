@@ -0,0 +1,235 @@
+"""
+Presupuesto de consultas SQL por endpoint.
+
+Cada endpoint se llama para un tenant chico y uno grande: el número de consultas
+debe ser el mismo en ambos (no crece con las filas) y no superar el presupuesto.
+Si falla, el mensaje incluye el SQL ejecutado para ubicar el N+1.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.branches.models import Branch
+from apps.clients.models import Client
+from apps.core.reference_data import clear_local_reference_data
+from apps.core.search import trigram_available
+from apps.organizations.models import Organization
+from apps.payments.models import PaymentMethod
+from apps.products.lookup import lookup_cache
+from apps.products.models import Product
+from apps.sales.models import Sale, SaleItem
+from apps.sales.rollups import rebuild_sales_rollup
+from apps.sellers.models import Seller
+
+
+# (nombre, ruta, presupuesto). Las rutas se completan con los IDs de cada tenant.
+# Los listados y detalles de TenantModel incluyen la lectura de change_stamps.
+ENDPOINTS = [
+    ('organizations-list', '/api/v1/organizations/', 2),
+    ('organizations-detail', '/api/v1/organizations/{slug}/', 1),
+    ('branches-list', '/api/v1/branches/', 3),
+    ('branches-detail', '/api/v1/branches/{branch}/', 4),
+    ('branches-catalog', '/api/v1/branches/{branch}/catalog/', 6),
+    ('sellers-list', '/api/v1/sellers/', 4),
+    ('sellers-detail', '/api/v1/sellers/{seller}/', 3),
+    ('products-list', '/api/v1/products/', 4),
+    ('products-list-branch', '/api/v1/products/?branch_id={branch}', 4),
+    ('products-detail', '/api/v1/products/{product}/', 3),
+    ('products-changes', '/api/v1/products/?updated_since=', 5),
+    ('products-search', '/api/v1/products/?search=producto', 4),
+    ('products-lookup', '/api/v1/products/lookup/?branch_id={branch}&code=SKU-0', 2),
+    ('products-lookup-bulk', '/api/v1/products/lookup/?branch_id={branch}&codes=SKU-0,SKU-1,NO-EXISTE', 2),
+    ('clients-list', '/api/v1/clients/', 3),
+    ('clients-list-by-spent', '/api/v1/clients/?ordering=-total_spent', 3),
+    ('clients-detail', '/api/v1/clients/{client}/', 2),
+    ('clients-search', '/api/v1/clients/?search=cliente', 3),
+    ('clients-autocomplete', '/api/v1/clients/autocomplete/?q=cli&seller_id={seller}', 1),
+    ('payment-methods-list', '/api/v1/payments/methods/', 3),
+    ('payment-methods-detail', '/api/v1/payments/methods/{payment_method}/', 2),
+    ('sales-list', '/api/v1/sales/', 4),
+    ('sales-list-cursor', '/api/v1/sales/?pagination=cursor', 3),
+    ('sales-search', '/api/v1/sales/?search=cliente', 4),
+    ('sales-search-cursor', '/api/v1/sales/?search=cliente&pagination=cursor', 3),
+    ('sales-detail', '/api/v1/sales/{sale}/', 3),
+    ('sales-summary', '/api/v1/sales/summary/', 1),
+    ('sales-by-seller', '/api/v1/sales/by_seller/', 1),
+    ('sales-by-payment-method', '/api/v1/sales/by_payment_method/', 1),
+    ('sales-seller-commissions', '/api/v1/sales/seller_commissions/', 1),
+    ('sales-top-products', '/api/v1/sales/top_products/', 1),
+    ('sales-top-products-range', '/api/v1/sales/top_products/?start=2020-01-01&end=2030-12-31&branch_id={branch}&limit=5', 1),
+    ('sales-by-category', '/api/v1/sales/by_category/', 1),
+    ('sales-client-stats', '/api/v1/sales/client_stats/', 1),
+    ('sales-timeseries', '/api/v1/sales/timeseries/?granularity=day', 1),
+    ('sales-dashboard', '/api/v1/sales/dashboard/', 6),
+    ('sales-export', '/api/v1/sales/export/', 2),
+]
+
+
+def seed_tenant(name, scale):
+    """
+    Crea una organización con catálogo y ventas proporcionales a `scale`,
+    repartidas en los últimos 30 días.
+    """
+    rng = random.Random(scale)
+    organization = Organization.objects.create(name=name, slug=name.lower())
+    principal = Branch.objects.get(organization=organization, code='PRINCIPAL')
+    branches = [principal] + Branch.objects.bulk_create([
+        Branch(organization=organization, name=f'Sucursal {i}', code=f'S{i}')
+        for i in range(scale)
+    ])
+
+    sellers = Seller.objects.bulk_create([
+        Seller(
+            organization=organization, name=f'Vendedor {i}', numeric_code=str(100 + i),
+            commission_percentage=Decimal('5.00')
+        )
+        for i in range(2 * scale)
+    ])
+    payment_methods = PaymentMethod.objects.bulk_create([
+        PaymentMethod(organization=organization, name=name, commission_percentage=Decimal(commission))
+        for name, commission in [('Efectivo', '0'), ('Tarjeta', '3.50'), ('Transferencia', '1.00')]
+    ])
+    clients = Client.objects.bulk_create([
+        Client(organization=organization, name=f'Cliente {i}')
+        for i in range(6 * scale)
+    ])
+    products = Product.objects.bulk_create([
+        Product(
+            organization=organization, name=f'Producto {i}', price=Decimal('9.50') + i,
+            category=f'Categoría {i % 4}', sku=f'SKU-{i}'
+        )
+        for i in range(8 * scale)
+    ])
+
+    for branch in branches:
+        branch.sellers.add(*rng.sample(sellers, min(len(sellers), 3)))
+    Product.branches.through.objects.bulk_create([
+        Product.branches.through(product_id=product.id, branch_id=branch.id)
+        for product in products
+        for branch in rng.sample(branches, min(len(branches), 2))
+    ])
+
+    now = timezone.now()
+    sales = []
+    items = []
+    for _ in range(30 * scale):
+        lines = rng.sample(products, rng.randint(1, min(len(products), 5)))
+        sale = Sale(
+            organization=organization,
+            branch=rng.choice(branches),
+            seller=rng.choice(sellers),
+            client=rng.choice(clients),
+            payment_method=rng.choice(payment_methods),
+            total=sum(product.price for product in lines)
+        )
+        sales.append(sale)
+        items.extend(
+            SaleItem(
+                organization=organization, sale=sale, product=product,
+                quantity=1, price=product.price, subtotal=product.price
+            )
+            for product in lines
+        )
+    Sale.objects.bulk_create(sales)
+    SaleItem.objects.bulk_create(items)
+
+    # bulk_create ignora created_at por auto_now_add; repartir las ventas en el mes
+    for sale in sales:
+        sale.created_at = now - timedelta(minutes=rng.randint(0, 30 * 24 * 60))
+    Sale.objects.bulk_update(sales, ['created_at'])
+    rebuild_sales_rollup(organization.id)
+
+    return {
+        'organization': organization.id,
+        'slug': organization.slug,
+        'branch': principal.id,
+        'seller': sellers[0].id,
+        'product': products[0].id,
+        'client': clients[0].id,
+        'payment_method': payment_methods[0].id,
+        'sale': sales[0].id,
+    }
+
+
+# Sin caché de analítica: se mide el trabajo real de cada endpoint
+@override_settings(ANALYTICS_CACHE_ENABLED=False)
+class QueryBudgetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.small = seed_tenant('Chica', scale=1)
+        cls.large = seed_tenant('Grande', scale=10)
+        # La detección de pg_trgm se hace una vez por proceso; no contarla en ?search=
+        trigram_available(connection.alias)
+
+    def setUp(self):
+        # Las cachés sobreviven al rollback de cada prueba
+        cache.clear()
+        clear_local_reference_data()
+        lookup_cache.clear()
+
+    def capture(self, path, tenant):
+        url = path.format(**tenant)
+        separator = '&' if '?' in url else '?'
+        url = f'{url}{separator}organization_id={tenant["organization"]}'
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200, f'GET {url} respondió {response.status_code}')
+        return context.captured_queries
+
+    def format_queries(self, queries):
+        return '\n'.join(f'  {number}. {query["sql"]}' for number, query in enumerate(queries, start=1))
+
+    def test_query_budgets(self):
+        for name, path, budget in ENDPOINTS:
+            with self.subTest(endpoint=name):
+                # Cada endpoint en frío, sin lo que cargaron los anteriores
+                self.setUp()
+                small_queries = self.capture(path, self.small)
+                large_queries = self.capture(path, self.large)
+
+                self.assertLessEqual(
+                    len(large_queries), budget,
+                    f'{name}: {len(large_queries)} consultas, presupuesto {budget}\n'
+                    f'{self.format_queries(large_queries)}'
+                )
+                self.assertEqual(
+                    len(small_queries), len(large_queries),
+                    f'{name}: las consultas crecen con el volumen '
+                    f'({len(small_queries)} -> {len(large_queries)})\n'
+                    f'{self.format_queries(large_queries)}'
+                )
+
+    def test_not_modified(self):
+        """Una petición condicional vigente responde 304 con una sola consulta."""
+        for name, path, _ in ENDPOINTS:
+            if not name.endswith(('-list', '-detail')) or name.startswith('organizations'):
+                continue
+            with self.subTest(endpoint=name):
+                url = f'{path.format(**self.large)}?organization_id={self.large["organization"]}'
+                etag = self.client.get(url)['ETag']
+
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(len(context.captured_queries), 1, self.format_queries(context.captured_queries))
+
+    def test_write_changes_etag(self):
+        url = f'/api/v1/products/?organization_id={self.large["organization"]}'
+        products_etag = self.client.get(url)['ETag']
+        clients_url = f'/api/v1/clients/?organization_id={self.large["organization"]}'
+        clients_etag = self.client.get(clients_url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.large['product']).get().save()
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=products_etag).status_code, 200)
+        self.assertEqual(self.client.get(clients_url, HTTP_IF_NONE_MATCH=clients_etag).status_code, 304)
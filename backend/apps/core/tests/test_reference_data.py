@@ -0,0 +1,59 @@
+"""
+Caché de datos de referencia por organización (apps.core.reference_data).
+"""
+from decimal import Decimal
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from apps.core.reference_data import clear_local_reference_data, reference_data_stats
+from apps.payments.models import PaymentMethod
+from apps.products.models import Product
+from apps.sales.tests.utils import create_tenant
+
+
+class ReferenceDataTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant('Referencia')
+        tenant = cls.tenant
+        cls.product = tenant['products'][0]
+        cls.payload = {
+            'organization_id': str(tenant['organization'].id), 'seller_id': str(tenant['seller'].id),
+            'client_id': str(tenant['client'].id), 'payment_method_id': str(tenant['payment_method'].id),
+            'total': '10.00', 'items': [{'product_id': str(cls.product.id), 'quantity': 1, 'price': '10.00'}],
+        }
+
+    def setUp(self):
+        # Las cachés sobreviven al rollback de cada prueba
+        cache.clear()
+        clear_local_reference_data()
+
+    def test_default_branch_from_cache(self):
+        response = self.client.post('/api/v1/sales/', self.payload, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['branch'], str(self.tenant['branch'].id))
+
+        loads = reference_data_stats()['loads']
+        self.assertEqual(self.client.post('/api/v1/sales/', self.payload, format='json').status_code, 201)
+        self.assertEqual(reference_data_stats()['loads'], loads)
+
+    def test_product_state_read_from_database(self):
+        self.assertEqual(self.client.post('/api/v1/sales/', self.payload, format='json').status_code, 201)
+        # Sin signals ni cambio de versión, como una escritura vista desde otro worker
+        Product.objects.filter(pk=self.product.pk).update(active=False)
+        self.assertEqual(self.client.post('/api/v1/sales/', self.payload, format='json').status_code, 400)
+
+    def test_names_and_commission_read_from_database(self):
+        """Nombres y porcentajes salen de la misma consulta agrupada, sin caché de referencia."""
+        self.client.post('/api/v1/sales/', self.payload, format='json')
+        url = f'/api/v1/sales/by_payment_method/?organization_id={self.tenant["organization"].id}'
+        self.client.get(url)
+
+        payment_method = self.tenant['payment_method']
+        PaymentMethod.objects.filter(pk=payment_method.pk).update(
+            name='Tarjeta de crédito', commission_percentage=Decimal('7.25')
+        )
+        with self.settings(ANALYTICS_CACHE_ENABLED=False):
+            rows = self.client.get(url).json()
+        self.assertEqual(rows[0]['payment_method__name'], 'Tarjeta de crédito')
+        self.assertEqual(rows[0]['commissionPercentage'], 7.25)
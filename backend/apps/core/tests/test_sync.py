@@ -0,0 +1,79 @@
+"""
+Sincronización incremental (?updated_since=, apps.core.sync).
+"""
+from decimal import Decimal
+from unittest import mock
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from apps.core.pagination import KeysetPagination
+from apps.organizations.models import Organization
+from apps.products.models import Product
+
+
+class ChangeFeedTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Sync', slug='sync')
+        cls.products = [
+            Product.objects.create(organization=cls.organization, name=f'Producto {i}', price=Decimal('10.00'))
+            for i in range(5)
+        ]
+
+    def fetch(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    @mock.patch.object(KeysetPagination, 'page_size', 2)
+    def test_update_while_paging_skips_nothing(self):
+        """Un objeto modificado entre dos páginas no desplaza a los demás."""
+        page = self.fetch(f'/api/v1/products/?organization_id={self.organization.id}&updated_since=')
+        self.assertNotIn('count', page)
+        seen = [item['id'] for item in page['results']]
+
+        # Ya enviado: pasa al final del cambio
+        product = Product.objects.get(pk=seen[0])
+        product.name = 'Producto editado'
+        product.save()
+
+        while page['next']:
+            page = self.fetch(page['next'])
+            seen.extend(item['id'] for item in page['results'])
+
+        self.assertEqual(set(seen), {str(product.id) for product in self.products})
+        self.assertEqual(seen[-1], str(product.id))
+
+    @mock.patch.object(KeysetPagination, 'page_size', 2)
+    def test_pages_follow_updated_at(self):
+        for product in reversed(self.products):
+            product.save()
+        url = f'/api/v1/products/?organization_id={self.organization.id}&updated_since='
+        page = self.fetch(url)
+        names = [item['name'] for item in page['results']]
+        while page['next']:
+            page = self.fetch(page['next'])
+            names.extend(item['name'] for item in page['results'])
+        self.assertEqual(names, [f'Producto {i}' for i in reversed(range(5))])
+
+    @mock.patch.object(KeysetPagination, 'page_size', 2)
+    def test_deleted_only_on_first_page_and_capped(self):
+        since = timezone.now().isoformat()
+        deleted = {str(product.id) for product in self.products[:3]}
+        Product.objects.filter(pk__in=deleted).delete()
+        # Cambios posteriores para que haya más de una página
+        for product in self.products[3:]:
+            product.save()
+        Product.objects.create(organization=self.organization, name='Producto nuevo', price=Decimal('10.00'))
+        url = '/api/v1/products/'
+        params = {'organization_id': self.organization.id, 'updated_since': since}
+
+        page = self.client.get(url, params).json()
+        self.assertEqual(set(page['deleted']), deleted)
+
+        with override_settings(SYNC_MAX_TOMBSTONES=2):
+            self.assertEqual(self.client.get(url, params).status_code, 410)
+
+        self.assertTrue(page['next'])
+        self.assertNotIn('deleted', self.fetch(page['next']))
@@ -1,8 +1,12 @@
 """
 Utilidades comunes para todas las apps
 """
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time
 from django.conf import settings
+from django.db import close_old_connections, connection
 import pytz
 
 
@@ -41,3 +45,74 @@ def parse_date_filter(date_string):
     except (ValueError, Exception) as e:
         print(f"Error parsing date: {e}")
         return None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Pool de hilos del proceso para run_parallel. Se crea en el primer uso (ya
+    dentro del worker de gunicorn) y tiene ANALYTICS_PARALLEL_WORKERS hilos,
+    así que cada worker abre como máximo esas conexiones adicionales.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ANALYTICS_PARALLEL_WORKERS,
+                thread_name_prefix='analytics'
+            )
+        return _executor
+
+
+def run_parallel(tasks):
+    """
+    Ejecuta consultas independientes en paralelo en el pool del proceso.
+    Cada hilo conserva su conexión entre peticiones, igual que el hilo de la
+    petición, y la renueva según CONN_MAX_AGE.
+    
+    Args:
+        tasks: dict de nombre -> callable sin argumentos
+        
+    Returns:
+        dict: nombre -> resultado de cada callable
+    
+    Si hay una transacción abierta (p. ej. ATOMIC_REQUESTS o pruebas) se ejecuta
+    en serie, porque otras conexiones no verían los datos sin confirmar.
+    """
+    if (
+        not getattr(settings, 'ANALYTICS_PARALLEL_QUERIES', False)
+        or connection.in_atomic_block
+        or len(tasks) < 2
+    ):
+        return {name: task() for name, task in tasks.items()}
+    
+    def run(task):
+        # Lo mismo que hace Django al empezar y terminar cada petición:
+        # descartar conexiones vencidas o con error, sin cerrar las sanas
+        close_old_connections()
+        try:
+            return task()
+        finally:
+            close_old_connections()
+    
+    executor = get_executor()
+    futures = {name: executor.submit(run, task) for name, task in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def request_organization_id(request):
+    """
+    Organización de una petición de lectura: la del usuario autenticado o el
+    query param organization_id. None si no hay o no es un UUID válido.
+    """
+    user = request.user
+    if user.is_authenticated and getattr(user, 'organization_id', None):
+        return str(user.organization_id)
+    org_id = request.query_params.get('organization_id')
+    try:
+        return str(uuid.UUID(org_id)) if org_id else None
+    except ValueError:
+        return None
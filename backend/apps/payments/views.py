@@ -1,10 +1,12 @@
 from rest_framework import viewsets, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.change_stamps import ConditionalGetMixin
+from apps.core.sync import ChangeFeedMixin
 from .models import PaymentMethod
 from .serializers import PaymentMethodSerializer
 
 
-class PaymentMethodViewSet(viewsets.ModelViewSet):
+class PaymentMethodViewSet(ConditionalGetMixin, ChangeFeedMixin, viewsets.ModelViewSet):
     serializer_class = PaymentMethodSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
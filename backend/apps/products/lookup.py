@@ -0,0 +1,77 @@
+"""
+Resolución de códigos escaneados (código de barras o SKU) a productos.
+
+Cada código se busca en los índices únicos (organización, barcode) y
+(organización, sku); varios códigos se resuelven en la misma consulta. El
+resultado trae el precio y si el producto se puede vender en la sucursal
+(activo y asignado a ella).
+
+Delante hay una caché LRU en memoria del proceso (PRODUCT_LOOKUP_CACHE_SIZE
+códigos) cuya llave incluye la versión del catálogo de la sucursal
+(apps.branches.catalog): cualquier escritura de productos o sucursales de la
+organización cambia la versión, así que no hace falta invalidar nada. Un
+código resuelto desde la caché solo cuesta la consulta de la versión. También
+se guardan los códigos que no existen, para que un escaneo repetido de un
+código desconocido no vuelva a la base de datos.
+"""
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from apps.branches.catalog import branch_catalog_version
+from apps.core.lru import MISSING, LRUCache
+from .models import Product
+
+# Códigos por petición en la búsqueda masiva
+MAX_LOOKUP_CODES = 500
+
+LOOKUP_FIELDS = ('id', 'name', 'sku', 'barcode', 'price', 'category', 'active')
+
+lookup_cache = LRUCache(settings.PRODUCT_LOOKUP_CACHE_SIZE)
+
+
+def normalize_codes(codes):
+    """Códigos sin espacios alrededor, sin vacíos ni repetidos, en el orden recibido."""
+    return list(dict.fromkeys(code.strip() for code in codes if code and code.strip()))
+
+
+def fetch_products(organization_id, branch_id, codes):
+    """Producto de cada código encontrado; el código de barras tiene prioridad sobre el SKU."""
+    in_branch = Product.branches.through.objects.filter(product_id=OuterRef('pk'), branch_id=branch_id)
+    rows = (
+        Product.objects.filter(organization_id=organization_id)
+        .filter(Q(barcode__in=codes) | Q(sku__in=codes))
+        .annotate(in_branch=Exists(in_branch))
+        .order_by()
+        .values(*LOOKUP_FIELDS, 'in_branch')
+    )
+
+    found = {}
+    for row in rows:
+        product = {field: row[field] for field in LOOKUP_FIELDS}
+        product['available'] = row['active'] and row['in_branch']
+        if row['barcode'] in codes:
+            found[row['barcode']] = product
+        if row['sku'] in codes:
+            found.setdefault(row['sku'], product)
+    return found
+
+
+def lookup_products(organization_id, branch_id, codes):
+    """
+    Dict código -> producto (None si no existe en la organización) para los
+    códigos de `codes`, ya normalizados.
+    """
+    version = branch_catalog_version(organization_id, branch_id)
+    results = {}
+    missing = []
+    for code in codes:
+        product = lookup_cache.get((organization_id, branch_id, version, code))
+        if product is MISSING:
+            missing.append(code)
+        results[code] = product
+
+    if missing:
+        found = fetch_products(organization_id, branch_id, set(missing))
+        for code in missing:
+            results[code] = found.get(code)
+            lookup_cache.set((organization_id, branch_id, version, code), results[code])
+    return results
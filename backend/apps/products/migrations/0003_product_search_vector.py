@@ -0,0 +1,63 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+CREATE_TRIGGER = """
+    CREATE FUNCTION products_search_vector_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('spanish', vnts_search_fold(coalesce(NEW.name, ''))), 'A') ||
+            setweight(to_tsvector('spanish', vnts_search_fold(coalesce(NEW.category, ''))), 'B') ||
+            setweight(to_tsvector('spanish', vnts_search_fold(coalesce(NEW.description, ''))), 'C');
+        RETURN NEW;
+    END
+    $$;
+
+    CREATE TRIGGER products_search_vector_update
+    BEFORE INSERT OR UPDATE ON products
+    FOR EACH ROW EXECUTE FUNCTION products_search_vector_update();
+
+    UPDATE products SET search_vector = NULL;
+"""
+
+DROP_TRIGGER = """
+    DROP TRIGGER IF EXISTS products_search_vector_update ON products;
+    DROP FUNCTION IF EXISTS products_search_vector_update();
+"""
+
+
+def create_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS products_name_trgm '
+                'ON products USING gin (vnts_search_fold(name) gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    schema_editor.execute('DROP INDEX IF EXISTS products_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_search_fold'),
+        ('products', '0002_product_branches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='products_search_vector_gin'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
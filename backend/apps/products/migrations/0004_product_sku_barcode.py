@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='barcode',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='Código de barras'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='SKU'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('organization', 'sku'), name='unique_product_sku_per_org'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('organization', 'barcode'), name='unique_product_barcode_per_org'),
+        ),
+    ]
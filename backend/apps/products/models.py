@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from apps.core.models import UUIDModel, TenantModel
 
@@ -6,9 +8,14 @@ class Product(UUIDModel, TenantModel):
     name = models.CharField(max_length=255, verbose_name='Nombre')
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Precio')
     category = models.CharField(max_length=100, blank=True, verbose_name='Categoría')
+    # Únicos por organización; NULL si el producto no tiene (ver apps.products.lookup)
+    sku = models.CharField(max_length=64, null=True, blank=True, verbose_name='SKU')
+    barcode = models.CharField(max_length=64, null=True, blank=True, verbose_name='Código de barras')
     description = models.TextField(blank=True, verbose_name='Descripción')
     active = models.BooleanField(default=True, verbose_name='Activo')
     branches = models.ManyToManyField('branches.Branch', related_name='products', blank=True, verbose_name='Sucursales')
+    # Nombre, categoría y descripción sin acentos; lo mantiene un trigger (apps.core.search)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         db_table = 'products'
@@ -18,6 +25,11 @@ class Product(UUIDModel, TenantModel):
         indexes = [
             models.Index(fields=['organization', 'active']),
             models.Index(fields=['category']),
+            GinIndex(fields=['search_vector'], name='products_search_vector_gin'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'sku'], name='unique_product_sku_per_org'),
+            models.UniqueConstraint(fields=['organization', 'barcode'], name='unique_product_barcode_per_org'),
         ]
     
     def __str__(self):
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.core.eager_loading import EagerLoadingMixin
 from .models import Product
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     organization = serializers.PrimaryKeyRelatedField(read_only=True)
     price = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=False)
     branches = serializers.ListField(
@@ -13,9 +14,11 @@ class ProductSerializer(serializers.ModelSerializer):
     )
     branch_ids = serializers.SerializerMethodField()
     
+    prefetch_related_fields = ('branches',)
+    
     class Meta:
         model = Product
-        fields = ['id', 'name', 'price', 'category', 'description', 'active', 'organization', 'branches', 'branch_ids', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'price', 'category', 'sku', 'barcode', 'description', 'active', 'organization', 'branches', 'branch_ids', 'created_at', 'updated_at']
         read_only_fields = ['id', 'organization', 'branch_ids', 'created_at', 'updated_at']
     
     def get_branch_ids(self, obj):
@@ -26,3 +29,29 @@ class ProductSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError('El precio debe ser mayor a 0')
         return value
+    
+    def validate_sku(self, value):
+        return self.validate_code('sku', value, 'SKU')
+    
+    def validate_barcode(self, value):
+        return self.validate_code('barcode', value, 'código de barras')
+    
+    def validate_code(self, field, value, label):
+        """Sin espacios alrededor, vacío como NULL y único en la organización."""
+        value = (value or '').strip() or None
+        if value is None:
+            return None
+        
+        if self.instance is not None:
+            organization_id = self.instance.organization_id
+        else:
+            organization_id = getattr(self.context['request'].user, 'organization_id', None)
+        if not organization_id:
+            return value
+        
+        duplicates = Product.objects.filter(organization_id=organization_id, **{field: value})
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError(f'Ya existe un producto con este {label}')
+        return value
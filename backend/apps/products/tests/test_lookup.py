@@ -0,0 +1,55 @@
+"""
+Resolución de códigos escaneados (/products/lookup/, apps.products.lookup).
+"""
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.branches.models import Branch
+from apps.organizations.models import Organization
+from apps.products.lookup import lookup_cache
+from apps.products.models import Product
+
+
+class ProductLookupTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Escaner', slug='escaner')
+        cls.branch = Branch.objects.get(organization=cls.organization, code='PRINCIPAL')
+        cls.product = Product.objects.create(
+            organization=cls.organization, name='Refresco', price=Decimal('18.00'),
+            sku='REF-600', barcode='7501055300075'
+        )
+
+    def setUp(self):
+        # Las cachés sobreviven al rollback de cada prueba
+        cache.clear()
+        lookup_cache.clear()
+        self.url = f'/api/v1/products/lookup/?organization_id={self.organization.id}&branch_id={self.branch.id}'
+
+    def test_product_lookup(self):
+        """Código de barras o SKU y disponibilidad por sucursal."""
+        response = self.client.get(f'{self.url}&code=7501055300075')
+        self.assertEqual(response.json()['id'], str(self.product.id))
+        self.assertFalse(response.json()['available'])
+        self.assertEqual(self.client.get(f'{self.url}&code=NO-EXISTE').status_code, 404)
+
+        # Asignar el producto a la sucursal cambia la versión del catálogo
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.branches.add(self.branch)
+        response = self.client.post(
+            self.url, {'codes': [' REF-600 ', '7501055300075', 'NO-EXISTE']}, format='json'
+        ).json()
+        self.assertEqual(response['not_found'], ['NO-EXISTE'])
+        self.assertEqual(set(response['results']), {'REF-600', '7501055300075'})
+        self.assertTrue(response['results']['REF-600']['available'])
+
+    def test_cached_lookup_costs_one_query(self):
+        """Un código ya resuelto solo cuesta la consulta de la versión."""
+        self.client.get(f'{self.url}&code=7501055300075')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'{self.url}&code=7501055300075')
+        self.assertEqual(response.json()['id'], str(self.product.id))
+        self.assertEqual(len(context.captured_queries), 1)
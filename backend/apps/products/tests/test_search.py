@@ -0,0 +1,23 @@
+"""
+Búsqueda de productos (?search=, apps.core.search).
+"""
+from decimal import Decimal
+from rest_framework.test import APITestCase
+from apps.organizations.models import Organization
+from apps.products.models import Product
+
+
+class ProductSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Búsqueda', slug='busqueda')
+        cls.product = Product.objects.create(organization=cls.organization, name='Café de olla', price=Decimal('30.00'))
+        Product.objects.create(organization=cls.organization, name='Chocolate', price=Decimal('25.00'))
+
+    def test_search_folds_accents(self):
+        url = f'/api/v1/products/?organization_id={self.organization.id}&search='
+        for term in ('cafe', 'CAFÉ olla', 'caf'):
+            with self.subTest(term=term):
+                results = self.client.get(url + term).json()['results']
+                self.assertEqual([item['id'] for item in results], [str(self.product.id)])
@@ -1,20 +1,35 @@
-from rest_framework import viewsets, permissions, filters
+import uuid
+from rest_framework import viewsets, permissions, filters, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from apps.core.change_stamps import ConditionalGetMixin
+from apps.core.eager_loading import EagerLoadingViewSetMixin
+from apps.core.idempotency import IdempotentModelMixin
+from apps.core.reference_data import get_default_branch_id
+from apps.core.search import TenantSearchFilter
+from apps.core.sync import ChangeFeedMixin
+from apps.core.utils import request_organization_id
+from apps.branches.models import Branch
+from .lookup import MAX_LOOKUP_CODES, lookup_products, normalize_codes
 from .models import Product
 from .serializers import ProductSerializer
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, ChangeFeedMixin, EagerLoadingViewSetMixin, IdempotentModelMixin, viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['active', 'category']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TenantSearchFilter]
+    filterset_fields = ['active', 'category', 'sku', 'barcode']
     search_fields = ['name', 'description', 'category']
+    search_vector_field = 'search_vector'
+    search_substring_fields = ['name']
     ordering_fields = ['name', 'price', 'created_at']
     ordering = ['name']
+    change_stamp_models = (Product, Branch)
     
     def get_queryset(self):
-        queryset = Product.objects.prefetch_related('branches').all()
+        queryset = Product.objects.defer('search_vector')
         
         # Filtrar por organización si el usuario está autenticado
         if self.request.user.is_authenticated and hasattr(self.request.user, 'organization'):
@@ -54,12 +69,9 @@ class ProductViewSet(viewsets.ModelViewSet):
             product.branches.set(branches)
         else:
             # Si no se especificaron, asignar a la sucursal PRINCIPAL (default)
-            default_branch = Branch.objects.filter(
-                organization=organization,
-                code='PRINCIPAL'
-            ).first()
-            if default_branch:
-                product.branches.add(default_branch)
+            default_branch_id = get_default_branch_id(organization.id) if organization else None
+            if default_branch_id:
+                product.branches.add(default_branch_id)
     
     def perform_update(self, serializer):
         # Extraer branches del validated_data si existe
@@ -74,3 +86,55 @@ class ProductViewSet(viewsets.ModelViewSet):
             organization = product.organization
             branches = Branch.objects.filter(id__in=branches_ids, organization=organization)
             product.branches.set(branches)
+    
+    @action(detail=False, methods=['get', 'post'])
+    def lookup(self, request):
+        """
+        Resuelve códigos escaneados (código de barras o SKU) a productos con su
+        precio y disponibilidad en la sucursal `branch_id`.
+        
+        - GET ?code=X: el producto, o 404.
+        - GET ?codes=X,Y o POST {"codes": [...]}: hasta 500 códigos; responde
+          `results` (código -> producto) y `not_found`.
+        
+        Ver apps.products.lookup.
+        """
+        organization_id = request_organization_id(request)
+        if not organization_id:
+            return Response({'error': 'organization_id es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        branch_id = request.data.get('branch_id') or request.query_params.get('branch_id')
+        try:
+            branch_id = str(uuid.UUID(str(branch_id)))
+        except ValueError:
+            return Response({'error': 'branch_id es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.method == 'GET' and 'code' in request.query_params:
+            codes = normalize_codes([request.query_params['code']])
+            if not codes:
+                return Response({'error': 'code es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+            product = lookup_products(organization_id, branch_id, codes)[codes[0]]
+            if product is None:
+                return Response({'error': 'Producto no encontrado'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(product)
+        
+        if request.method == 'POST':
+            codes = request.data.get('codes')
+        else:
+            codes = request.query_params.get('codes', '').split(',')
+        if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+            return Response({'error': 'codes debe ser una lista de códigos'}, status=status.HTTP_400_BAD_REQUEST)
+        codes = normalize_codes(codes)
+        if not codes:
+            return Response({'error': 'code o codes es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(codes) > MAX_LOOKUP_CODES:
+            return Response(
+                {'error': f'Máximo {MAX_LOOKUP_CODES} códigos por petición'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        products = lookup_products(organization_id, branch_id, codes)
+        return Response({
+            'results': {code: product for code, product in products.items() if product is not None},
+            'not_found': [code for code, product in products.items() if product is None],
+        })
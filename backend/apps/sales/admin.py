@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Sale, SaleItem
+from django.db import transaction
+from .models import ClientPurchaseStats, Sale, SaleItem, SalesDailyRollup, SalesProductDailyRollup
+from .rollups import apply_rollup_changes, sale_snapshots, track_sale_changes
 
 
 class SaleItemInline(admin.TabularInline):
@@ -15,6 +17,26 @@ class SaleAdmin(admin.ModelAdmin):
     search_fields = ['notes', 'client__name', 'seller__name']
     readonly_fields = ['id', 'created_at', 'updated_at']
     inlines = [SaleItemInline]
+    
+    def save_model(self, request, obj, form, change):
+        # Estado previo para restarlo del resumen diario una vez guardados los items
+        request._sale_rollup_before = sale_snapshots([obj.pk]) if change else []
+        super().save_model(request, obj, form, change)
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        apply_rollup_changes(
+            before=getattr(request, '_sale_rollup_before', []),
+            after=sale_snapshots([form.instance.pk])
+        )
+    
+    def delete_model(self, request, obj):
+        with track_sale_changes([obj.pk]):
+            super().delete_model(request, obj)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic(), track_sale_changes(queryset.values_list('pk', flat=True)):
+            super().delete_queryset(request, queryset)
 
 
 @admin.register(SaleItem)
@@ -23,3 +45,38 @@ class SaleItemAdmin(admin.ModelAdmin):
     list_filter = ['organization', 'created_at']
     search_fields = ['product__name', 'sale__id']
     readonly_fields = ['id', 'subtotal', 'created_at', 'updated_at']
+    
+    def save_model(self, request, obj, form, change):
+        sale_ids = {obj.sale_id, form.initial.get('sale')} - {None}
+        with track_sale_changes(sale_ids):
+            super().save_model(request, obj, form, change)
+    
+    def delete_model(self, request, obj):
+        with track_sale_changes([obj.sale_id]):
+            super().delete_model(request, obj)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic(), track_sale_changes(set(queryset.values_list('sale_id', flat=True))):
+            super().delete_queryset(request, queryset)
+
+
+@admin.register(SalesDailyRollup)
+class SalesDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'organization', 'branch', 'seller', 'payment_method', 'sales_count', 'total', 'items_quantity']
+    list_filter = ['organization', 'date']
+    readonly_fields = [field.name for field in SalesDailyRollup._meta.fields]
+
+
+@admin.register(SalesProductDailyRollup)
+class SalesProductDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'organization', 'branch', 'product', 'quantity', 'revenue']
+    list_filter = ['organization', 'date']
+    readonly_fields = [field.name for field in SalesProductDailyRollup._meta.fields]
+
+
+@admin.register(ClientPurchaseStats)
+class ClientPurchaseStatsAdmin(admin.ModelAdmin):
+    list_display = ['client', 'organization', 'purchase_count', 'total_spent', 'average_ticket', 'last_purchase']
+    list_filter = ['organization']
+    search_fields = ['client__name']
+    readonly_fields = [field.name for field in ClientPurchaseStats._meta.fields]
@@ -0,0 +1,312 @@
+"""
+Consultas agregadas de ventas.
+Todas las sumas se resuelven en la base de datos con aritmética NUMERIC exacta,
+de modo que el costo en memoria no depende del número de ventas.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db.models import Sum, Count, F, Q, Value, DecimalField, ExpressionWrapper
+from django.db.models.functions import Coalesce, Trunc
+
+
+# Se multiplica por 0.01 en lugar de dividir entre 100: la multiplicación NUMERIC
+# en Postgres es exacta, la división redondea según la escala de los operandos.
+ONE_PERCENT = Value(Decimal('0.01'), output_field=DecimalField(max_digits=3, decimal_places=2))
+
+AMOUNT_FIELD = DecimalField(max_digits=20, decimal_places=6)
+
+
+def payment_method_commission(total_field='total', percentage_field='payment_method__commission_percentage'):
+    """
+    Expresión SUM(total × comisión del método de pago) / 100.
+    """
+    return ExpressionWrapper(
+        Sum(F(total_field) * F(percentage_field), output_field=AMOUNT_FIELD) * ONE_PERCENT,
+        output_field=AMOUNT_FIELD
+    )
+
+
+def is_rollup(queryset):
+    from .models import SalesDailyRollup
+    return queryset.model is SalesDailyRollup
+
+
+def sale_measures(queryset):
+    """
+    Agregados de número de ventas, total y comisión del método de pago.
+    `queryset` puede ser de Sale o de SalesDailyRollup; el resultado es el mismo.
+    """
+    if is_rollup(queryset):
+        return {
+            'sales_count': Coalesce(Sum('sales_count'), 0),
+            'total_amount': Sum('total'),
+            'commission_amount': Sum('commission'),
+        }
+    return {
+        'sales_count': Count('id'),
+        'total_amount': Sum('total'),
+        'commission_amount': payment_method_commission(),
+    }
+
+
+def payment_method_breakdown(queryset):
+    """
+    Ventas agrupadas por método de pago con sus comisiones, en una sola consulta.
+    """
+    rows = queryset.order_by().values(
+        'payment_method__id',
+        'payment_method__name',
+        'payment_method__commission_percentage'
+    ).annotate(
+        **sale_measures(queryset)
+    ).order_by('-total_amount')
+
+    result = []
+    for row in rows:
+        total = float(row['total_amount'] or 0)
+        commission = float(row['commission_amount'] or 0)
+        result.append({
+            'payment_method__id': str(row['payment_method__id']),
+            'payment_method__name': row['payment_method__name'],
+            'count': row['sales_count'],
+            'total': total,
+            'commission': commission,
+            'commissionPercentage': float(row['payment_method__commission_percentage']),
+            'netAmount': total - commission
+        })
+
+    return result
+
+
+def seller_commissions(queryset):
+    """
+    Comisiones por vendedor descontando la comisión del método de pago, en una sola consulta.
+    """
+    measures = sale_measures(queryset)
+    rows = queryset.order_by().values(
+        'seller__id',
+        'seller__name',
+        'seller__commission_percentage'
+    ).annotate(
+        total_amount=measures['total_amount'],
+        commission_amount=measures['commission_amount']
+    ).order_by('-total_amount')
+
+    commissions = []
+    for row in rows:
+        total_sales = float(row['total_amount'] or 0)
+        payment_method_commission_amount = float(row['commission_amount'] or 0)
+        net_amount = total_sales - payment_method_commission_amount
+
+        commission_percentage = float(row['seller__commission_percentage'])
+        commission_amount = net_amount * (commission_percentage / 100)
+
+        commissions.append({
+            'seller_id': str(row['seller__id']),
+            'seller_name': row['seller__name'],
+            'total_sales': total_sales,
+            'payment_method_commission': payment_method_commission_amount,
+            'net_amount': net_amount,
+            'commission_percentage': commission_percentage,
+            'commission_amount': commission_amount
+        })
+
+    return commissions
+
+
+def product_lines(queryset):
+    """
+    Origen de cantidades e importes por producto: el propio queryset si es de
+    SalesProductDailyRollup, o las líneas (SaleItem) de las ventas de `queryset`.
+    Devuelve (queryset, campo de cantidad, campo de importe).
+    """
+    from .models import SaleItem, SalesProductDailyRollup
+
+    if queryset.model is SalesProductDailyRollup:
+        return queryset.order_by(), 'quantity', 'revenue'
+    return SaleItem.objects.filter(sale__in=queryset).order_by(), 'quantity', 'subtotal'
+
+
+def top_products(queryset, limit=10):
+    """
+    Productos más vendidos por importe. `queryset` puede ser de Sale o de
+    SalesProductDailyRollup.
+    """
+    lines, quantity_field, amount_field = product_lines(queryset)
+
+    return list(lines.values(
+        'product__id', 'product__name'
+    ).annotate(
+        quantity=Sum(quantity_field),
+        total=Sum(amount_field)
+    ).order_by('-total', 'product__name')[:limit])
+
+
+def category_breakdown(queryset):
+    """
+    Cantidad e importe vendidos por categoría de producto, en una sola consulta.
+    `queryset` puede ser de Sale o de SalesProductDailyRollup.
+    """
+    lines, quantity_field, amount_field = product_lines(queryset)
+
+    rows = lines.values('product__category').annotate(
+        quantity=Sum(quantity_field),
+        total=Sum(amount_field),
+        product_count=Count('product', distinct=True)
+    ).order_by('-total')
+
+    return [
+        {
+            'category': row['product__category'],
+            'quantity': row['quantity'],
+            'total': float(row['total'] or 0),
+            'product_count': row['product_count']
+        }
+        for row in rows
+    ]
+
+
+def sales_period_summary(queryset, today, tz):
+    """
+    Totales históricos y comparativos hoy/ayer y semana/semana anterior
+    en un solo recorrido usando agregados con FILTER.
+
+    La semana son los últimos 7 días incluyendo `today`; la semana anterior,
+    los 7 días previos. `queryset` puede ser de Sale o de SalesDailyRollup.
+    """
+    week_start = today - timedelta(days=6)
+    previous_week_start = today - timedelta(days=13)
+
+    if is_rollup(queryset):
+        periods = {
+            'today': Q(date=today),
+            'yesterday': Q(date=today - timedelta(days=1)),
+            'week': Q(date__gte=week_start, date__lte=today),
+            'previous_week': Q(date__gte=previous_week_start, date__lt=week_start),
+        }
+
+        def count(condition=None):
+            return Coalesce(Sum('sales_count', filter=condition), 0)
+    else:
+        def start_of(day):
+            return tz.localize(datetime.combine(day, time.min))
+
+        periods = {
+            'today': Q(created_at__gte=start_of(today), created_at__lt=start_of(today + timedelta(days=1))),
+            'yesterday': Q(created_at__gte=start_of(today - timedelta(days=1)), created_at__lt=start_of(today)),
+            'week': Q(created_at__gte=start_of(week_start), created_at__lt=start_of(today + timedelta(days=1))),
+            'previous_week': Q(created_at__gte=start_of(previous_week_start), created_at__lt=start_of(week_start)),
+        }
+
+        def count(condition=None):
+            return Count('id', filter=condition)
+
+    aggregates = {
+        'total_sales': count(),
+        'total_amount': Sum('total'),
+    }
+    for name, condition in periods.items():
+        aggregates[f'{name}_count'] = count(condition)
+        aggregates[f'{name}_amount'] = Sum('total', filter=condition)
+
+    data = queryset.order_by().aggregate(**aggregates)
+
+    return {
+        'total_sales': data['total_sales'],
+        'total_amount': float(data['total_amount'] or 0),
+        'periods': {
+            name: {
+                'count': data[f'{name}_count'],
+                'total': float(data[f'{name}_amount'] or 0)
+            }
+            for name in periods
+        }
+    }
+
+
+TIMESERIES_GRANULARITIES = ('hour', 'day', 'week', 'month')
+
+# Límite de cubetas por respuesta para acotar el tamaño del payload
+MAX_TIMESERIES_BUCKETS = 1000
+
+
+def truncate_datetime(value, granularity):
+    """
+    Trunca un datetime local (naive) igual que date_trunc de Postgres.
+    Las semanas empiezan en lunes (ISO).
+    """
+    if granularity == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    if granularity == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value, granularity):
+    """Inicio de la cubeta siguiente a `value` (ya truncado)."""
+    if granularity == 'hour':
+        return value + timedelta(hours=1)
+    if granularity == 'day':
+        return value + timedelta(days=1)
+    if granularity == 'week':
+        return value + timedelta(weeks=1)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def bucket_range(start, end, granularity):
+    """
+    Lista de inicios de cubeta (datetimes locales naive) entre start y end inclusive.
+    """
+    buckets = []
+    current = truncate_datetime(start, granularity)
+    while current <= end:
+        buckets.append(current)
+        if len(buckets) > MAX_TIMESERIES_BUCKETS:
+            raise ValueError(
+                f'El rango solicitado excede {MAX_TIMESERIES_BUCKETS} intervalos'
+            )
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def sales_timeseries(queryset, granularity, start, end, tz):
+    """
+    Serie de tiempo de ventas agrupada en Postgres por hora/día/semana/mes
+    en la zona horaria `tz`. Las cubetas sin ventas se devuelven en cero.
+
+    `start` y `end` son datetimes timezone-aware que delimitan el rango.
+    """
+    local_start = start.astimezone(tz).replace(tzinfo=None)
+    local_end = end.astimezone(tz).replace(tzinfo=None)
+    buckets = bucket_range(local_start, local_end, granularity)
+
+    rows = queryset.filter(
+        created_at__gte=start,
+        created_at__lte=end
+    ).order_by().annotate(
+        bucket=Trunc('created_at', granularity, tzinfo=tz)
+    ).values('bucket').annotate(
+        sales_count=Count('id'),
+        total_amount=Sum('total')
+    ).order_by('bucket')
+
+    totals = {}
+    for row in rows:
+        key = row['bucket'].astimezone(tz).replace(tzinfo=None)
+        totals[key] = (row['sales_count'], float(row['total_amount'] or 0))
+
+    series = []
+    for bucket in buckets:
+        count, total = totals.get(bucket, (0, 0.0))
+        if granularity == 'hour':
+            label = tz.localize(bucket).isoformat()
+        else:
+            label = bucket.date().isoformat()
+        series.append({'bucket': label, 'count': count, 'total': total})
+
+    return series
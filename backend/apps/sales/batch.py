@@ -0,0 +1,196 @@
+"""
+Ingesta por lotes de ventas capturadas sin conexión en el POS.
+Cada bloque se inserta con escrituras masivas dentro de una transacción.
+"""
+import uuid
+from rest_framework import serializers
+from django.db import connection, transaction
+from .models import Sale, SaleItem
+from apps.core.change_stamps import bump_change_stamps
+from apps.core.reference_data import get_default_branch_id
+from .cache import bump_analytics_version
+from .rollups import apply_rollup_changes, sale_snapshot
+from .serializers import SaleBatchEntrySerializer
+
+# Ventas insertadas por transacción
+BATCH_CHUNK_SIZE = 500
+
+ACCEPTED = 'accepted'
+DUPLICATE = 'duplicate'
+REJECTED = 'rejected'
+
+
+def ingest_sales(organization_id, entries):
+    """
+    Inserta las ventas de `entries` para la organización indicada.
+
+    Returns:
+        list: un dict por venta con `id`, `status` (accepted/duplicate/rejected)
+        y `errors` cuando se rechaza, en el mismo orden recibido.
+    """
+    results = []
+    seen = {}
+    for offset in range(0, len(entries), BATCH_CHUNK_SIZE):
+        results.extend(_ingest_chunk(organization_id, entries[offset:offset + BATCH_CHUNK_SIZE], seen))
+
+    # Una venta repetida dentro del mismo lote es duplicada solo si la primera
+    # aparición se aceptó; si se rechazó, se rechaza con los mismos errores
+    for result in results:
+        first = result.pop('first', None)
+        if first and first['status'] == REJECTED:
+            result['status'] = REJECTED
+            result['errors'] = first['errors']
+
+    return results
+
+
+def _ingest_chunk(organization_id, entries, seen):
+    from apps.branches.models import Branch
+    from apps.clients.models import Client
+    from apps.payments.models import PaymentMethod
+    from apps.products.models import Product
+    from apps.sellers.models import Seller
+
+    # IDs de las ventas del bloque, para descartar duplicados antes de validar
+    entry_ids = []
+    for raw in entries:
+        try:
+            entry_ids.append(uuid.UUID(str(raw.get('id'))))
+        except (AttributeError, ValueError):
+            entry_ids.append(None)
+
+    # Una sola instancia del serializer para todo el bloque: construir los
+    # campos en cada venta domina el costo de validación
+    entry_serializer = SaleBatchEntrySerializer()
+
+    with transaction.atomic():
+        # Serializar los lotes de una misma organización para que la verificación
+        # de duplicados y la inserción no compitan entre reintentos simultáneos
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'sales-batch:{organization_id}'])
+
+        existing = dict(Sale.objects.filter(
+            id__in=[entry_id for entry_id in entry_ids if entry_id]
+        ).values_list('id', 'organization_id'))
+
+        results = []
+        pending = []
+        for raw, entry_id in zip(entries, entry_ids):
+            if entry_id in seen:
+                results.append({'id': str(entry_id), 'status': DUPLICATE, 'first': seen[entry_id]})
+                continue
+            if entry_id in existing:
+                if existing[entry_id] == organization_id:
+                    results.append({'id': str(entry_id), 'status': DUPLICATE})
+                else:
+                    results.append({'id': str(entry_id), 'status': REJECTED, 'errors': {'id': ['El ID ya está en uso']}})
+                continue
+
+            try:
+                data = entry_serializer.run_validation(raw)
+            except serializers.ValidationError as exc:
+                results.append({'id': raw.get('id'), 'status': REJECTED, 'errors': exc.detail})
+                continue
+
+            result = {'id': str(data['id']), 'status': ACCEPTED}
+            seen[data['id']] = result
+            results.append(result)
+            pending.append((data, result))
+
+        if not pending:
+            return results
+
+        def owned_ids(model, ids, **filters):
+            return set(model.objects.filter(
+                organization_id=organization_id, id__in=ids, **filters
+            ).values_list('id', flat=True))
+
+        sellers = owned_ids(Seller, {data['seller_id'] for data, _ in pending})
+        clients = owned_ids(Client, {data['client_id'] for data, _ in pending})
+        payment_methods = owned_ids(PaymentMethod, {data['payment_method_id'] for data, _ in pending})
+        branches = owned_ids(Branch, {data['branch_id'] for data, _ in pending if data.get('branch_id')})
+        products = owned_ids(
+            Product,
+            {item['product_id'] for data, _ in pending for item in data['items']},
+            active=True
+        )
+
+        default_branch_id = None
+        if any(not data.get('branch_id') for data, _ in pending):
+            default_branch_id = get_default_branch_id(organization_id)
+
+        sales = []
+        items = []
+        sale_items = {}
+        created_at_overrides = {}
+        for data, result in pending:
+            errors = {}
+            if data['seller_id'] not in sellers:
+                errors['seller_id'] = ['Vendedor no encontrado']
+            if data['client_id'] not in clients:
+                errors['client_id'] = ['Cliente no encontrado']
+            if data['payment_method_id'] not in payment_methods:
+                errors['payment_method_id'] = ['Método de pago no encontrado']
+            if data.get('branch_id') and data['branch_id'] not in branches:
+                errors['branch_id'] = ['Sucursal no encontrada']
+            invalid_products = {item['product_id'] for item in data['items']} - products
+            if invalid_products:
+                errors['items'] = [
+                    f'Productos inexistentes o inactivos: {", ".join(sorted(str(i) for i in invalid_products))}'
+                ]
+            if errors:
+                result['status'] = REJECTED
+                result['errors'] = errors
+                continue
+
+            sale = Sale(
+                id=data['id'],
+                branch_id=data.get('branch_id') or default_branch_id,
+                seller_id=data['seller_id'],
+                client_id=data['client_id'],
+                payment_method_id=data['payment_method_id'],
+                total=data['total'],
+                notes=data['notes'],
+                organization_id=organization_id
+            )
+            sales.append(sale)
+            if data.get('created_at'):
+                created_at_overrides[sale.id] = data['created_at']
+            sale_items[sale.id] = [
+                SaleItem(
+                    sale_id=sale.id,
+                    product_id=item['product_id'],
+                    quantity=item['quantity'],
+                    price=item['price'],
+                    subtotal=item['subtotal'],
+                    organization_id=organization_id
+                )
+                for item in data['items']
+            ]
+            items.extend(sale_items[sale.id])
+
+        Sale.objects.bulk_create(sales)
+        SaleItem.objects.bulk_create(items)
+
+        # auto_now_add ignora el valor recibido; conservar la hora real del ticket
+        # con un solo UPDATE ... FROM (VALUES ...)
+        if created_at_overrides:
+            values = ', '.join(['(%s::uuid, %s::timestamptz)'] * len(created_at_overrides))
+            params = [str(value) for pair in created_at_overrides.items() for value in pair]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {Sale._meta.db_table} SET created_at = v.created_at '
+                    f'FROM (VALUES {values}) AS v(id, created_at) '
+                    f'WHERE {Sale._meta.db_table}.id = v.id',
+                    params
+                )
+            for sale in sales:
+                sale.created_at = created_at_overrides.get(sale.id, sale.created_at)
+
+        # Sumar las ventas insertadas a los resúmenes diarios en la misma transacción
+        apply_rollup_changes(after=[sale_snapshot(sale, sale_items[sale.id]) for sale in sales])
+        # bulk_create no emite signals
+        bump_analytics_version(organization_id)
+        bump_change_stamps(organization_id, Sale, SaleItem)
+
+    return results
@@ -0,0 +1,188 @@
+"""
+Caché de las respuestas de analítica de ventas por organización.
+
+Cada organización tiene una versión de datos guardada en la caché. Las
+escrituras de ventas, líneas, vendedores, métodos de pago y productos la
+cambian al confirmar la transacción, y las respuestas guardadas con otra
+versión dejan de considerarse frescas sin tener que borrarlas una por una.
+
+Una respuesta vencida o de una versión anterior se sigue sirviendo mientras
+una sola petición la recalcula (stale-while-revalidate), así que un cambio de
+versión no manda a todas las pestañas abiertas a la base de datos a la vez.
+
+Las peticiones idénticas concurrentes (misma organización y filtros) que no
+encuentran copia fresca comparten un solo cálculo dentro del proceso y,
+opcionalmente, entre workers con un advisory lock (ver apps.core.singleflight).
+
+Usa la caché `default` de Django. Con LocMemCache cada proceso tiene su propia
+copia y solo ve los cambios de versión de sus propias escrituras; con varios
+workers conviene FileBasedCache o una caché compartida (ver CACHE_BACKEND).
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.response import Response
+from apps.core.singleflight import SingleFlight, advisory_lock
+from apps.core.utils import request_organization_id
+
+CACHE_HEADER = 'X-Analytics-Cache'
+
+# Segundos que una petición puede tardar en recalcular una respuesta vencida
+# antes de que otra lo intente
+REFRESH_LOCK_TIMEOUT = 30
+
+_flights = SingleFlight()
+
+# Contadores del proceso: hit, stale, miss, executed, coalesced y shared_across_workers
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def analytics_counters():
+    """
+    Contadores de este proceso. `saved` son las ejecuciones evitadas: respuestas
+    servidas desde la caché más las peticiones que compartieron un cálculo.
+    """
+    with _counters_lock:
+        counters = dict(_counters)
+    names = ('hit', 'stale', 'miss', 'executed', 'coalesced', 'shared_across_workers')
+    result = {name: counters.get(name, 0) for name in names}
+    result['saved'] = result['hit'] + result['stale'] + result['coalesced'] + result['shared_across_workers']
+    result['pid'] = os.getpid()
+    return result
+
+
+def version_key(organization_id):
+    return f'analytics:version:{organization_id}'
+
+
+def get_analytics_version(organization_id):
+    """
+    Versión actual de los datos de la organización. Si la caché no la tiene
+    (arranque o desalojo) se genera una nueva, lo que invalida todo lo guardado.
+    """
+    key = version_key(organization_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_analytics_version(organization_id):
+    """
+    Cambia la versión de la organización al confirmar la transacción actual
+    (de inmediato si no hay una abierta).
+    """
+    if organization_id:
+        transaction.on_commit(lambda: cache.set(version_key(organization_id), uuid.uuid4().hex, None))
+
+
+def response_key(organization_id, name, request):
+    """
+    Llave de la respuesta: organización, acción, todos los query params y el día
+    local, porque varias acciones dependen de "hoy".
+    """
+    params = '&'.join(
+        f'{param}={value}'
+        for param in sorted(request.query_params)
+        for value in request.query_params.getlist(param)
+    )
+    raw = f'{name}:{params}:{timezone.localdate().isoformat()}'
+    return f'analytics:response:{organization_id}:{hashlib.sha256(raw.encode("utf-8")).hexdigest()}'
+
+
+def is_fresh(entry, version):
+    return bool(entry) and entry['version'] == version and time.time() < entry['fresh_until']
+
+
+def cached_response(data, status, status_code=200):
+    response = Response(data, status=status_code)
+    response[CACHE_HEADER] = status
+    return response
+
+
+def cached_analytics(view_method):
+    """
+    Decorador para acciones de lectura de analítica de un ViewSet.
+
+    Respuesta fresca de la versión actual: se devuelve sin consultar la base de
+    datos (HIT). Vencida o de otra versión: una petición la recalcula y las
+    demás reciben la copia anterior mientras tanto (STALE). Sin copia: se
+    calcula (MISS) una sola vez entre las peticiones idénticas simultáneas del
+    proceso, que reciben el mismo resultado (COALESCED). Solo se guardan
+    respuestas 200.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        organization_id = request_organization_id(request)
+        use_cache = settings.ANALYTICS_CACHE_ENABLED
+        if not organization_id or not (use_cache or settings.ANALYTICS_SINGLE_FLIGHT):
+            return view_method(self, request, *args, **kwargs)
+
+        key = response_key(organization_id, view_method.__name__, request)
+        version = get_analytics_version(organization_id) if use_cache else None
+        entry = cache.get(key) if use_cache else None
+
+        if use_cache and is_fresh(entry, version):
+            count('hit')
+            return cached_response(entry['data'], 'HIT')
+
+        refresh_key = f'{key}:refresh'
+        if entry and not cache.add(refresh_key, 1, REFRESH_LOCK_TIMEOUT):
+            count('stale')
+            return cached_response(entry['data'], 'STALE')
+
+        def execute():
+            count('executed')
+            response = view_method(self, request, *args, **kwargs)
+            if use_cache and response.status_code == 200:
+                ttl = settings.ANALYTICS_CACHE_TTL
+                cache.set(
+                    key,
+                    {'version': version, 'data': response.data, 'fresh_until': time.time() + ttl},
+                    ttl + settings.ANALYTICS_CACHE_STALE_TTL
+                )
+            return response.data, response.status_code, 'MISS'
+
+        def execute_once_across_workers():
+            with advisory_lock(key):
+                # Otro worker pudo calcularla mientras se esperaba el lock
+                current = cache.get(key) if use_cache else None
+                if is_fresh(current, get_analytics_version(organization_id) if current else None):
+                    count('shared_across_workers')
+                    return current['data'], 200, 'HIT'
+                return execute()
+
+        run = execute_once_across_workers if settings.ANALYTICS_SINGLE_FLIGHT_ADVISORY_LOCK else execute
+
+        try:
+            if settings.ANALYTICS_SINGLE_FLIGHT:
+                (data, status_code, status), shared = _flights.do(key, run)
+                if shared:
+                    count('coalesced')
+                    status = 'COALESCED'
+            else:
+                data, status_code, status = run()
+        finally:
+            if entry:
+                cache.delete(refresh_key)
+
+        if status == 'MISS':
+            count('miss')
+        return cached_response(data, status, status_code)
+
+    return wrapper
@@ -0,0 +1,98 @@
+"""
+Comando para medir la latencia de creación de ventas según el número de líneas.
+Todas las ventas creadas se revierten al terminar.
+"""
+import statistics
+import time
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from apps.organizations.models import Organization
+from apps.products.models import Product
+from apps.sales.serializers import SaleCreateSerializer, SaleSerializer
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de creación de ventas contra el número de líneas del ticket'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Slug o ID de la organización (por defecto la primera con productos)')
+        parser.add_argument('--lines', default='1,5,10,30,100', help='Números de líneas a medir, separados por coma')
+        parser.add_argument('--iterations', type=int, default=20, help='Ventas creadas por cada número de líneas')
+
+    def handle(self, *args, **options):
+        organization = self.get_organization(options['organization'])
+        line_counts = [int(value) for value in options['lines'].split(',')]
+        iterations = options['iterations']
+
+        products = list(Product.objects.filter(organization=organization, active=True)[:max(line_counts)])
+        seller = organization.seller_set.first()
+        client = organization.client_set.first()
+        payment_method = organization.paymentmethod_set.first()
+        if not (products and seller and client and payment_method):
+            raise CommandError('La organización necesita productos, vendedores, clientes y métodos de pago')
+
+        self.stdout.write(f'Organización: {organization.name} ({len(products)} productos disponibles)')
+        self.stdout.write(f'{"líneas":>8} {"p50 ms":>10} {"p95 ms":>10} {"máx ms":>10} {"consultas":>10}')
+
+        with transaction.atomic():
+            for line_count in line_counts:
+                items = [
+                    {
+                        'product_id': str(products[i % len(products)].id),
+                        'quantity': 1,
+                        'price': str(products[i % len(products)].price),
+                        'subtotal': str(products[i % len(products)].price),
+                    }
+                    for i in range(line_count)
+                ]
+                payload = {
+                    'seller_id': str(seller.id),
+                    'client_id': str(client.id),
+                    'payment_method_id': str(payment_method.id),
+                    'organization_id': str(organization.id),
+                    'total': str(sum(products[i % len(products)].price for i in range(line_count))),
+                    'items': items,
+                }
+
+                timings = []
+                queries = 0
+                for _ in range(iterations):
+                    with CaptureQueriesContext(connection) as context:
+                        start = time.perf_counter()
+                        serializer = SaleCreateSerializer(data=payload)
+                        serializer.is_valid(raise_exception=True)
+                        sale = serializer.save()
+                        SaleSerializer(sale).data
+                        timings.append((time.perf_counter() - start) * 1000)
+                    queries = len(context.captured_queries)
+
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f'{line_count:>8} {statistics.median(timings):>10.2f} {p95:>10.2f} '
+                    f'{timings[-1]:>10.2f} {queries:>10}'
+                )
+
+            # No dejar las ventas de prueba en la base de datos
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark completado (ventas revertidas)'))
+
+    def get_organization(self, value):
+        if not value:
+            organization = Organization.objects.filter(product_set__active=True).distinct().first()
+            if not organization:
+                raise CommandError('No hay organizaciones con productos activos')
+            return organization
+
+        organization = Organization.objects.filter(slug=value).first()
+        if not organization:
+            try:
+                organization = Organization.objects.filter(id=value).first()
+            except ValidationError:
+                organization = None
+        if not organization:
+            raise CommandError(f'Organización no encontrada: {value}')
+        return organization
@@ -0,0 +1,40 @@
+"""
+Comando para reconstruir el resumen diario de ventas desde la tabla de ventas.
+Útil tras cargas masivas con COPY o correcciones manuales de datos.
+"""
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.organizations.models import Organization
+from apps.sales.rollups import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen diario de ventas de una o todas las organizaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Slug o ID de la organización (por defecto todas)')
+
+    def handle(self, *args, **options):
+        organizations = self.get_organizations(options['organization'])
+
+        for organization in organizations:
+            with transaction.atomic():
+                rows = rebuild_sales_rollup(organization.id)
+            self.stdout.write(f'  ✓ {organization.name}: {rows} filas de resumen')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Resumen reconstruido para {len(organizations)} organizaciones'))
+
+    def get_organizations(self, value):
+        if not value:
+            return list(Organization.objects.order_by('name'))
+
+        organization = Organization.objects.filter(slug=value).first()
+        if not organization:
+            try:
+                organization = Organization.objects.filter(id=value).first()
+            except ValidationError:
+                organization = None
+        if not organization:
+            raise CommandError(f'Organización no encontrada: {value}')
+        return [organization]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0002_remove_branch_products'),
+        ('sellers', '0003_remove_seller_branch'),
+        ('payments', '0002_paymentmethod_commission_percentage'),
+        ('organizations', '0001_initial'),
+        ('sales', '0002_sale_branch_sale_sales_branch__915484_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDailyRollup',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('sales_count', models.IntegerField(default=0, verbose_name='Ventas')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total')),
+                ('commission', models.DecimalField(decimal_places=6, default=0, max_digits=20, verbose_name='Comisión del método de pago')),
+                ('items_quantity', models.IntegerField(default=0, verbose_name='Artículos vendidos')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='branches.branch', verbose_name='Sucursal')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='Organización')),
+                ('payment_method', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='payments.paymentmethod', verbose_name='Método de pago')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='sellers.seller', verbose_name='Vendedor')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de ventas',
+                'verbose_name_plural': 'Resúmenes diarios de ventas',
+                'db_table': 'sales_daily_rollup',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='salesdailyrollup',
+            constraint=models.UniqueConstraint(fields=('organization', 'date', 'branch', 'seller', 'payment_method'), name='unique_sales_rollup_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesdailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', True)), fields=('organization', 'date', 'seller', 'payment_method'), name='unique_sales_rollup_key_no_branch'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('products', '0002_product_branches'),
+        ('branches', '0002_remove_branch_products'),
+        ('sales', '0003_sales_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesProductDailyRollup',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('quantity', models.IntegerField(default=0, verbose_name='Cantidad')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Importe')),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_rollups', to='branches.branch', verbose_name='Sucursal')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='Organización')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='products.product', verbose_name='Producto')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario por producto',
+                'verbose_name_plural': 'Resúmenes diarios por producto',
+                'db_table': 'sales_product_daily_rollup',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='salesproductdailyrollup',
+            constraint=models.UniqueConstraint(fields=('organization', 'date', 'branch', 'product'), name='unique_product_rollup_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='salesproductdailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('branch__isnull', True)), fields=('organization', 'date', 'product'), name='unique_product_rollup_key_no_branch'),
+        ),
+    ]
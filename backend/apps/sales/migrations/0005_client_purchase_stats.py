@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Estadísticas iniciales de todos los clientes a partir de las ventas existentes
+BACKFILL_SQL = """
+    INSERT INTO client_purchase_stats (
+        client_id, organization_id, created_at, updated_at,
+        purchase_count, total_spent, average_ticket, last_purchase
+    )
+    SELECT c.id, c.organization_id, NOW(), NOW(),
+           COUNT(s.id), COALESCE(SUM(s.total), 0),
+           COALESCE(ROUND(SUM(s.total) / NULLIF(COUNT(s.id), 0), 2), 0),
+           MAX(s.created_at)
+    FROM clients c
+    LEFT JOIN sales s ON s.client_id = c.id
+    GROUP BY c.id, c.organization_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('clients', '0001_initial'),
+        ('sales', '0004_sales_product_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientPurchaseStats',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de actualización')),
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='purchase_stats', serialize=False, to='clients.client', verbose_name='Cliente')),
+                ('purchase_count', models.IntegerField(default=0, verbose_name='Compras')),
+                ('total_spent', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total gastado')),
+                ('average_ticket', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Ticket promedio')),
+                ('last_purchase', models.DateTimeField(blank=True, null=True, verbose_name='Última compra')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='Organización')),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de cliente',
+                'verbose_name_plural': 'Estadísticas de clientes',
+                'db_table': 'client_purchase_stats',
+                'indexes': [models.Index(fields=['organization', 'purchase_count'], name='client_purc_organiz_abb3a6_idx'), models.Index(fields=['organization', 'total_spent'], name='client_purc_organiz_ff322d_idx'), models.Index(fields=['organization', 'average_ticket'], name='client_purc_organiz_c5e1da_idx'), models.Index(fields=['organization', 'last_purchase'], name='client_purc_organiz_20c03f_idx')],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,168 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Documento de búsqueda de una venta: cliente (nombre y referencia), productos,
+# vendedor y sucursal, y notas, con el texto plegado de vnts_search_fold.
+CREATE_DOCUMENT_FUNCTION = """
+    CREATE FUNCTION sales_search_document(
+        p_sale_id uuid, p_notes text, p_client_id uuid, p_seller_id uuid, p_branch_id uuid
+    ) RETURNS tsvector
+    LANGUAGE sql STABLE AS $$
+        SELECT
+            setweight(to_tsvector('spanish', vnts_search_fold(coalesce(
+                (SELECT c.name || ' ' || c.reference FROM clients c WHERE c.id = p_client_id), ''
+            ))), 'A') ||
+            setweight(to_tsvector('spanish', vnts_search_fold(coalesce(
+                (SELECT string_agg(DISTINCT p.name, ' ')
+                 FROM sale_items i JOIN products p ON p.id = i.product_id
+                 WHERE i.sale_id = p_sale_id), ''
+            ))), 'B') ||
+            setweight(to_tsvector('spanish', vnts_search_fold(
+                coalesce((SELECT s.name FROM sellers s WHERE s.id = p_seller_id), '') || ' ' ||
+                coalesce((SELECT b.name FROM branches b WHERE b.id = p_branch_id), '')
+            )), 'C') ||
+            setweight(to_tsvector('spanish', vnts_search_fold(coalesce(p_notes, ''))), 'D')
+    $$;
+"""
+
+# Se recalcula al crear la venta, al cambiar sus columnas de búsqueda o cuando
+# otro trigger pide recalcularla dejando search_vector en NULL.
+CREATE_SALES_TRIGGER = """
+    CREATE FUNCTION sales_search_vector_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT'
+            OR NEW.search_vector IS NULL
+            OR NEW.notes IS DISTINCT FROM OLD.notes
+            OR NEW.client_id IS DISTINCT FROM OLD.client_id
+            OR NEW.seller_id IS DISTINCT FROM OLD.seller_id
+            OR NEW.branch_id IS DISTINCT FROM OLD.branch_id
+        THEN
+            NEW.search_vector := sales_search_document(
+                NEW.id, NEW.notes, NEW.client_id, NEW.seller_id, NEW.branch_id
+            );
+        END IF;
+        RETURN NEW;
+    END
+    $$;
+
+    CREATE TRIGGER sales_search_vector_update
+    BEFORE INSERT OR UPDATE ON sales
+    FOR EACH ROW EXECUTE FUNCTION sales_search_vector_update();
+"""
+
+# Las líneas se insertan después de la venta: una sola actualización por venta
+# y sentencia. El admin también borra líneas sueltas (SaleItemAdmin y el inline
+# de la venta), así que el borrado recalcula igual que el alta y la edición.
+CREATE_SALE_ITEMS_TRIGGERS = """
+    CREATE FUNCTION sale_items_refresh_sales_search() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE sales SET search_vector = NULL
+        WHERE id IN (SELECT DISTINCT sale_id FROM changed_items);
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE TRIGGER sale_items_insert_refresh_sales_search
+    AFTER INSERT ON sale_items
+    REFERENCING NEW TABLE AS changed_items
+    FOR EACH STATEMENT EXECUTE FUNCTION sale_items_refresh_sales_search();
+
+    CREATE TRIGGER sale_items_update_refresh_sales_search
+    AFTER UPDATE ON sale_items
+    REFERENCING NEW TABLE AS changed_items
+    FOR EACH STATEMENT EXECUTE FUNCTION sale_items_refresh_sales_search();
+
+    CREATE TRIGGER sale_items_delete_refresh_sales_search
+    AFTER DELETE ON sale_items
+    REFERENCING OLD TABLE AS changed_items
+    FOR EACH STATEMENT EXECUTE FUNCTION sale_items_refresh_sales_search();
+"""
+
+# Renombrar un cliente, vendedor, sucursal o producto recalcula sus ventas
+CREATE_RENAME_TRIGGERS = """
+    CREATE FUNCTION refresh_sales_search_on_rename() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'clients' THEN
+            UPDATE sales SET search_vector = NULL WHERE client_id = NEW.id;
+        ELSIF TG_TABLE_NAME = 'sellers' THEN
+            UPDATE sales SET search_vector = NULL WHERE seller_id = NEW.id;
+        ELSIF TG_TABLE_NAME = 'branches' THEN
+            UPDATE sales SET search_vector = NULL WHERE branch_id = NEW.id;
+        ELSIF TG_TABLE_NAME = 'products' THEN
+            UPDATE sales SET search_vector = NULL
+            WHERE id IN (SELECT sale_id FROM sale_items WHERE product_id = NEW.id);
+        END IF;
+        RETURN NULL;
+    END
+    $$;
+
+    CREATE TRIGGER clients_refresh_sales_search
+    AFTER UPDATE ON clients FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name OR OLD.reference IS DISTINCT FROM NEW.reference)
+    EXECUTE FUNCTION refresh_sales_search_on_rename();
+
+    CREATE TRIGGER sellers_refresh_sales_search
+    AFTER UPDATE ON sellers FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION refresh_sales_search_on_rename();
+
+    CREATE TRIGGER branches_refresh_sales_search
+    AFTER UPDATE ON branches FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION refresh_sales_search_on_rename();
+
+    CREATE TRIGGER products_refresh_sales_search
+    AFTER UPDATE ON products FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION refresh_sales_search_on_rename();
+"""
+
+BACKFILL_SQL = 'UPDATE sales SET search_vector = NULL'
+
+DROP_SQL = """
+    DROP TRIGGER IF EXISTS clients_refresh_sales_search ON clients;
+    DROP TRIGGER IF EXISTS sellers_refresh_sales_search ON sellers;
+    DROP TRIGGER IF EXISTS branches_refresh_sales_search ON branches;
+    DROP TRIGGER IF EXISTS products_refresh_sales_search ON products;
+    DROP FUNCTION IF EXISTS refresh_sales_search_on_rename();
+    DROP TRIGGER IF EXISTS sale_items_insert_refresh_sales_search ON sale_items;
+    DROP TRIGGER IF EXISTS sale_items_update_refresh_sales_search ON sale_items;
+    DROP TRIGGER IF EXISTS sale_items_delete_refresh_sales_search ON sale_items;
+    DROP FUNCTION IF EXISTS sale_items_refresh_sales_search();
+    DROP TRIGGER IF EXISTS sales_search_vector_update ON sales;
+    DROP FUNCTION IF EXISTS sales_search_vector_update();
+    DROP FUNCTION IF EXISTS sales_search_document(uuid, text, uuid, uuid, uuid);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0002_remove_branch_products'),
+        ('clients', '0002_client_search_vector'),
+        ('core', '0004_search_fold'),
+        ('products', '0003_product_search_vector'),
+        ('sales', '0005_client_purchase_stats'),
+        ('sellers', '0003_remove_seller_branch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sale',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='sales_search_vector_gin'),
+        ),
+        migrations.RunSQL(
+            CREATE_DOCUMENT_FUNCTION + CREATE_SALES_TRIGGER + CREATE_SALE_ITEMS_TRIGGERS
+            + CREATE_RENAME_TRIGGERS + BACKFILL_SQL,
+            DROP_SQL
+        ),
+    ]
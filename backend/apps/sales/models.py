@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from apps.core.models import UUIDModel, TenantModel
 
@@ -31,6 +33,9 @@ class Sale(UUIDModel, TenantModel):
     )
     total = models.DecimalField(max_digits=10, decimal_places=2, verbose_name='Total')
     notes = models.TextField(blank=True, verbose_name='Notas')
+    # Cliente, productos, vendedor, sucursal y notas; lo mantienen triggers
+    # (migración sales 0006), también al renombrar cualquiera de ellos
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         db_table = 'sales'
@@ -41,6 +46,7 @@ class Sale(UUIDModel, TenantModel):
             models.Index(fields=['organization', '-created_at']),
             models.Index(fields=['seller', '-created_at']),
             models.Index(fields=['branch', '-created_at']),
+            GinIndex(fields=['search_vector'], name='sales_search_vector_gin'),
         ]
     
     def __str__(self):
@@ -76,3 +82,136 @@ class SaleItem(UUIDModel, TenantModel):
     def save(self, *args, **kwargs):
         self.subtotal = self.price * self.quantity
         super().save(*args, **kwargs)
+
+
+class SalesDailyRollup(UUIDModel, TenantModel):
+    """
+    Totales de ventas por día local, sucursal, vendedor y método de pago.
+    Se actualiza en la misma transacción que las ventas (ver apps.sales.rollups)
+    y se reconstruye con el comando rebuild_sales_rollups.
+    """
+    date = models.DateField(verbose_name='Fecha')
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.CASCADE,
+        related_name='sales_rollups',
+        verbose_name='Sucursal',
+        null=True,
+        blank=True
+    )
+    seller = models.ForeignKey(
+        'sellers.Seller',
+        on_delete=models.CASCADE,
+        related_name='sales_rollups',
+        verbose_name='Vendedor'
+    )
+    payment_method = models.ForeignKey(
+        'payments.PaymentMethod',
+        on_delete=models.CASCADE,
+        related_name='sales_rollups',
+        verbose_name='Método de pago'
+    )
+    sales_count = models.IntegerField(default=0, verbose_name='Ventas')
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Total')
+    commission = models.DecimalField(
+        max_digits=20,
+        decimal_places=6,
+        default=0,
+        verbose_name='Comisión del método de pago'
+    )
+    items_quantity = models.IntegerField(default=0, verbose_name='Artículos vendidos')
+    
+    class Meta:
+        db_table = 'sales_daily_rollup'
+        verbose_name = 'Resumen diario de ventas'
+        verbose_name_plural = 'Resúmenes diarios de ventas'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'date', 'branch', 'seller', 'payment_method'],
+                name='unique_sales_rollup_key'
+            ),
+            # En Postgres los NULL no chocan en un índice único
+            models.UniqueConstraint(
+                fields=['organization', 'date', 'seller', 'payment_method'],
+                condition=models.Q(branch__isnull=True),
+                name='unique_sales_rollup_key_no_branch'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.seller_id} - {self.total}"
+
+
+class SalesProductDailyRollup(UUIDModel, TenantModel):
+    """
+    Cantidad e importe vendidos por día local, sucursal y producto.
+    Se mantiene junto con SalesDailyRollup (ver apps.sales.rollups).
+    """
+    date = models.DateField(verbose_name='Fecha')
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.CASCADE,
+        related_name='product_rollups',
+        verbose_name='Sucursal',
+        null=True,
+        blank=True
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='sales_rollups',
+        verbose_name='Producto'
+    )
+    quantity = models.IntegerField(default=0, verbose_name='Cantidad')
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Importe')
+    
+    class Meta:
+        db_table = 'sales_product_daily_rollup'
+        verbose_name = 'Resumen diario por producto'
+        verbose_name_plural = 'Resúmenes diarios por producto'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'date', 'branch', 'product'],
+                name='unique_product_rollup_key'
+            ),
+            models.UniqueConstraint(
+                fields=['organization', 'date', 'product'],
+                condition=models.Q(branch__isnull=True),
+                name='unique_product_rollup_key_no_branch'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.product_id} - {self.quantity}"
+
+
+class ClientPurchaseStats(TenantModel):
+    """
+    Estadísticas de compras de un cliente. Se mantienen junto con los
+    resúmenes diarios en cada escritura de ventas (ver apps.sales.rollups).
+    """
+    client = models.OneToOneField(
+        'clients.Client',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='purchase_stats',
+        verbose_name='Cliente'
+    )
+    purchase_count = models.IntegerField(default=0, verbose_name='Compras')
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Total gastado')
+    average_ticket = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Ticket promedio')
+    last_purchase = models.DateTimeField(null=True, blank=True, verbose_name='Última compra')
+    
+    class Meta:
+        db_table = 'client_purchase_stats'
+        verbose_name = 'Estadísticas de cliente'
+        verbose_name_plural = 'Estadísticas de clientes'
+        indexes = [
+            models.Index(fields=['organization', 'purchase_count']),
+            models.Index(fields=['organization', 'total_spent']),
+            models.Index(fields=['organization', 'average_ticket']),
+            models.Index(fields=['organization', 'last_purchase']),
+        ]
+    
+    def __str__(self):
+        return f"{self.client_id} - {self.purchase_count}"
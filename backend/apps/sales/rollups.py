@@ -0,0 +1,398 @@
+"""
+Mantenimiento de los resúmenes de ventas: SalesDailyRollup (por vendedor y
+método de pago), SalesProductDailyRollup (por producto) y ClientPurchaseStats
+(por cliente).
+
+Cada escritura de ventas aplica la diferencia de sus totales con un upsert
+(INSERT ... ON CONFLICT DO UPDATE) dentro de la misma transacción, así que los
+reportes leen pocas filas por día en lugar de recorrer todo el historial.
+"""
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection
+from apps.core.change_stamps import bump_change_stamps
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+import pytz
+from .cache import bump_analytics_version
+from .models import ClientPurchaseStats, Sale, SaleItem, SalesDailyRollup, SalesProductDailyRollup
+
+ROLLUP_TABLE = SalesDailyRollup._meta.db_table
+PRODUCT_ROLLUP_TABLE = SalesProductDailyRollup._meta.db_table
+CLIENT_STATS_TABLE = ClientPurchaseStats._meta.db_table
+
+ROLLUP_COLUMNS = (
+    'id, organization_id, created_at, updated_at, date, branch_id, seller_id, '
+    'payment_method_id, sales_count, total, commission, items_quantity'
+)
+
+ROLLUP_UPSERT = """
+    INSERT INTO {table} ({columns})
+    SELECT v.id, %s, NOW(), NOW(), v.date, v.branch_id, v.seller_id, v.payment_method_id,
+           v.sales_count, v.total, v.total * pm.commission_percentage * 0.01, v.items_quantity
+    FROM (VALUES {values}) AS v(id, date, branch_id, seller_id, payment_method_id, sales_count, total, items_quantity)
+    JOIN {payment_methods} pm ON pm.id = v.payment_method_id
+    ON CONFLICT {conflict} DO UPDATE SET
+        sales_count = {table}.sales_count + EXCLUDED.sales_count,
+        total = {table}.total + EXCLUDED.total,
+        commission = {table}.commission + EXCLUDED.commission,
+        items_quantity = {table}.items_quantity + EXCLUDED.items_quantity,
+        updated_at = EXCLUDED.updated_at
+"""
+
+ROLLUP_VALUES_ROW = '(%s::uuid, %s::date, %s::uuid, %s::uuid, %s::uuid, %s::integer, %s::numeric, %s::integer)'
+
+PRODUCT_ROLLUP_COLUMNS = 'id, organization_id, created_at, updated_at, date, branch_id, product_id, quantity, revenue'
+
+PRODUCT_ROLLUP_UPSERT = """
+    INSERT INTO {table} ({columns})
+    VALUES {values}
+    ON CONFLICT {conflict} DO UPDATE SET
+        quantity = {table}.quantity + EXCLUDED.quantity,
+        revenue = {table}.revenue + EXCLUDED.revenue,
+        updated_at = EXCLUDED.updated_at
+"""
+
+PRODUCT_ROLLUP_VALUES_ROW = '(%s::uuid, %s::uuid, NOW(), NOW(), %s::date, %s::uuid, %s::uuid, %s::integer, %s::numeric)'
+
+CLIENT_STATS_COLUMNS = (
+    'client_id, organization_id, created_at, updated_at, '
+    'purchase_count, total_spent, average_ticket, last_purchase'
+)
+
+# last_purchase solo puede avanzar con un upsert; cuando se quitan ventas se
+# recalcula con CLIENT_LAST_PURCHASE_REFRESH
+CLIENT_STATS_UPSERT = """
+    INSERT INTO {table} ({columns})
+    SELECT v.client_id, %s, NOW(), NOW(), v.purchase_count, v.total_spent,
+           COALESCE(ROUND(v.total_spent / NULLIF(v.purchase_count, 0), 2), 0), v.last_purchase
+    FROM (VALUES {values}) AS v(client_id, purchase_count, total_spent, last_purchase)
+    ON CONFLICT (client_id) DO UPDATE SET
+        purchase_count = {table}.purchase_count + EXCLUDED.purchase_count,
+        total_spent = {table}.total_spent + EXCLUDED.total_spent,
+        average_ticket = COALESCE(ROUND(
+            ({table}.total_spent + EXCLUDED.total_spent)
+            / NULLIF({table}.purchase_count + EXCLUDED.purchase_count, 0), 2
+        ), 0),
+        last_purchase = GREATEST({table}.last_purchase, EXCLUDED.last_purchase),
+        updated_at = EXCLUDED.updated_at
+"""
+
+CLIENT_STATS_VALUES_ROW = '(%s::uuid, %s::integer, %s::numeric, %s::timestamptz)'
+
+CLIENT_LAST_PURCHASE_REFRESH = """
+    UPDATE {table} SET last_purchase = (
+        SELECT MAX(s.created_at) FROM {sales} s WHERE s.client_id = {table}.client_id
+    )
+    WHERE client_id = ANY(%s)
+"""
+
+
+def rollup_lock_key(organization_id):
+    return f'sales-rollup:{organization_id}'
+
+
+def sale_snapshot(sale, items):
+    """Contribución de una venta en memoria y sus líneas a los resúmenes diarios."""
+    return {
+        'organization_id': sale.organization_id,
+        'date': timezone.localtime(sale.created_at).date(),
+        'branch_id': sale.branch_id,
+        'seller_id': sale.seller_id,
+        'payment_method_id': sale.payment_method_id,
+        'client_id': sale.client_id,
+        'created_at': sale.created_at,
+        'total': sale.total,
+        'items': [(item.product_id, item.quantity, item.subtotal) for item in items],
+    }
+
+
+def sale_snapshots(sale_ids):
+    """Contribución actual de las ventas indicadas, leída de la base de datos."""
+    if not sale_ids:
+        return []
+
+    snapshots = list(Sale.objects.filter(pk__in=sale_ids).order_by().annotate(
+        date=TruncDate('created_at', tzinfo=pytz.timezone(settings.TIME_ZONE))
+    ).values(
+        'id', 'organization_id', 'date', 'branch_id', 'seller_id', 'payment_method_id',
+        'client_id', 'created_at', 'total'
+    ))
+
+    items = defaultdict(list)
+    for sale_id, product_id, quantity, subtotal in SaleItem.objects.filter(
+        sale_id__in=[snapshot['id'] for snapshot in snapshots]
+    ).order_by().values_list('sale_id', 'product_id', 'quantity', 'subtotal'):
+        items[sale_id].append((product_id, quantity, subtotal))
+
+    for snapshot in snapshots:
+        snapshot['items'] = items[snapshot.pop('id')]
+    return snapshots
+
+
+def stable_order(keys):
+    """
+    Orden estable de llaves para que transacciones concurrentes bloqueen
+    filas en el mismo orden.
+    """
+    return sorted(keys, key=lambda key: tuple(str(part) for part in key))
+
+
+def apply_rollup_changes(before=(), after=()):
+    """
+    Resta las contribuciones `before` y suma las de `after` en los resúmenes
+    diarios. Debe llamarse dentro de la transacción que modificó las ventas.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0])
+    product_deltas = defaultdict(lambda: [0, 0])
+    client_deltas = defaultdict(lambda: [0, 0, None])
+    removed_clients = set()
+    for sign, snapshots in ((-1, before), (1, after)):
+        for snapshot in snapshots:
+            key = (
+                snapshot['organization_id'], snapshot['date'], snapshot['branch_id'],
+                snapshot['seller_id'], snapshot['payment_method_id']
+            )
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += sign * snapshot['total']
+
+            client_key = (snapshot['organization_id'], snapshot['client_id'])
+            client_delta = client_deltas[client_key]
+            client_delta[0] += sign
+            client_delta[1] += sign * snapshot['total']
+            if sign > 0:
+                client_delta[2] = max(filter(None, (client_delta[2], snapshot['created_at'])))
+            else:
+                removed_clients.add(client_key)
+            for product_id, quantity, subtotal in snapshot['items']:
+                delta[2] += sign * quantity
+                product_delta = product_deltas[key[:3] + (product_id,)]
+                product_delta[0] += sign * quantity
+                product_delta[1] += sign * subtotal
+
+    by_organization = defaultdict(list)
+    for key in stable_order(deltas):
+        sales_count, total, items_quantity = deltas[key]
+        if sales_count or total or items_quantity:
+            by_organization[key[0]].append((key, sales_count, total, items_quantity))
+
+    products_by_organization = defaultdict(list)
+    for key in stable_order(product_deltas):
+        quantity, revenue = product_deltas[key]
+        if quantity or revenue:
+            products_by_organization[key[0]].append((key, quantity, revenue))
+
+    clients_by_organization = defaultdict(list)
+    for key in stable_order(client_deltas):
+        purchase_count, total_spent, last_purchase = client_deltas[key]
+        if purchase_count or total_spent or last_purchase or key in removed_clients:
+            clients_by_organization[key[0]].append((key, purchase_count, total_spent, last_purchase))
+
+    with connection.cursor() as cursor:
+        organization_ids = set(by_organization) | set(products_by_organization) | set(clients_by_organization)
+        for organization_id in organization_ids:
+            rows = by_organization[organization_id]
+            product_rows = products_by_organization[organization_id]
+            client_rows = clients_by_organization[organization_id]
+
+            # Compartido: las escrituras no se bloquean entre sí, solo contra una reconstrucción
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock_shared(hashtext(%s))',
+                [rollup_lock_key(organization_id)]
+            )
+            for has_branch in (True, False):
+                group = [row for row in rows if (row[0][2] is not None) == has_branch]
+                if group:
+                    _upsert(cursor, organization_id, group, has_branch)
+                group = [row for row in product_rows if (row[0][2] is not None) == has_branch]
+                if group:
+                    _upsert_products(cursor, organization_id, group, has_branch)
+
+            if client_rows:
+                _upsert_clients(cursor, organization_id, client_rows)
+                bump_change_stamps(organization_id, ClientPurchaseStats)
+                removed = [key[1] for key, *_ in client_rows if key in removed_clients]
+                if removed:
+                    cursor.execute(
+                        CLIENT_LAST_PURCHASE_REFRESH.format(table=CLIENT_STATS_TABLE, sales=Sale._meta.db_table),
+                        [removed]
+                    )
+
+            if rows:
+                cursor.execute(
+                    f'DELETE FROM {ROLLUP_TABLE} WHERE organization_id = %s AND date = ANY(%s) AND sales_count <= 0',
+                    [organization_id, sorted({row[0][1] for row in rows})]
+                )
+            if product_rows:
+                cursor.execute(
+                    f'DELETE FROM {PRODUCT_ROLLUP_TABLE} WHERE organization_id = %s AND date = ANY(%s) AND quantity <= 0',
+                    [organization_id, sorted({row[0][1] for row in product_rows})]
+                )
+
+
+def _upsert(cursor, organization_id, rows, has_branch):
+    if has_branch:
+        conflict = '(organization_id, date, branch_id, seller_id, payment_method_id)'
+    else:
+        conflict = '(organization_id, date, seller_id, payment_method_id) WHERE branch_id IS NULL'
+
+    params = [organization_id]
+    for (_, date, branch_id, seller_id, payment_method_id), sales_count, total, items_quantity in rows:
+        params.extend([
+            uuid.uuid4(), date, branch_id, seller_id, payment_method_id,
+            sales_count, total, items_quantity
+        ])
+
+    from apps.payments.models import PaymentMethod
+    cursor.execute(
+        ROLLUP_UPSERT.format(
+            table=ROLLUP_TABLE,
+            columns=ROLLUP_COLUMNS,
+            values=', '.join([ROLLUP_VALUES_ROW] * len(rows)),
+            payment_methods=PaymentMethod._meta.db_table,
+            conflict=conflict
+        ),
+        params
+    )
+
+
+def _upsert_products(cursor, organization_id, rows, has_branch):
+    if has_branch:
+        conflict = '(organization_id, date, branch_id, product_id)'
+    else:
+        conflict = '(organization_id, date, product_id) WHERE branch_id IS NULL'
+
+    params = []
+    for (_, date, branch_id, product_id), quantity, revenue in rows:
+        params.extend([uuid.uuid4(), organization_id, date, branch_id, product_id, quantity, revenue])
+
+    cursor.execute(
+        PRODUCT_ROLLUP_UPSERT.format(
+            table=PRODUCT_ROLLUP_TABLE,
+            columns=PRODUCT_ROLLUP_COLUMNS,
+            values=', '.join([PRODUCT_ROLLUP_VALUES_ROW] * len(rows)),
+            conflict=conflict
+        ),
+        params
+    )
+
+
+def _upsert_clients(cursor, organization_id, rows):
+    params = [organization_id]
+    for (_, client_id), purchase_count, total_spent, last_purchase in rows:
+        params.extend([client_id, purchase_count, total_spent, last_purchase])
+
+    cursor.execute(
+        CLIENT_STATS_UPSERT.format(
+            table=CLIENT_STATS_TABLE,
+            columns=CLIENT_STATS_COLUMNS,
+            values=', '.join([CLIENT_STATS_VALUES_ROW] * len(rows))
+        ),
+        params
+    )
+
+
+@contextmanager
+def track_sale_changes(sale_ids):
+    """
+    Registra el estado de las ventas antes y después del bloque y aplica la
+    diferencia a los resúmenes diarios. Sirve para actualizaciones y eliminaciones.
+    """
+    sale_ids = list(sale_ids)
+    before = sale_snapshots(sale_ids)
+    yield
+    apply_rollup_changes(before=before, after=sale_snapshots(sale_ids))
+
+
+def rebuild_sales_rollup(organization_id):
+    """
+    Recalcula desde cero los resúmenes diarios de una organización y devuelve
+    el número de filas generadas. Bloquea las escrituras de ventas de la
+    organización mientras corre.
+    """
+    from apps.clients.models import Client
+    from apps.payments.models import PaymentMethod
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [rollup_lock_key(organization_id)])
+        cursor.execute(f'DELETE FROM {ROLLUP_TABLE} WHERE organization_id = %s', [organization_id])
+        cursor.execute(f'DELETE FROM {PRODUCT_ROLLUP_TABLE} WHERE organization_id = %s', [organization_id])
+        cursor.execute(f'DELETE FROM {CLIENT_STATS_TABLE} WHERE organization_id = %s', [organization_id])
+        cursor.execute(
+            f"""
+            INSERT INTO {ROLLUP_TABLE} ({ROLLUP_COLUMNS})
+            SELECT gen_random_uuid(), s.organization_id, NOW(), NOW(),
+                   (s.created_at AT TIME ZONE %s)::date AS day, s.branch_id, s.seller_id, s.payment_method_id,
+                   COUNT(*), SUM(s.total), SUM(s.total) * pm.commission_percentage * 0.01,
+                   COALESCE(SUM(q.quantity), 0)
+            FROM {Sale._meta.db_table} s
+            JOIN {PaymentMethod._meta.db_table} pm ON pm.id = s.payment_method_id
+            LEFT JOIN (
+                SELECT sale_id, SUM(quantity) AS quantity
+                FROM {SaleItem._meta.db_table}
+                WHERE organization_id = %s
+                GROUP BY sale_id
+            ) q ON q.sale_id = s.id
+            WHERE s.organization_id = %s
+            GROUP BY s.organization_id, day, s.branch_id, s.seller_id, s.payment_method_id, pm.commission_percentage
+            """,
+            [settings.TIME_ZONE, organization_id, organization_id]
+        )
+        rows = cursor.rowcount
+        cursor.execute(
+            f"""
+            INSERT INTO {PRODUCT_ROLLUP_TABLE} ({PRODUCT_ROLLUP_COLUMNS})
+            SELECT gen_random_uuid(), s.organization_id, NOW(), NOW(),
+                   (s.created_at AT TIME ZONE %s)::date AS day, s.branch_id, i.product_id,
+                   SUM(i.quantity), SUM(i.subtotal)
+            FROM {SaleItem._meta.db_table} i
+            JOIN {Sale._meta.db_table} s ON s.id = i.sale_id
+            WHERE s.organization_id = %s
+            GROUP BY s.organization_id, day, s.branch_id, i.product_id
+            """,
+            [settings.TIME_ZONE, organization_id]
+        )
+        rows += cursor.rowcount
+        cursor.execute(
+            f"""
+            INSERT INTO {CLIENT_STATS_TABLE} ({CLIENT_STATS_COLUMNS})
+            SELECT c.id, c.organization_id, NOW(), NOW(),
+                   COUNT(s.id), COALESCE(SUM(s.total), 0),
+                   COALESCE(ROUND(SUM(s.total) / NULLIF(COUNT(s.id), 0), 2), 0),
+                   MAX(s.created_at)
+            FROM {Client._meta.db_table} c
+            LEFT JOIN {Sale._meta.db_table} s ON s.client_id = c.id
+            WHERE c.organization_id = %s
+            GROUP BY c.id, c.organization_id
+            """,
+            [organization_id]
+        )
+        rows += cursor.rowcount
+
+    bump_analytics_version(organization_id)
+    bump_change_stamps(organization_id, ClientPurchaseStats)
+    return rows
+
+
+def sync_payment_method_commission(payment_method):
+    """
+    Recalcula la comisión guardada cuando cambia el porcentaje del método de
+    pago; los reportes aplican siempre el porcentaje vigente.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {ROLLUP_TABLE} SET commission = total * %s::numeric * 0.01, updated_at = NOW() '
+            f'WHERE payment_method_id = %s',
+            [payment_method.commission_percentage, payment_method.id]
+        )
+
+
+def create_client_stats(client):
+    """Registro de estadísticas en cero para un cliente nuevo."""
+    ClientPurchaseStats.objects.bulk_create(
+        [ClientPurchaseStats(client=client, organization_id=client.organization_id)],
+        ignore_conflicts=True
+    )
@@ -1,26 +1,36 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import Prefetch
+from apps.core.eager_loading import EagerLoadingMixin
 from .models import Sale, SaleItem
 from apps.sellers.serializers import SellerSerializer
 from apps.clients.serializers import ClientSerializer
 from apps.payments.serializers import PaymentMethodSerializer
 
 
-class SaleItemSerializer(serializers.ModelSerializer):
+class SaleItemSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     
+    select_related_fields = ('product',)
+    
     class Meta:
         model = SaleItem
         fields = ['id', 'product', 'product_name', 'quantity', 'price', 'subtotal', 'organization']
         read_only_fields = ['id', 'subtotal']
 
 
-class SaleSerializer(serializers.ModelSerializer):
+class SaleSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     items = serializers.SerializerMethodField()
     seller_name = serializers.CharField(source='seller.name', read_only=True)
     client_name = serializers.CharField(source='client.name', read_only=True)
     payment_method_name = serializers.CharField(source='payment_method.name', read_only=True)
     branch_name = serializers.CharField(source='branch.name', read_only=True, allow_null=True)
     
+    select_related_fields = ('seller', 'client', 'payment_method', 'branch')
+    prefetch_related_fields = (
+        Prefetch('items', queryset=SaleItemSerializer.setup_eager_loading(SaleItem.objects.all())),
+    )
+    
     class Meta:
         model = Sale
         fields = [
@@ -35,6 +45,18 @@ class SaleSerializer(serializers.ModelSerializer):
         return SaleItemSerializer(items, many=True).data
 
 
+class SaleItemCreateSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    
+    def validate(self, attrs):
+        # El subtotal se calcula aquí porque bulk_create no llama a SaleItem.save
+        attrs['subtotal'] = attrs['price'] * attrs['quantity']
+        return attrs
+
+
 class SaleCreateSerializer(serializers.Serializer):
     branch_id = serializers.UUIDField(required=False, allow_null=True)
     seller_id = serializers.UUIDField()
@@ -43,22 +65,39 @@ class SaleCreateSerializer(serializers.Serializer):
     total = serializers.DecimalField(max_digits=10, decimal_places=2)
     notes = serializers.CharField(required=False, allow_blank=True)
     organization_id = serializers.UUIDField()
-    items = serializers.ListField(child=serializers.DictField())
+    items = SaleItemCreateSerializer(many=True, allow_empty=False)
     
+    def validate(self, attrs):
+        from apps.products.models import Product
+        
+        # Validar todos los productos en una sola consulta
+        product_ids = {item['product_id'] for item in attrs['items']}
+        valid_ids = set(Product.objects.filter(
+            organization_id=attrs['organization_id'],
+            id__in=product_ids,
+            active=True
+        ).values_list('id', flat=True))
+        
+        invalid_ids = product_ids - valid_ids
+        if invalid_ids:
+            raise serializers.ValidationError({
+                'items': f'Productos inexistentes o inactivos: {", ".join(sorted(str(i) for i in invalid_ids))}'
+            })
+        
+        return attrs
+    
+    @transaction.atomic
     def create(self, validated_data):
-        from apps.branches.models import Branch
+        from apps.core.reference_data import get_default_branch_id
+        from .rollups import apply_rollup_changes, sale_snapshot
         
         items_data = validated_data.pop('items')
+        organization_id = validated_data['organization_id']
         branch_id = validated_data.get('branch_id')
         
         # Si no se proporciona branch_id, usar la sucursal por defecto
         if not branch_id:
-            default_branch = Branch.objects.filter(
-                organization_id=validated_data['organization_id'],
-                code='PRINCIPAL'
-            ).first()
-            if default_branch:
-                branch_id = default_branch.id
+            branch_id = get_default_branch_id(organization_id)
         
         # Crear venta
         sale = Sale.objects.create(
@@ -68,18 +107,47 @@ class SaleCreateSerializer(serializers.Serializer):
             payment_method_id=validated_data['payment_method_id'],
             total=validated_data['total'],
             notes=validated_data.get('notes', ''),
-            organization_id=validated_data['organization_id']
+            organization_id=organization_id
         )
         
-        # Crear items
-        for item_data in items_data:
-            SaleItem.objects.create(
+        # Crear items en un solo INSERT
+        items = SaleItem.objects.bulk_create([
+            SaleItem(
                 sale=sale,
                 product_id=item_data['product_id'],
-                quantity=item_data.get('quantity', 1),
+                quantity=item_data['quantity'],
                 price=item_data['price'],
                 subtotal=item_data['subtotal'],
-                organization_id=validated_data['organization_id']
+                organization_id=organization_id
             )
+            for item_data in items_data
+        ])
+        
+        apply_rollup_changes(after=[sale_snapshot(sale, items)])
         
         return sale
+
+
+class SaleBatchEntrySerializer(serializers.Serializer):
+    """
+    Venta capturada sin conexión en el POS. El `id` lo genera el cliente y hace
+    idempotente el reenvío del lote.
+    """
+    id = serializers.UUIDField()
+    branch_id = serializers.UUIDField(required=False, allow_null=True)
+    seller_id = serializers.UUIDField()
+    client_id = serializers.UUIDField()
+    payment_method_id = serializers.UUIDField()
+    total = serializers.DecimalField(max_digits=10, decimal_places=2)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    created_at = serializers.DateTimeField(required=False)
+    items = SaleItemCreateSerializer(many=True, allow_empty=False)
+
+
+class SaleBatchSerializer(serializers.Serializer):
+    organization_id = serializers.UUIDField()
+    sales = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=5000
+    )
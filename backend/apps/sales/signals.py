@@ -0,0 +1,65 @@
+"""
+Signals para mantener los resúmenes de ventas alineados con los métodos de pago
+y los clientes, e invalidar la caché de analítica.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.clients.models import Client
+from apps.payments.models import PaymentMethod
+from apps.products.models import Product
+from apps.sellers.models import Seller
+from .cache import bump_analytics_version
+from .models import Sale, SaleItem
+from .rollups import create_client_stats, sync_payment_method_commission
+
+
+@receiver(pre_save, sender=PaymentMethod)
+def remember_commission_percentage(sender, instance, update_fields=None, **kwargs):
+    """
+    Guarda el porcentaje anterior para que update_rollup_commission solo
+    reescriba los resúmenes cuando realmente cambió.
+    """
+    instance._previous_commission_percentage = None
+    if instance._state.adding or (update_fields is not None and 'commission_percentage' not in update_fields):
+        return
+    instance._previous_commission_percentage = (
+        PaymentMethod.objects.filter(pk=instance.pk).values_list('commission_percentage', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=PaymentMethod)
+def update_rollup_commission(sender, instance, created, **kwargs):
+    """
+    Recalcula la comisión acumulada del método de pago si cambió su porcentaje.
+    """
+    previous = getattr(instance, '_previous_commission_percentage', None)
+    if not created and previous is not None and previous != instance.commission_percentage:
+        sync_payment_method_commission(instance)
+
+
+@receiver(post_save, sender=Client)
+def create_purchase_stats(sender, instance, created, **kwargs):
+    """
+    Crea las estadísticas en cero del cliente nuevo para que aparezca al
+    ordenar el listado de clientes por compras.
+    """
+    if created:
+        create_client_stats(instance)
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+@receiver(post_save, sender=SaleItem)
+@receiver(post_delete, sender=SaleItem)
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Seller)
+@receiver(post_save, sender=PaymentMethod)
+@receiver(post_delete, sender=PaymentMethod)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_analytics(sender, instance, **kwargs):
+    """
+    Cambia la versión de analítica de la organización al confirmar la escritura.
+    Productos incluidos porque top_products y by_category muestran su nombre y categoría.
+    """
+    bump_analytics_version(instance.organization_id)
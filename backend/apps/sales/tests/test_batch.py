@@ -0,0 +1,77 @@
+"""
+Ingesta por lotes de ventas sin conexión (/sales/batch/, apps.sales.batch).
+"""
+import uuid
+from rest_framework.test import APITestCase
+from apps.sales.models import Sale, SaleItem
+from .utils import create_tenant, sale_payload
+
+
+class SaleBatchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant('Lote')
+        cls.other = create_tenant('Ajena')
+
+    def entry(self, tenant=None, **overrides):
+        payload = sale_payload(tenant or self.tenant, id=str(uuid.uuid4()))
+        payload.pop('organization_id')
+        payload.update(overrides)
+        return payload
+
+    def post(self, entries):
+        response = self.client.post(
+            '/api/v1/sales/batch/',
+            {'organization_id': str(self.tenant['organization'].id), 'sales': entries},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_resend_reports_duplicates(self):
+        entries = [self.entry(), self.entry()]
+        # Repetida dentro del mismo lote
+        entries.append(dict(entries[0]))
+
+        response = self.post(entries)
+        self.assertEqual(
+            [result['status'] for result in response['results']], ['accepted', 'accepted', 'duplicate']
+        )
+        self.assertEqual(Sale.objects.filter(organization=self.tenant['organization']).count(), 2)
+        self.assertEqual(SaleItem.objects.filter(organization=self.tenant['organization']).count(), 4)
+
+        response = self.post(entries[:2])
+        self.assertEqual((response['accepted'], response['duplicates']), (0, 2))
+        self.assertEqual(Sale.objects.filter(organization=self.tenant['organization']).count(), 2)
+
+    def test_rejects_references_of_other_organization(self):
+        other = self.other
+        entries = [
+            self.entry(seller_id=str(other['seller'].id)),
+            self.entry(client_id=str(other['client'].id), payment_method_id=str(other['payment_method'].id)),
+            self.entry(branch_id=str(other['branch'].id)),
+            self.entry(items=[{'product_id': str(other['products'][0].id), 'quantity': 1, 'price': '10.00'}]),
+        ]
+        # La repetición de una venta rechazada se rechaza con los mismos errores
+        entries.append(dict(entries[0]))
+
+        response = self.post(entries)
+        results = response['results']
+        self.assertEqual(response['rejected'], 5)
+        self.assertEqual(set(results[0]['errors']), {'seller_id'})
+        self.assertEqual(set(results[1]['errors']), {'client_id', 'payment_method_id'})
+        self.assertEqual(set(results[2]['errors']), {'branch_id'})
+        self.assertEqual(set(results[3]['errors']), {'items'})
+        self.assertEqual(results[4]['errors'], results[0]['errors'])
+        self.assertFalse(Sale.objects.filter(organization=self.tenant['organization']).exists())
+
+    def test_rejects_id_used_by_other_organization(self):
+        other = self.other
+        taken = Sale.objects.create(
+            organization=other['organization'], branch=other['branch'], seller=other['seller'],
+            client=other['client'], payment_method=other['payment_method'], total='10.00'
+        )
+        response = self.post([self.entry(id=str(taken.id))])
+        self.assertEqual(response['results'][0]['status'], 'rejected')
+        self.assertEqual(response['results'][0]['errors'], {'id': ['El ID ya está en uso']})
@@ -0,0 +1,90 @@
+"""
+Resúmenes diarios mantenidos en cada escritura (apps.sales.rollups).
+
+Tras cada alta, edición o baja los resúmenes deben quedar iguales a los que
+produce rebuild_sales_rollup recalculando desde las ventas.
+"""
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from apps.payments.models import PaymentMethod
+from apps.sales.models import ClientPurchaseStats, SalesDailyRollup, SalesProductDailyRollup
+from apps.sales.rollups import ROLLUP_TABLE, rebuild_sales_rollup
+from apps.sellers.models import Seller
+from .utils import create_tenant, sale_payload
+
+ROLLUP_FIELDS = {
+    SalesDailyRollup: ('date', 'branch_id', 'seller_id', 'payment_method_id', 'sales_count', 'total', 'commission', 'items_quantity'),
+    SalesProductDailyRollup: ('date', 'branch_id', 'product_id', 'quantity', 'revenue'),
+    ClientPurchaseStats: ('client_id', 'purchase_count', 'total_spent', 'average_ticket', 'last_purchase'),
+}
+
+
+class SalesRollupTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant('Resumen')
+        organization = cls.tenant['organization']
+        cls.other_seller = Seller.objects.create(organization=organization, name='Otro vendedor', numeric_code='200')
+        cls.cash = PaymentMethod.objects.create(organization=organization, name='Efectivo')
+
+    def snapshot(self):
+        organization = self.tenant['organization']
+        return {
+            model._meta.label: sorted(
+                model.objects.filter(organization=organization).values_list(*fields), key=str
+            )
+            for model, fields in ROLLUP_FIELDS.items()
+        }
+
+    def assertMatchesRebuild(self):
+        maintained = self.snapshot()
+        rebuild_sales_rollup(self.tenant['organization'].id)
+        self.assertEqual(maintained, self.snapshot())
+
+    def create_sale(self):
+        response = self.client.post('/api/v1/sales/', sale_payload(self.tenant), format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+    def test_create_update_delete_match_rebuild(self):
+        first = self.create_sale()
+        second = self.create_sale()
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            SalesDailyRollup.objects.get(organization=self.tenant['organization']).sales_count, 2
+        )
+
+        # Mover una venta a otro vendedor y método de pago con otro total
+        response = self.client.patch(f'/api/v1/sales/{second}/', {
+            'seller': str(self.other_seller.id), 'payment_method': str(self.cash.id), 'total': '50.00'
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertMatchesRebuild()
+        self.assertEqual(SalesDailyRollup.objects.filter(organization=self.tenant['organization']).count(), 2)
+
+        self.assertEqual(self.client.delete(f'/api/v1/sales/{first}/').status_code, 204)
+        self.assertMatchesRebuild()
+        rollup = SalesDailyRollup.objects.get(organization=self.tenant['organization'])
+        self.assertEqual((rollup.sales_count, rollup.total), (1, Decimal('50.00')))
+
+        self.assertEqual(self.client.delete(f'/api/v1/sales/{second}/').status_code, 204)
+        self.assertMatchesRebuild()
+        self.assertFalse(SalesDailyRollup.objects.filter(organization=self.tenant['organization']).exists())
+
+    def test_commission_rewritten_only_when_percentage_changes(self):
+        self.create_sale()
+        payment_method = PaymentMethod.objects.get(pk=self.tenant['payment_method'].pk)
+
+        payment_method.name = 'Tarjeta renombrada'
+        with CaptureQueriesContext(connection) as queries:
+            payment_method.save()
+        self.assertFalse([q for q in queries if q['sql'].startswith(f'UPDATE {ROLLUP_TABLE}')])
+
+        payment_method.commission_percentage = Decimal('10.00')
+        with CaptureQueriesContext(connection) as queries:
+            payment_method.save()
+        self.assertTrue([q for q in queries if q['sql'].startswith(f'UPDATE {ROLLUP_TABLE}')])
+        self.assertMatchesRebuild()
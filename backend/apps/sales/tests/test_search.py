@@ -0,0 +1,66 @@
+"""
+Búsqueda de ventas (?search=) sobre el documento mantenido por triggers.
+"""
+from decimal import Decimal
+from rest_framework.test import APITestCase
+from apps.products.models import Product
+from apps.sales.models import Sale, SaleItem
+from .utils import create_tenant
+
+
+class SaleSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant('Busqueda')
+        tenant = cls.tenant
+        cls.sale = Sale.objects.create(
+            organization=tenant['organization'], branch=tenant['branch'], seller=tenant['seller'],
+            client=tenant['client'], payment_method=tenant['payment_method'], total=Decimal('12.00')
+        )
+        cls.larger_sale = Sale.objects.create(
+            organization=tenant['organization'], branch=tenant['branch'], seller=tenant['seller'],
+            client=tenant['client'], payment_method=tenant['payment_method'], total=Decimal('80.00')
+        )
+
+    def search(self, term):
+        url = f'/api/v1/sales/?organization_id={self.tenant["organization"].id}&search={term}'
+        return [item['id'] for item in self.client.get(url).json()['results']]
+
+    def test_sale_search_document(self):
+        """El documento de la venta incluye sus productos y sigue los renombres."""
+        product = Product.objects.create(
+            organization=self.tenant['organization'], name='Pan dulce', price=Decimal('12.00')
+        )
+        item = SaleItem.objects.create(
+            organization=self.tenant['organization'], sale=self.sale, product=product, quantity=1, price=product.price
+        )
+        client = self.tenant['client']
+        client.name = 'Tienda Ñandú'
+        client.save()
+
+        for term in ('pan dulce', 'nandu', 'ñandú pan'):
+            with self.subTest(term=term):
+                self.assertIn(str(self.sale.id), self.search(term))
+        self.assertEqual(self.search('chocolate'), [])
+
+        # Borrar la línea suelta (como hace el admin) saca el producto del documento
+        item.delete()
+        self.assertEqual(self.search('pan dulce'), [])
+
+    def test_search_keeps_page_pagination_and_ordering(self):
+        """La búsqueda pagina por número de página (con count) y respeta ?ordering=."""
+        url = f'/api/v1/sales/?organization_id={self.tenant["organization"].id}&search=cliente'
+        page = self.client.get(f'{url}&ordering=total').json()
+        self.assertEqual(page['count'], 2)
+        self.assertEqual([item['id'] for item in page['results']], [str(self.sale.id), str(self.larger_sale.id)])
+
+        page = self.client.get(f'{url}&pagination=cursor').json()
+        self.assertNotIn('count', page)
+        self.assertEqual(len(page['results']), 2)
+
+    def test_ordering_with_cursor_is_rejected(self):
+        url = f'/api/v1/sales/?organization_id={self.tenant["organization"].id}&search=cliente'
+        response = self.client.get(f'{url}&pagination=cursor&ordering=total')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
@@ -0,0 +1,52 @@
+"""
+Datos mínimos para las pruebas de ventas.
+"""
+from decimal import Decimal
+from apps.branches.models import Branch
+from apps.clients.models import Client
+from apps.organizations.models import Organization
+from apps.payments.models import PaymentMethod
+from apps.products.models import Product
+from apps.sellers.models import Seller
+
+
+def create_tenant(name):
+    """
+    Organización con su sucursal PRINCIPAL, un vendedor (5 %), un método de
+    pago (3.50 %), un cliente y dos productos. Devuelve un dict con los objetos.
+    """
+    organization = Organization.objects.create(name=name, slug=name.lower())
+    return {
+        'organization': organization,
+        'branch': Branch.objects.get(organization=organization, code='PRINCIPAL'),
+        'seller': Seller.objects.create(
+            organization=organization, name='Vendedor', numeric_code='100',
+            commission_percentage=Decimal('5.00')
+        ),
+        'payment_method': PaymentMethod.objects.create(
+            organization=organization, name='Tarjeta', commission_percentage=Decimal('3.50')
+        ),
+        'client': Client.objects.create(organization=organization, name='Cliente'),
+        'products': [
+            Product.objects.create(organization=organization, name='Producto A', price=Decimal('10.00')),
+            Product.objects.create(organization=organization, name='Producto B', price=Decimal('25.50')),
+        ],
+    }
+
+
+def sale_payload(tenant, **overrides):
+    """Body de POST /sales/ con una unidad de cada producto del tenant."""
+    products = tenant['products']
+    payload = {
+        'organization_id': str(tenant['organization'].id),
+        'seller_id': str(tenant['seller'].id),
+        'client_id': str(tenant['client'].id),
+        'payment_method_id': str(tenant['payment_method'].id),
+        'total': str(sum(product.price for product in products)),
+        'items': [
+            {'product_id': str(product.id), 'quantity': 1, 'price': str(product.price)}
+            for product in products
+        ],
+    }
+    payload.update(overrides)
+    return payload
@@ -2,18 +2,49 @@ from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Count
-from .models import Sale, SaleItem
-from .serializers import SaleSerializer, SaleCreateSerializer
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from apps.core.change_stamps import ConditionalGetMixin
+from apps.core.eager_loading import EagerLoadingViewSetMixin
+from apps.core.idempotency import idempotent
+from apps.core.search import TenantSearchFilter
+from apps.core.sync import ChangeFeedMixin
+from apps.branches.models import Branch
+from apps.clients.models import Client
+from apps.payments.models import PaymentMethod
+from apps.products.models import Product
+from apps.sellers.models import Seller
+from .cache import cached_analytics
+from .models import ClientPurchaseStats, Sale, SaleItem, SalesDailyRollup, SalesProductDailyRollup
+from .rollups import track_sale_changes
+from .serializers import SaleSerializer, SaleCreateSerializer, SaleBatchSerializer
+from .analytics import (
+    payment_method_breakdown, seller_commissions, sales_timeseries, top_products,
+    category_breakdown, sales_period_summary, TIMESERIES_GRANULARITIES
+)
 
 
-class SaleViewSet(viewsets.ModelViewSet):
+# Ventas leídas por bloque del cursor del servidor al exportar
+EXPORT_CHUNK_SIZE = 2000
+
+# Límite por defecto y máximo de top_products
+TOP_PRODUCTS_LIMIT = 10
+MAX_TOP_PRODUCTS_LIMIT = 100
+
+
+class SaleViewSet(ConditionalGetMixin, ChangeFeedMixin, EagerLoadingViewSetMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TenantSearchFilter]
     filterset_fields = ['seller', 'client', 'payment_method']
     search_fields = ['notes', 'client__name', 'seller__name']
+    search_vector_field = 'search_vector'
+    # El historial se lee por fecha, no por relevancia
+    search_ranked = False
     ordering_fields = ['created_at', 'total']
     ordering = ['-created_at']
+    # Cada venta muestra nombres de vendedor, cliente, método de pago, sucursal y productos
+    change_stamp_models = (Sale, SaleItem, Seller, Client, PaymentMethod, Branch, Product)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -21,10 +52,51 @@ class SaleViewSet(viewsets.ModelViewSet):
         return SaleSerializer
     
     def get_queryset(self):
-        queryset = Sale.objects.select_related(
-            'seller', 'client', 'payment_method', 'organization'
-        ).prefetch_related('items')
+        return self.filter_by_request(Sale.objects.defer('search_vector'))
+    
+    def get_rollup_queryset(self):
+        """
+        Resumen diario con los mismos filtros de get_queryset, más el rango
+        opcional start/end (YYYY-MM-DD) sobre la fecha local.
+        """
+        return self.filter_by_date_range(self.filter_by_request(SalesDailyRollup.objects.all()))
+    
+    def get_product_sales_queryset(self):
+        """
+        Origen de las agregaciones por producto: el resumen diario por producto
+        con los filtros de organización, sucursal y start/end. El resumen no
+        distingue vendedor ni método de pago; si la petición filtra por ellos se
+        usan las ventas y sus líneas.
+        """
+        if any(self.request.query_params.get(param) for param in ('seller_id', 'payment_method_id')):
+            queryset = self.get_queryset()
+        else:
+            queryset = self.filter_by_request(SalesProductDailyRollup.objects.all())
+        return self.filter_by_date_range(queryset)
+    
+    def filter_by_date_range(self, queryset):
+        """Rango opcional start/end (YYYY-MM-DD) sobre la fecha local de la venta"""
+        from rest_framework.exceptions import ValidationError
+        from apps.core.utils import parse_date_filter
+        
+        for param, bound in (('start', 0), ('end', 1)):
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            date_range = parse_date_filter(value)
+            if not date_range:
+                raise ValidationError({'error': 'Formato de fecha inválido, usa YYYY-MM-DD'})
+            if queryset.model is Sale:
+                lookup = 'created_at__gte' if bound == 0 else 'created_at__lte'
+                queryset = queryset.filter(**{lookup: date_range[bound]})
+            else:
+                lookup = 'date__gte' if bound == 0 else 'date__lte'
+                queryset = queryset.filter(**{lookup: date_range[0].date()})
         
+        return queryset
+    
+    def filter_by_request(self, queryset):
+        """Filtros de organización, vendedor, sucursal y método de pago de la petición"""
         if self.request.user.is_authenticated and hasattr(self.request.user, 'organization'):
             queryset = queryset.filter(organization=self.request.user.organization)
         
@@ -40,196 +112,338 @@ class SaleViewSet(viewsets.ModelViewSet):
         if branch_id:
             queryset = queryset.filter(branch_id=branch_id)
         
+        payment_method_id = self.request.query_params.get('payment_method_id')
+        if payment_method_id:
+            queryset = queryset.filter(payment_method_id=payment_method_id)
+        
         return queryset
     
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         sale = serializer.save()
         
-        # Usar SaleSerializer para la respuesta
+        # Usar SaleSerializer para la respuesta, releyendo la venta con sus
+        # relaciones para no consultar el producto de cada línea
+        sale = SaleSerializer.setup_eager_loading(Sale.objects.filter(pk=sale.pk)).get()
         response_serializer = SaleSerializer(sale)
         headers = self.get_success_headers(response_serializer.data)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
     
+    def perform_update(self, serializer):
+        with transaction.atomic(), track_sale_changes([serializer.instance.pk]):
+            serializer.save()
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic(), track_sale_changes([instance.pk]):
+            instance.delete()
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Ingesta de ventas capturadas sin conexión.
+        
+        Recibe {organization_id, sales: [...]} donde cada venta trae un `id` generado
+        por el cliente. Reenviar el mismo lote no duplica ventas: cada una se
+        reporta como accepted, duplicate o rejected.
+        """
+        from .batch import ingest_sales, ACCEPTED, DUPLICATE, REJECTED
+        
+        serializer = SaleBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = ingest_sales(
+            serializer.validated_data['organization_id'],
+            serializer.validated_data['sales']
+        )
+        
+        return Response({
+            'accepted': sum(1 for r in results if r['status'] == ACCEPTED),
+            'duplicates': sum(1 for r in results if r['status'] == DUPLICATE),
+            'rejected': sum(1 for r in results if r['status'] == REJECTED),
+            'results': results
+        })
+    
     @action(detail=False, methods=['get'])
+    @cached_analytics
     def summary(self, request):
-        """Resumen de ventas"""
-        queryset = self.get_queryset()
+        """Resumen de ventas (acepta start/end, YYYY-MM-DD)"""
+        queryset = self.get_rollup_queryset()
         
         summary = queryset.aggregate(
-            total_sales=Count('id'),
+            total_sales=Coalesce(Sum('sales_count'), 0),
             total_amount=Sum('total')
         )
         
         return Response(summary)
     
     @action(detail=False, methods=['get'])
+    @cached_analytics
     def by_seller(self, request):
-        """Ventas agrupadas por vendedor"""
-        queryset = self.get_queryset()
+        """Ventas agrupadas por vendedor (acepta start/end, YYYY-MM-DD)"""
+        queryset = self.get_rollup_queryset()
         
         sales_by_seller = queryset.values(
             'seller__id', 'seller__name'
         ).annotate(
-            total_sales=Count('id'),
+            total_sales=Sum('sales_count'),
             total_amount=Sum('total')
         ).order_by('-total_amount')
         
-        return Response(sales_by_seller)
+        return Response(list(sales_by_seller))
     
     @action(detail=False, methods=['get'])
+    @cached_analytics
     def by_payment_method(self, request):
-        """Ventas agrupadas por método de pago con comisiones"""
-        from decimal import Decimal
-        
-        queryset = self.get_queryset()
-        sales = queryset.select_related('payment_method')
+        """Ventas agrupadas por método de pago con comisiones (acepta start/end, YYYY-MM-DD)"""
+        queryset = self.get_rollup_queryset()
         
-        # Agrupar por método de pago
-        payment_data = {}
-        for sale in sales:
-            if not sale.payment_method:
-                continue
-                
-            method_id = str(sale.payment_method.id)
-            if method_id not in payment_data:
-                payment_data[method_id] = {
-                    'payment_method__id': method_id,
-                    'payment_method__name': sale.payment_method.name,
-                    'count': 0,
-                    'total': Decimal('0'),
-                    'commission': Decimal('0'),
-                    'commission_percentage': float(sale.payment_method.commission_percentage)
-                }
-            
-            sale_total = Decimal(str(sale.total))
-            method_commission_pct = Decimal(str(sale.payment_method.commission_percentage))
-            method_commission = sale_total * (method_commission_pct / Decimal('100'))
-            
-            payment_data[method_id]['count'] += 1
-            payment_data[method_id]['total'] += sale_total
-            payment_data[method_id]['commission'] += method_commission
-        
-        # Convertir a lista y calcular monto neto
-        result = []
-        for data in payment_data.values():
-            total = float(data['total'])
-            commission = float(data['commission'])
-            result.append({
-                'payment_method__id': data['payment_method__id'],
-                'payment_method__name': data['payment_method__name'],
-                'count': data['count'],
-                'total': total,
-                'commission': commission,
-                'commissionPercentage': data['commission_percentage'],
-                'netAmount': total - commission
-            })
-        
-        # Ordenar por total descendente
-        result.sort(key=lambda x: x['total'], reverse=True)
-        
-        return Response(result)
+        return Response(payment_method_breakdown(queryset))
     
     @action(detail=False, methods=['get'])
+    @cached_analytics
     def seller_commissions(self, request):
-        """Comisiones de vendedores con descuento de comisiones de métodos de pago"""
-        from apps.sellers.models import Seller
-        from apps.payments.models import PaymentMethod
+        """
+        Comisiones de vendedores con descuento de comisiones de métodos de pago.
+        Acepta date (un día) o start/end (YYYY-MM-DD).
+        """
         from apps.core.utils import parse_date_filter
-        from decimal import Decimal
         
-        queryset = self.get_queryset()
+        queryset = self.get_rollup_queryset()
         
         # Filtrar por fecha si se proporciona
         date_filter = request.query_params.get('date')
         if date_filter:
             date_range = parse_date_filter(date_filter)
             if date_range:
-                start_of_day, end_of_day = date_range
-                queryset = queryset.filter(created_at__gte=start_of_day, created_at__lte=end_of_day)
-        
-        # Obtener todas las ventas con sus métodos de pago
-        sales = queryset.select_related('seller', 'payment_method')
-        
-        # Agrupar por vendedor y calcular
-        seller_data = {}
-        for sale in sales:
-            seller_id = str(sale.seller.id)
-            if seller_id not in seller_data:
-                seller_data[seller_id] = {
-                    'seller': sale.seller,
-                    'total_sales': Decimal('0'),
-                    'total_payment_method_commission': Decimal('0'),
-                    'sales_by_method': {}
-                }
-            
-            sale_total = Decimal(str(sale.total))
-            seller_data[seller_id]['total_sales'] += sale_total
-            
-            # Calcular comisión del método de pago
-            if sale.payment_method:
-                method_commission_pct = Decimal(str(sale.payment_method.commission_percentage))
-                method_commission = sale_total * (method_commission_pct / Decimal('100'))
-                seller_data[seller_id]['total_payment_method_commission'] += method_commission
-        
-        # Calcular comisiones finales
-        commissions = []
-        for seller_id, data in seller_data.items():
-            seller = data['seller']
-            total_sales = float(data['total_sales'])
-            payment_method_commission = float(data['total_payment_method_commission'])
-            net_amount = total_sales - payment_method_commission
-            
-            commission_percentage = float(seller.commission_percentage)
-            commission_amount = net_amount * (commission_percentage / 100)
-            
-            commissions.append({
-                'seller_id': seller_id,
-                'seller_name': seller.name,
-                'total_sales': total_sales,
-                'payment_method_commission': payment_method_commission,
-                'net_amount': net_amount,
-                'commission_percentage': commission_percentage,
-                'commission_amount': commission_amount
-            })
+                queryset = queryset.filter(date=date_range[0].date())
         
-        return Response(commissions)
+        return Response(seller_commissions(queryset))
     
     @action(detail=False, methods=['get'])
+    @cached_analytics
+    def timeseries(self, request):
+        """
+        Serie de tiempo de ventas por hora, día, semana o mes.
+        
+        Query params: granularity (hour|day|week|month), start, end (YYYY-MM-DD)
+        además de los filtros de get_queryset (branch_id, seller_id, payment_method_id).
+        """
+        from datetime import timedelta
+        from django.conf import settings
+        from django.utils import timezone
+        from apps.core.utils import parse_date_filter
+        import pytz
+        
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in TIMESERIES_GRANULARITIES:
+            return Response(
+                {'error': f'granularity debe ser uno de: {", ".join(TIMESERIES_GRANULARITIES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Rango por defecto según la granularidad, terminando hoy
+        today = timezone.localdate()
+        default_days = {'hour': 0, 'day': 13, 'week': 7 * 11, 'month': 365}
+        start_param = request.query_params.get('start') or (
+            today - timedelta(days=default_days[granularity])
+        ).isoformat()
+        end_param = request.query_params.get('end') or today.isoformat()
+        
+        start_range = parse_date_filter(start_param)
+        end_range = parse_date_filter(end_param)
+        if not start_range or not end_range:
+            return Response(
+                {'error': 'Formato de fecha inválido, usa YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end = start_range[0], end_range[1]
+        if start > end:
+            return Response(
+                {'error': 'start debe ser anterior a end'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            series = sales_timeseries(
+                self.get_queryset(), granularity, start, end,
+                pytz.timezone(settings.TIME_ZONE)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(series)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exporta las ventas filtradas como CSV o XLSX en streaming.
+        
+        Query params: export_format (csv|xlsx), start, end (YYYY-MM-DD) además de
+        los filtros del listado. Las filas se leen con un cursor del servidor por
+        bloques, así que la memoria no crece con el número de ventas.
+        """
+        from django.http import StreamingHttpResponse
+        from django.utils import timezone
+        from apps.core.exports import stream_csv, stream_xlsx
+        
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in ('csv', 'xlsx'):
+            return Response(
+                {'error': 'export_format debe ser csv o xlsx'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_by_date_range(self.filter_queryset(self.get_queryset()))
+        
+        header = [
+            'Fecha', 'Venta', 'Sucursal', 'Vendedor', 'Cliente',
+            'Método de Pago', 'Total', 'Notas', 'Productos'
+        ]
+        
+        def rows():
+            for sale in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                yield [
+                    timezone.localtime(sale.created_at).strftime('%Y-%m-%d %H:%M:%S'),
+                    str(sale.id),
+                    sale.branch.name if sale.branch else '',
+                    sale.seller.name,
+                    sale.client.name,
+                    sale.payment_method.name,
+                    sale.total,
+                    sale.notes,
+                    ', '.join(
+                        f'{item.product.name} ({item.quantity} x {item.price})'
+                        for item in sale.items.all()
+                    )
+                ]
+        
+        timestamp = timezone.localtime().strftime('%Y-%m-%d_%H-%M')
+        if export_format == 'xlsx':
+            response = StreamingHttpResponse(
+                stream_xlsx(header, rows(), sheet_name='Ventas'),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        else:
+            response = StreamingHttpResponse(
+                stream_csv(header, rows()),
+                content_type='text/csv; charset=utf-8'
+            )
+        response['Content-Disposition'] = f'attachment; filename="ventas_{timestamp}.{export_format}"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    @cached_analytics
     def top_products(self, request):
-        """Productos más vendidos"""
-        from apps.products.models import Product
-        from django.db.models import Sum, Count
+        """
+        Productos más vendidos por importe.
+        Acepta start/end (YYYY-MM-DD), branch_id y limit (máximo 100).
+        """
+        try:
+            limit = int(request.query_params.get('limit', TOP_PRODUCTS_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_TOP_PRODUCTS_LIMIT:
+            return Response(
+                {'error': f'limit debe ser un entero entre 1 y {MAX_TOP_PRODUCTS_LIMIT}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(top_products(self.get_product_sales_queryset(), limit))
+    
+    @action(detail=False, methods=['get'])
+    @cached_analytics
+    def by_category(self, request):
+        """Ventas agrupadas por categoría de producto (acepta start/end, YYYY-MM-DD, y branch_id)"""
+        return Response(category_breakdown(self.get_product_sales_queryset()))
+    
+    @action(detail=False, methods=['get'])
+    @cached_analytics
+    def dashboard(self, request):
+        """
+        Todos los widgets del dashboard de administración en una sola respuesta:
+        resumen con comparativos hoy/ayer y semana/semana anterior, comisiones de
+        vendedores del día, ventas por método de pago, productos más vendidos y
+        ventas diarias de los últimos 14 días.
+        """
+        from datetime import timedelta
+        from django.conf import settings
+        from django.utils import timezone
+        from apps.core.utils import parse_date_filter, run_parallel
+        import pytz
         
         queryset = self.get_queryset()
+        tz = pytz.timezone(settings.TIME_ZONE)
+        today = timezone.localdate()
+        _, today_end = parse_date_filter(today.isoformat())
+        series_start, _ = parse_date_filter((today - timedelta(days=13)).isoformat())
         
-        # Obtener items de ventas agrupados por producto
-        top_products = SaleItem.objects.filter(
-            sale__in=queryset
-        ).values(
-            'product__id', 'product__name'
-        ).annotate(
-            quantity=Sum('quantity'),
-            total=Sum('subtotal')
-        ).order_by('-total')[:10]
+        products = Product.objects.filter(active=True)
+        if request.user.is_authenticated and hasattr(request.user, 'organization'):
+            products = products.filter(organization=request.user.organization)
+        org_id = request.query_params.get('organization_id')
+        if org_id:
+            products = products.filter(organization_id=org_id)
+        
+        # Los totales por día, vendedor, método de pago y producto salen de los resúmenes diarios
+        rollup = self.get_rollup_queryset()
+        product_sales = self.get_product_sales_queryset()
+        
+        # Cada widget es una consulta independiente; se ejecutan en paralelo
+        results = run_parallel({
+            'summary': lambda: sales_period_summary(rollup, today, tz),
+            'product_count': products.count,
+            'seller_commissions': lambda: seller_commissions(rollup.filter(date=today)),
+            'payment_methods': lambda: payment_method_breakdown(rollup),
+            'top_products': lambda: top_products(product_sales),
+            'daily_sales': lambda: sales_timeseries(queryset, 'day', series_start, today_end, tz),
+        })
         
-        return Response(top_products)
+        summary = results.pop('summary')
+        summary['product_count'] = results.pop('product_count')
+        
+        return Response({'summary': summary, **results})
+    
+    @action(detail=False, methods=['get'])
+    def analytics_stats(self, request):
+        """
+        Contadores de la caché de analítica y de las ejecuciones compartidas
+        de este proceso (worker), más los de la caché de datos de referencia
+        (`reference_data`) y la de códigos de producto (`product_lookup`).
+        """
+        from apps.core.reference_data import reference_data_stats
+        from apps.products.lookup import lookup_cache
+        from .cache import analytics_counters
+        
+        return Response({
+            **analytics_counters(),
+            'reference_data': reference_data_stats(),
+            'product_lookup': lookup_cache.stats(),
+        })
     
     @action(detail=False, methods=['get'])
+    @cached_analytics
     def client_stats(self, request):
-        """Estadísticas de compras por cliente"""
+        """
+        Estadísticas de compras por cliente.
+        Se leen de ClientPurchaseStats; el listado de clientes ofrece los mismos
+        campos paginados y ordenables (?ordering=-total_spent).
+        """
         from django.db.models import Count, Max
         
-        queryset = self.get_queryset()
-        
-        # Obtener estadísticas agrupadas por cliente
-        client_stats = queryset.values(
-            'client__id'
-        ).annotate(
-            purchase_count=Count('id'),
-            last_purchase=Max('created_at')
-        )
+        if any(request.query_params.get(param) for param in ('seller_id', 'branch_id', 'payment_method_id')):
+            # Las estadísticas guardadas no distinguen vendedor, sucursal ni método de pago
+            client_stats = self.get_queryset().values(
+                'client__id'
+            ).annotate(
+                purchase_count=Count('id'),
+                last_purchase=Max('created_at')
+            )
+        else:
+            client_stats = self.filter_by_request(
+                ClientPurchaseStats.objects.filter(purchase_count__gt=0)
+            ).values('client__id', 'purchase_count', 'last_purchase')
         
         # Formatear respuesta
         stats = []
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from apps.core.eager_loading import EagerLoadingMixin
 from .models import Seller
 
 
-class SellerSerializer(serializers.ModelSerializer):
+class SellerSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     organization = serializers.PrimaryKeyRelatedField(read_only=True)
     branches = serializers.ListField(
         child=serializers.UUIDField(),
@@ -12,6 +13,8 @@ class SellerSerializer(serializers.ModelSerializer):
     )
     assigned_branches = serializers.SerializerMethodField(read_only=True)
     
+    prefetch_related_fields = ('branches',)
+    
     class Meta:
         model = Seller
         fields = ['id', 'name', 'numeric_code', 'commission_percentage', 'active', 'organization', 'branches', 'assigned_branches', 'created_at', 'updated_at']
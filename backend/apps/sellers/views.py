@@ -2,11 +2,16 @@ from rest_framework import viewsets, permissions, filters, status
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import ProtectedError
+from apps.core.change_stamps import ConditionalGetMixin
+from apps.core.eager_loading import EagerLoadingViewSetMixin
+from apps.core.reference_data import get_default_branch_id
+from apps.core.sync import ChangeFeedMixin
+from apps.branches.models import Branch
 from .models import Seller
 from .serializers import SellerSerializer
 
 
-class SellerViewSet(viewsets.ModelViewSet):
+class SellerViewSet(ConditionalGetMixin, ChangeFeedMixin, EagerLoadingViewSetMixin, viewsets.ModelViewSet):
     serializer_class = SellerSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -14,6 +19,7 @@ class SellerViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'numeric_code']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    change_stamp_models = (Seller, Branch)
     
     def get_queryset(self):
         queryset = Seller.objects.all()
@@ -49,12 +55,9 @@ class SellerViewSet(viewsets.ModelViewSet):
             seller.branches.set(branches)
         else:
             # Si no se especificaron, asignar a la sucursal PRINCIPAL (default)
-            default_branch = Branch.objects.filter(
-                organization=organization,
-                code='PRINCIPAL'
-            ).first()
-            if default_branch:
-                seller.branches.add(default_branch)
+            default_branch_id = get_default_branch_id(organization.id) if organization else None
+            if default_branch_id:
+                seller.branches.add(default_branch_id)
     
     def perform_update(self, serializer):
         # Extraer branches del validated_data si existe
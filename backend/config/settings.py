@@ -135,11 +135,64 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.KeysetPagination',
     'PAGE_SIZE': 50,
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
 }
 
+# Cache
+# LocMemCache es por proceso; con varios workers usar p. ej.
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache y CACHE_LOCATION=/var/tmp/vnts_cache
+# (así lo configuran el Dockerfile y docker-compose.prod.yml; check --deploy advierte core.W001)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='vnts'),
+    }
+}
+
+# Analytics
+# Ejecutar en paralelo las consultas independientes del dashboard
+ANALYTICS_PARALLEL_QUERIES = config('ANALYTICS_PARALLEL_QUERIES', default=True, cast=bool)
+# Hilos del pool de cada worker; cada hilo mantiene una conexión abierta (CONN_MAX_AGE)
+ANALYTICS_PARALLEL_WORKERS = config('ANALYTICS_PARALLEL_WORKERS', default=3, cast=int)
+# Caché de respuestas de analítica por organización (apps.sales.cache)
+ANALYTICS_CACHE_ENABLED = config('ANALYTICS_CACHE_ENABLED', default=True, cast=bool)
+# Segundos que una respuesta se considera fresca aunque no haya escrituras
+ANALYTICS_CACHE_TTL = config('ANALYTICS_CACHE_TTL', default=300, cast=int)
+# Segundos adicionales que una respuesta vencida puede servirse mientras se recalcula
+ANALYTICS_CACHE_STALE_TTL = config('ANALYTICS_CACHE_STALE_TTL', default=600, cast=int)
+# Peticiones idénticas simultáneas del mismo proceso comparten una sola ejecución
+ANALYTICS_SINGLE_FLIGHT = config('ANALYTICS_SINGLE_FLIGHT', default=True, cast=bool)
+# También entre workers, con un advisory lock de Postgres (útil con una caché compartida)
+ANALYTICS_SINGLE_FLIGHT_ADVISORY_LOCK = config('ANALYTICS_SINGLE_FLIGHT_ADVISORY_LOCK', default=False, cast=bool)
+# Segundos que se conserva cada versión del catálogo de sucursal (apps.branches.catalog)
+BRANCH_CATALOG_CACHE_TTL = config('BRANCH_CATALOG_CACHE_TTL', default=86400, cast=int)
+# Códigos resueltos que cada worker guarda en memoria para /products/lookup/ (apps.products.lookup)
+PRODUCT_LOOKUP_CACHE_SIZE = config('PRODUCT_LOOKUP_CACHE_SIZE', default=20000, cast=int)
+# Datos de referencia por organización (apps.core.reference_data): entradas en
+# memoria de cada worker y segundos que vive cada entrada
+REFERENCE_CACHE_SIZE = config('REFERENCE_CACHE_SIZE', default=10000, cast=int)
+REFERENCE_CACHE_TTL = config('REFERENCE_CACHE_TTL', default=300, cast=int)
+
+# Búsqueda de los listados (?search=, apps.core.search)
+# 'postgres': tsvector + índices trigram; 'basic': SearchFilter de DRF (ILIKE)
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='postgres')
+
+# Idempotency-Key
+# Horas que se conserva la respuesta de una escritura para responder reintentos
+IDEMPOTENCY_KEY_TTL_HOURS = config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+
+# Sincronización por cambios (?updated_since=, apps.core.sync)
+# Días que se conservan los registros de eliminación; más atrás se responde 410
+TOMBSTONE_RETENTION_DAYS = config('TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+# Margen restado a synced_at por diferencias de reloj entre servidores de la app
+SYNC_CURSOR_MARGIN_SECONDS = config('SYNC_CURSOR_MARGIN_SECONDS', default=2, cast=int)
+# Máximo que una transacción abierta puede atrasar synced_at
+SYNC_CURSOR_MAX_LAG_SECONDS = config('SYNC_CURSOR_MAX_LAG_SECONDS', default=600, cast=int)
+# Máximo de IDs eliminados en una respuesta; con más se responde 410 (recarga completa)
+SYNC_MAX_TOMBSTONES = config('SYNC_MAX_TOMBSTONES', default=1000, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_LIFETIME', default=60, cast=int)),
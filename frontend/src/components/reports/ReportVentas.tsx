@@ -13,7 +13,9 @@ import Badge from '../ui/Badge';
 import { formatCurrency, formatDate } from '../../utils/formatters';
 import { useSalesReport } from '../../hooks/useSalesReport';
 import { DollarSign, Users, ChevronDown, ChevronUp, Download, RefreshCw, X } from 'lucide-react';
-import { exportSalesToExcel } from '../../utils/exportToExcel';
+import { useAtom } from 'jotai';
+import { userAtom } from '../../store/auth';
+import { downloadSalesExport } from '../../services/salesService';
 import ReportCard from './ReportCard';
 
 export default function ReportVentas() {
@@ -29,7 +31,9 @@ export default function ReportVentas() {
     refreshData
   } = useSalesReport();
 
+  const [user] = useAtom(userAtom);
   const [expandedSaleId, setExpandedSaleId] = useState<string | null>(null);
+  const [isExporting, setIsExporting] = useState(false);
 
   // Manejar cambios en las fechas
   const handleStartDateChange = (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -58,11 +62,22 @@ export default function ReportVentas() {
     setDateFilter({ startDate: '', endDate: '' });
   };
 
-  // Exportar a Excel
-  const handleExport = () => {
-    const timestamp = formatDate(new Date(), 'yyyy-MM-dd_HH-mm');
-    const fileName = `ventas_${timestamp}.xlsx`;
-    exportSalesToExcel(sales, fileName);
+  // Exportar a Excel todas las ventas de los filtros (no solo las cargadas);
+  // el backend genera el archivo en streaming
+  const handleExport = async () => {
+    setIsExporting(true);
+    try {
+      await downloadSalesExport(user?.organizationId, {
+        exportFormat: 'xlsx',
+        start: dateFilter.startDate || undefined,
+        end: dateFilter.endDate || undefined,
+        search: searchTerm || undefined
+      });
+    } catch (error) {
+      console.error('Error al exportar ventas:', error);
+    } finally {
+      setIsExporting(false);
+    }
   };
 
   const hasActiveFilters = searchTerm || dateFilter.startDate || dateFilter.endDate;
@@ -154,11 +169,11 @@ export default function ReportVentas() {
             onClick={handleExport}
             variant="primary"
             size="sm"
-            disabled={sales.length === 0}
+            disabled={sales.length === 0 || isExporting}
             className="flex items-center gap-2"
           >
             <Download className="h-4 w-4" />
-            Exportar a Excel
+            {isExporting ? 'Exportando...' : 'Exportar a Excel'}
           </Button>
         </div>
       </div>
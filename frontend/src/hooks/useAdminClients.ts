@@ -1,24 +1,20 @@
 import { useState, useEffect } from 'react';
 import { useAtom } from 'jotai';
 import { userAtom } from '../store/auth';
-import { getAllClients, createClient, updateClient, deleteClient } from '../services/clientService';
-import { Database } from '../types/database.types';
-import api from '../services/api';
+import { getAllClients, createClient, updateClient, deleteClient, Client } from '../services/clientService';
 
-type Client = Database['public']['Tables']['clients']['Row'];
+type SortOption = 'name' | 'purchases' | 'lastPurchase';
 
-type ClientStats = {
-  id: string;
-  purchase_count: number;
-  last_purchase: string | null;
+// El backend ordena con las estadísticas de compras guardadas por cliente
+const SORT_ORDERING: Record<SortOption, string> = {
+  name: 'name',
+  purchases: '-purchase_count',
+  lastPurchase: '-last_purchase'
 };
 
-type SortOption = 'name' | 'purchases' | 'lastPurchase';
-
 export function useAdminClients() {
   const [user] = useAtom(userAtom);
   const [clients, setClients] = useState<Client[]>([]);
-  const [clientStats, setClientStats] = useState<ClientStats[]>([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
   const [isModalOpen, setIsModalOpen] = useState(false);
@@ -30,15 +26,14 @@ export function useAdminClients() {
   useEffect(() => {
     if (user?.organizationId) {
       fetchClients();
-      fetchClientStats();
     }
-  }, [user?.organizationId]);
+  }, [user?.organizationId, sortBy]);
 
   const fetchClients = async () => {
     if (!user?.organizationId) return;
     setLoading(true);
     try {
-      const data = await getAllClients(user.organizationId);
+      const data = await getAllClients(user.organizationId, SORT_ORDERING[sortBy]);
       setClients(data || []);
     } catch (error) {
       console.error('Error al cargar clientes:', error);
@@ -48,42 +43,10 @@ export function useAdminClients() {
     }
   };
 
-  const fetchClientStats = async () => {
-    if (!user?.organizationId) return;
-    try {
-      const response = await api.get('/sales/client_stats/', {
-        params: { organization_id: user.organizationId }
-      });
-      setClientStats(response.data || []);
-    } catch (error) {
-      console.error('Error al cargar estadísticas de clientes:', error);
-    }
-  };
-
-  const filteredClients = clients
-    .filter(client =>
-      client.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      (client.reference && client.reference.toLowerCase().includes(searchTerm.toLowerCase()))
-    )
-    .sort((a, b) => {
-      const statsA = clientStats.find(cs => cs.id === a.id);
-      const statsB = clientStats.find(cs => cs.id === b.id);
-      
-      switch (sortBy) {
-        case 'name':
-          return a.name.localeCompare(b.name);
-        case 'purchases':
-          const purchasesA = statsA?.purchase_count || 0;
-          const purchasesB = statsB?.purchase_count || 0;
-          return purchasesB - purchasesA;
-        case 'lastPurchase':
-          const dateA = statsA?.last_purchase ? new Date(statsA.last_purchase).getTime() : 0;
-          const dateB = statsB?.last_purchase ? new Date(statsB.last_purchase).getTime() : 0;
-          return dateB - dateA;
-        default:
-          return 0;
-      }
-    });
+  const filteredClients = clients.filter(client =>
+    client.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
+    (client.reference && client.reference.toLowerCase().includes(searchTerm.toLowerCase()))
+  );
 
   const openClientModal = (client?: Client) => {
     setFormErrors({});
@@ -144,7 +107,6 @@ export function useAdminClients() {
         });
       }
       await fetchClients();
-      await fetchClientStats();
       closeModal();
     } catch (error) {
       console.error('Error al guardar cliente:', error);
@@ -166,8 +128,11 @@ export function useAdminClients() {
   };
 
   const getClientStats = (clientId: string) => {
-    const stats = clientStats.find(cs => cs.id === clientId);
-    return stats || { purchase_count: 0, last_purchase: null };
+    const client = clients.find(c => c.id === clientId);
+    return {
+      purchase_count: client?.purchase_count ?? 0,
+      last_purchase: client?.last_purchase ?? null
+    };
   };
 
   return {
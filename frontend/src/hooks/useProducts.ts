@@ -2,12 +2,13 @@ import { useState, useEffect } from 'react';
 import { useAtom } from 'jotai';
 import {
   productsAtom,
+  productsSyncAtom,
   loadingProductsAtom,
   searchProductsAtom,
   productCategoryFilterAtom,
   filteredProductsAtom
 } from '../store/products';
-import { getAllProducts } from '../services/productService';
+import { getProductChanges } from '../services/productService';
 import { userAtom } from '../store/auth';
 
 /**
@@ -17,7 +18,8 @@ import { userAtom } from '../store/auth';
 export function useProducts() {
   // Estados de Jotai
   const [user] = useAtom(userAtom);
-  const [, setProducts] = useAtom(productsAtom);
+  const [products, setProducts] = useAtom(productsAtom);
+  const [sync, setSync] = useAtom(productsSyncAtom);
   const [loading, setLoading] = useAtom(loadingProductsAtom);
   const [searchQuery, setSearchQuery] = useAtom(searchProductsAtom);
   const [categoryFilter, setCategoryFilter] = useAtom(productCategoryFilterAtom);
@@ -32,19 +34,45 @@ export function useProducts() {
   useEffect(() => {
     if (user?.organizationId) {
       loadProducts();
-      loadCategories();
     }
   }, [user?.organizationId]);
 
-  // Función para cargar productos
+  // Extraer categorías únicas de los productos cargados
+  useEffect(() => {
+    setCategories([...new Set(products.map((p: any) => p.category).filter(Boolean))] as string[]);
+  }, [products]);
+
+  // Función para cargar productos: completa la primera vez y después solo los cambios
   const loadProducts = async () => {
     if (!user?.organizationId) return;
+    const organizationId = user.organizationId;
+    const since = sync?.organizationId === organizationId ? sync.syncedAt : null;
     
     setLoading(true);
 
     try {
-      const data = await getAllProducts(user.organizationId, false);
-      setProducts(data);
+      let changes;
+      let incremental = Boolean(since);
+      try {
+        changes = await getProductChanges(organizationId, since);
+      } catch (error: any) {
+        // 410: el cursor es más antiguo que la retención de eliminaciones; recargar todo
+        if (!since || error?.response?.status !== 410) throw error;
+        changes = await getProductChanges(organizationId, null);
+        incremental = false;
+      }
+      const { results, deleted, synced_at } = changes;
+
+      if (incremental) {
+        const removed = new Set([...deleted, ...results.map(p => p.id)]);
+        setProducts(current => [
+          ...current.filter(p => !removed.has(p.id)),
+          ...(results as any[])
+        ].sort((a, b) => a.name.localeCompare(b.name)));
+      } else {
+        setProducts((results as any[]).sort((a, b) => a.name.localeCompare(b.name)));
+      }
+      setSync({ organizationId, syncedAt: synced_at });
     } catch (error) {
       console.error('Error al cargar productos:', error);
     } finally {
@@ -52,20 +80,6 @@ export function useProducts() {
     }
   };
 
-  // Función para cargar categorías
-  const loadCategories = async () => {
-    if (!user?.organizationId) return;
-    
-    try {
-      const data = await getAllProducts(user.organizationId);
-      // Extraer categorías únicas
-      const uniqueCategories = [...new Set(data.map((p: any) => p.category).filter(Boolean))];
-      setCategories(uniqueCategories);
-    } catch (error) {
-      console.error('Error al cargar categorías:', error);
-    }
-  };
-
   // Función para buscar productos
   const searchProducts = (query: string) => {
     setSearchQuery(query);
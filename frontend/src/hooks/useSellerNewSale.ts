@@ -2,10 +2,8 @@ import { useState, useEffect, useRef } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import { useAtom } from 'jotai';
 import { userAtom } from '../store/auth';
-import { getAllProducts } from '../services/productService';
-import { getAllPaymentMethods } from '../services/paymentMethodService';
-import { getAllBranches } from '../services/branchService';
-import { getOrCreateClient } from '../services/clientService';
+import { getAllBranches, getBranchCatalog, unpackCatalogSection } from '../services/branchService';
+import { autocompleteClients, getOrCreateClient, ClientSuggestion } from '../services/clientService';
 import { processSale } from '../services/salesService';
 import { Database } from '../types/database.types';
 
@@ -31,6 +29,8 @@ export function useSellerNewSale() {
 
   // Estado para cliente
   const [clientReference, setClientReference] = useState('');
+  const [clientSuggestions, setClientSuggestions] = useState<ClientSuggestion[]>([]);
+  const [pickedClient, setPickedClient] = useState<ClientSuggestion | null>(null);
 
   // Estado para sucursales
   const [branches, setBranches] = useState<Branch[]>([]);
@@ -56,22 +56,20 @@ export function useSellerNewSale() {
   useEffect(() => {
     if (user?.organizationId) {
       fetchBranches();
-      fetchProducts();
-      fetchPaymentMethods();
     }
     if (clientReferenceRef.current) {
       clientReferenceRef.current.focus();
     }
     // eslint-disable-next-line
-  }, [user?.organizationId]);
+  }, [user?.organizationId, user?.activeBranchId]);
 
-  // Recargar productos cuando cambie la sucursal activa
+  // Cargar el catálogo cuando se conoce la sucursal
   useEffect(() => {
-    if (user?.activeBranchId) {
-      fetchProducts();
+    if (selectedBranchId) {
+      fetchCatalog(selectedBranchId);
     }
     // eslint-disable-next-line
-  }, [user?.activeBranchId]);
+  }, [selectedBranchId]);
 
   // Organizar productos por categoría cuando se cargan
   useEffect(() => {
@@ -113,29 +111,51 @@ export function useSellerNewSale() {
     }
   };
 
-  const fetchProducts = async () => {
+  // Productos, métodos de pago y vendedores de la sucursal en una sola petición
+  const fetchCatalog = async (branchId: string) => {
     if (!user?.organizationId) return;
-    try {
-      // Filtrar productos por sucursal activa del vendedor
-      const branchId = user.activeBranchId || selectedBranchId;
-      const data = await getAllProducts(user.organizationId, true, branchId);
-      setProducts(data);
-    } catch (error) {
-      console.error('Error al cargar productos:', error);
+    const catalog = await getBranchCatalog(branchId, user.organizationId);
+    if (!catalog) return;
+
+    setProducts(unpackCatalogSection<Product>(catalog.products));
+    const methods = unpackCatalogSection<PaymentMethod>(catalog.payment_methods);
+    setPaymentMethods(methods);
+    if (methods.length > 0 && !methods.some(m => m.id === selectedPaymentMethodId)) {
+      setSelectedPaymentMethodId(methods[0].id);
     }
   };
 
-  const fetchPaymentMethods = async () => {
-    if (!user?.organizationId) return;
-    try {
-      const data = await getAllPaymentMethods(user.organizationId, true);
-      setPaymentMethods(data);
-      if (data.length > 0) {
-        setSelectedPaymentMethodId(data[0].id);
-      }
-    } catch (error) {
-      console.error('Error al cargar métodos de pago:', error);
+  const clientLabel = (client: ClientSuggestion) => client.reference || client.name;
+
+  // Sugerencias mientras se escribe la referencia (prefijo de nombre o referencia)
+  useEffect(() => {
+    const term = clientReference.trim();
+    const organizationId = user?.organizationId;
+    if (!term || !organizationId || (pickedClient && clientLabel(pickedClient) === term)) {
+      setClientSuggestions([]);
+      return;
     }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const suggestions = await autocompleteClients(organizationId, term, user?.id);
+      if (!cancelled) setClientSuggestions(suggestions);
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [clientReference, user?.organizationId]);
+
+  const selectClientSuggestion = (suggestion: ClientSuggestion) => {
+    setPickedClient(suggestion);
+    setClientReference(clientLabel(suggestion));
+    setClientSuggestions([]);
+  };
+
+  // La sugerencia elegida ya trae el cliente; si no, se consulta o crea en el servidor
+  const resolveClient = async (name: string, organizationId: string) => {
+    if (pickedClient && clientLabel(pickedClient) === name) return pickedClient;
+    return getOrCreateClient(name, organizationId);
   };
 
   const selectProduct = (product: Product) => {
@@ -175,7 +195,7 @@ export function useSellerNewSale() {
     try {
       if (!user?.organizationId) throw new Error('Error de configuración: Organización no identificada');
 
-      const client = await getOrCreateClient(clientReference.trim(), user.organizationId);
+      const client = await resolveClient(clientReference.trim(), user.organizationId);
       if (!client) throw new Error('Error al obtener o crear el cliente');
       if (!user?.id) throw new Error('El vendedor no está autenticado.');
       if (!selectedProduct) throw new Error('No hay producto seleccionado.');
@@ -232,6 +252,8 @@ export function useSellerNewSale() {
     setIsSuccess(false);
     setSelectedProduct(null);
     setClientReference('');
+    setPickedClient(null);
+    setClientSuggestions([]);
     setNotes('');
     if (clientReferenceRef.current) {
       clientReferenceRef.current.focus();
@@ -254,6 +276,8 @@ export function useSellerNewSale() {
     clientReference,
     setClientReference,
     clientReferenceRef,
+    clientSuggestions,
+    selectClientSuggestion,
     branches,
     selectedBranchId,
     setSelectedBranchId,
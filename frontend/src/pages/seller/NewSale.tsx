@@ -17,6 +17,8 @@ export default function NewSale() {
     clientReference,
     setClientReference,
     clientReferenceRef,
+    clientSuggestions,
+    selectClientSuggestion,
     branches,
     selectedBranchId,
     setSelectedBranchId,
@@ -160,6 +162,25 @@ export default function NewSale() {
               error={errors.clientReference}
               icon={<UserIcon className="h-5 w-5 text-gray-400" />}
             />
+            {clientSuggestions.length > 0 && (
+              <ul className="mt-1 bg-white shadow-md rounded-md border border-gray-200 divide-y divide-gray-200 max-h-64 overflow-y-auto">
+                {clientSuggestions.map(suggestion => (
+                  <li key={suggestion.id}>
+                    <button
+                      type="button"
+                      onClick={() => selectClientSuggestion(suggestion)}
+                      className="w-full flex justify-between px-4 py-2 text-left hover:bg-gray-50"
+                    >
+                      <span className="font-medium text-gray-900">{suggestion.name}</span>
+                      <span className="text-sm text-gray-500">
+                        {suggestion.reference}
+                        {suggestion.seller_purchases > 0 && ` · ${suggestion.seller_purchases} compras`}
+                      </span>
+                    </button>
+                  </li>
+                ))}
+              </ul>
+            )}
           </div>
 
           {/* Sucursal - Solo mostrar si hay más de una opción */}
@@ -76,3 +76,35 @@ export const getBranchProducts = async (branchId: string): Promise<any[]> => {
     return [];
   }
 };
+
+// Sección del catálogo en columnas: cada fila sigue el orden de `fields`
+export interface CatalogSection {
+  fields: string[];
+  rows: any[][];
+}
+
+export interface BranchCatalog {
+  version: string;
+  branch: { id: string; name: string; code: string };
+  products: CatalogSection;
+  payment_methods: CatalogSection;
+  sellers: CatalogSection;
+}
+
+export const unpackCatalogSection = <T>(section: CatalogSection): T[] =>
+  section.rows.map(row =>
+    Object.fromEntries(section.fields.map((field, index) => [field, row[index]])) as T
+  );
+
+// Todo lo que necesita el punto de venta de la sucursal en una sola petición
+export const getBranchCatalog = async (branchId: string, organizationId: string): Promise<BranchCatalog | null> => {
+  try {
+    const response = await api.get(`/branches/${branchId}/catalog/`, {
+      params: { organization_id: organizationId }
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error al obtener catálogo de sucursal:', error);
+    return null;
+  }
+};
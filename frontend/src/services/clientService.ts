@@ -5,13 +5,28 @@ export interface Client {
   name: string;
   reference: string;
   organization: string;
+  purchase_count?: number;
+  total_spent?: number;
+  average_ticket?: number;
+  last_purchase?: string | null;
   created_at: string;
   updated_at: string;
 }
 
-export const getAllClients = async (organizationId?: string) => {
+// Sugerencia de /clients/autocomplete/: los clientes frecuentes del vendedor van primero
+export interface ClientSuggestion {
+  id: string;
+  name: string;
+  reference: string;
+  seller_purchases: number;
+  seller_last_purchase: string | null;
+  score: number;
+}
+
+export const getAllClients = async (organizationId?: string, ordering?: string) => {
   const params: any = {};
   if (organizationId) params.organization_id = organizationId;
+  if (ordering) params.ordering = ordering;
   
   const response = await api.get('/clients/', { params });
   return response.data.results || response.data;
@@ -81,3 +96,20 @@ export const getOrCreateClient = async (name: string, organizationId: string): P
     return null;
   }
 };
+
+export const autocompleteClients = async (
+  organizationId: string,
+  query: string,
+  sellerId?: string,
+  limit: number = 8
+): Promise<ClientSuggestion[]> => {
+  try {
+    const params: any = { organization_id: organizationId, q: query, limit };
+    if (sellerId) params.seller_id = sellerId;
+    const response = await api.get('/clients/autocomplete/', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error al buscar clientes:', error);
+    return [];
+  }
+};
@@ -1,153 +1,60 @@
 import api from './api';
-import { getAllSales, getSalesSummary } from './salesService';
-import { getAllProducts } from './productService';
-import { getTodayForAPI } from '../utils/dateUtils';
 
 export const getDashboardData = async (organizationId: string, branchId?: string) => {
   try {
-    // Obtener resumen de ventas
-    const salesSummary = await getSalesSummary(organizationId, branchId);
-    
-    // Obtener todas las ventas para análisis
-    const allSales = await getAllSales(organizationId, branchId);
-    
-    // Obtener productos
-    const products = await getAllProducts(organizationId, true);
-    
-    // Calcular ventas diarias y semanales
-    const now = new Date();
-    const today = new Date(now.getFullYear(), now.getMonth(), now.getDate());
-    const yesterday = new Date(today);
-    yesterday.setDate(yesterday.getDate() - 1);
-    
-    const lastWeek = new Date(today);
-    lastWeek.setDate(lastWeek.getDate() - 7);
-    
-    const prevWeek = new Date(lastWeek);
-    prevWeek.setDate(prevWeek.getDate() - 7);
-    
-    // Filtrar ventas por período
-    const todaySales = allSales.filter((sale: any) =>
-      new Date(sale.created_at) >= today
-    );
-    
-    const yesterdaySales = allSales.filter((sale: any) =>
-      new Date(sale.created_at) >= yesterday && new Date(sale.created_at) < today
-    );
-    
-    const weeklySales = allSales.filter((sale: any) =>
-      new Date(sale.created_at) >= lastWeek
-    );
-    
-    const prevWeeklySales = allSales.filter((sale: any) =>
-      new Date(sale.created_at) >= prevWeek && new Date(sale.created_at) < lastWeek
-    );
-    
-    // Calcular totales
-    const totalSalesAmount = salesSummary.total_amount || 0;
-    const dailySalesAmount = todaySales.reduce((sum: number, sale: any) => sum + parseFloat(sale.total), 0);
-    const yesterdaySalesAmount = yesterdaySales.reduce((sum: number, sale: any) => sum + parseFloat(sale.total), 0);
-    const weeklySalesAmount = weeklySales.reduce((sum: number, sale: any) => sum + parseFloat(sale.total), 0);
-    const prevWeeklySalesAmount = prevWeeklySales.reduce((sum: number, sale: any) => sum + parseFloat(sale.total), 0);
+    // Todos los widgets del dashboard en una sola petición
+    const response = await api.get('/sales/dashboard/', {
+      params: {
+        organization_id: organizationId,
+        ...(branchId && { branch_id: branchId })
+      }
+    });
+    const data = response.data;
+    const { periods } = data.summary;
     
     // Calcular cambios porcentuales
-    const dailyChange = yesterdaySalesAmount === 0
-      ? { value: 100, isPositive: true }
-      : {
-          value: Math.round((dailySalesAmount - yesterdaySalesAmount) / yesterdaySalesAmount * 100 * 10) / 10,
-          isPositive: dailySalesAmount >= yesterdaySalesAmount
-        };
-    
-    const weeklyChange = prevWeeklySalesAmount === 0
+    const getChange = (current: number, previous: number) => previous === 0
       ? { value: 100, isPositive: true }
       : {
-          value: Math.round((weeklySalesAmount - prevWeeklySalesAmount) / prevWeeklySalesAmount * 100 * 10) / 10,
-          isPositive: weeklySalesAmount >= prevWeeklySalesAmount
+          value: Math.round((current - previous) / previous * 100 * 10) / 10,
+          isPositive: current >= previous
         };
     
-    // Obtener comisiones de vendedores del día
-    let sellerCommissions: any[] = [];
-    try {
-      const commissionsResponse = await api.get('/sales/seller_commissions/', {
-        params: { 
-          organization_id: organizationId,
-          date: getTodayForAPI()
-        }
-      });
-      sellerCommissions = commissionsResponse.data || [];
-    } catch (error) {
-      console.error('Error al obtener comisiones:', error);
-    }
-    
-    // Obtener ventas por método de pago con comisiones (calculado en backend)
-    let paymentMethodSales: any[] = [];
-    try {
-      const paymentResponse = await api.get('/sales/by_payment_method/', {
-        params: { 
-          organization_id: organizationId,
-          ...(branchId && { branch_id: branchId })
-        }
-      });
-      paymentMethodSales = paymentResponse.data || [];
-    } catch (error) {
-      console.error('Error al obtener ventas por método de pago:', error);
-    }
-    
-    // Obtener productos más vendidos
-    let topProducts: any[] = [];
-    try {
-      const productsResponse = await api.get('/sales/top_products/', {
-        params: { organization_id: organizationId }
-      });
-      topProducts = (productsResponse.data || []).map((p: any) => ({
-        id: p.product__id,
-        name: p.product__name,
-        quantity: p.quantity,
-        total: p.total
-      }));
-    } catch (error) {
-      console.error('Error al obtener productos más vendidos:', error);
-    }
+    const topProducts = (data.top_products || []).map((p: any) => ({
+      id: p.product__id,
+      name: p.product__name,
+      quantity: p.quantity,
+      total: p.total
+    }));
     
     // Top clientes (simplificado)
     const topClients: any[] = [];
     
-    // Ventas diarias últimos 14 días
-    const past14Days = Array.from({ length: 14 }, (_, i) => {
-      const date = new Date();
-      date.setDate(date.getDate() - (13 - i));
+    // Ventas diarias últimos 14 días (agrupadas en el backend)
+    const past14Days = (data.daily_sales || []).map((point: any) => {
+      const date = new Date(`${point.bucket}T00:00:00`);
       return {
         date,
-        dateStr: date.toISOString().split('T')[0],
+        dateStr: point.bucket,
         formattedDate: date.toLocaleDateString('es-MX', { day: '2-digit', month: 'short' }),
-        sales: 0
+        sales: point.total
       };
     });
     
-    // Agrupar ventas por día
-    allSales.forEach((sale: any) => {
-      const saleDate = new Date(sale.created_at).toISOString().split('T')[0];
-      const dayData = past14Days.find(d => d.dateStr === saleDate);
-      
-      if (dayData) {
-        dayData.sales += parseFloat(sale.total);
-      }
-    });
-    
     return {
       salesSummary: {
-        totalSales: totalSalesAmount,
-        dailySales: dailySalesAmount,
-        weeklySales: weeklySalesAmount,
-        productCount: products.length,
-        dailyChange,
-        weeklyChange
+        totalSales: data.summary.total_amount || 0,
+        dailySales: periods.today.total,
+        weeklySales: periods.week.total,
+        productCount: data.summary.product_count,
+        dailyChange: getChange(periods.today.total, periods.yesterday.total),
+        weeklyChange: getChange(periods.week.total, periods.previous_week.total)
       },
       topProducts,
       sellerSales: [],
-      sellerCommissions,
+      sellerCommissions: data.seller_commissions || [],
       topClients,
-      paymentMethodSales,
+      paymentMethodSales: data.payment_methods || [],
       dailySalesData: past14Days
     };
   } catch (error) {
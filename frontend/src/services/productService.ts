@@ -5,6 +5,8 @@ export interface Product {
   name: string;
   price: number;
   category: string;
+  sku: string | null;
+  barcode: string | null;
   description: string;
   active: boolean;
   organization: string;
@@ -23,6 +25,75 @@ export const getAllProducts = async (organizationId?: string, activeOnly: boolea
   return response.data.results || response.data;
 };
 
+export interface ProductChanges {
+  results: Product[];
+  deleted: string[];
+  synced_at: string;
+}
+
+// Productos creados o modificados desde `since` (todos si no se indica) y los IDs eliminados.
+// `deleted` y synced_at vienen en la primera página; synced_at es el `since` de la siguiente
+// sincronización. Con demasiadas eliminaciones el servidor responde 410 (recarga completa).
+// Las páginas van por cursor sobre (updated_at, id): un producto modificado mientras se
+// recorren vuelve a aparecer más adelante, y esa versión reemplaza a la anterior.
+export const getProductChanges = async (organizationId: string, since?: string | null): Promise<ProductChanges> => {
+  let response = await api.get('/products/', {
+    params: { organization_id: organizationId, updated_since: since || '' }
+  });
+  const byId = new Map<string, Product>();
+  const addPage = (products: Product[]) => {
+    products.forEach((product) => {
+      byId.delete(product.id);
+      byId.set(product.id, product);
+    });
+  };
+  addPage(response.data.results);
+  const deleted: string[] = response.data.deleted;
+  const synced_at: string = response.data.synced_at;
+  while (response.data.next) {
+    response = await api.get(response.data.next);
+    addPage(response.data.results);
+  }
+  return { results: Array.from(byId.values()), deleted, synced_at };
+};
+
+// Producto resuelto por /products/lookup/: `available` indica si se vende en la sucursal
+export interface ProductLookup {
+  id: string;
+  name: string;
+  sku: string | null;
+  barcode: string | null;
+  price: number;
+  category: string;
+  active: boolean;
+  available: boolean;
+}
+
+// Producto de un código escaneado (código de barras o SKU), o null si no existe
+export const lookupProduct = async (organizationId: string, branchId: string, code: string): Promise<ProductLookup | null> => {
+  try {
+    const response = await api.get('/products/lookup/', {
+      params: { organization_id: organizationId, branch_id: branchId, code }
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error al buscar código:', error);
+    return null;
+  }
+};
+
+// Varios códigos en una sola petición (captura por lotes, máximo 500)
+export const lookupProducts = async (
+  organizationId: string,
+  branchId: string,
+  codes: string[]
+): Promise<{ results: Record<string, ProductLookup>; not_found: string[] }> => {
+  const response = await api.post('/products/lookup/', { branch_id: branchId, codes }, {
+    params: { organization_id: organizationId }
+  });
+  return response.data;
+};
+
 export const getProductById = async (id: string): Promise<Product | null> => {
   try {
     const response = await api.get(`/products/${id}/`);
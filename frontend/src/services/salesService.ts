@@ -105,3 +105,77 @@ export const getSalesBySeller = async (organizationId?: string) => {
     return [];
   }
 };
+
+export type TimeseriesGranularity = 'hour' | 'day' | 'week' | 'month';
+
+export interface TimeseriesBucket {
+  bucket: string;
+  count: number;
+  total: number;
+}
+
+export const getSalesTimeseries = async (
+  organizationId?: string,
+  options: {
+    granularity?: TimeseriesGranularity;
+    start?: string;
+    end?: string;
+    branchId?: string;
+    sellerId?: string;
+    paymentMethodId?: string;
+  } = {}
+): Promise<TimeseriesBucket[]> => {
+  const params: any = {};
+  if (organizationId) params.organization_id = organizationId;
+  if (options.granularity) params.granularity = options.granularity;
+  if (options.start) params.start = options.start;
+  if (options.end) params.end = options.end;
+  if (options.branchId) params.branch_id = options.branchId;
+  if (options.sellerId) params.seller_id = options.sellerId;
+  if (options.paymentMethodId) params.payment_method_id = options.paymentMethodId;
+  
+  try {
+    const response = await api.get('/sales/timeseries/', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error al obtener serie de tiempo de ventas:', error);
+    return [];
+  }
+};
+
+export const downloadSalesExport = async (
+  organizationId?: string,
+  options: {
+    exportFormat?: 'csv' | 'xlsx';
+    start?: string;
+    end?: string;
+    branchId?: string;
+    sellerId?: string;
+    search?: string;
+  } = {}
+) => {
+  const exportFormat = options.exportFormat || 'xlsx';
+  const params: any = { export_format: exportFormat };
+  if (organizationId) params.organization_id = organizationId;
+  if (options.start) params.start = options.start;
+  if (options.end) params.end = options.end;
+  if (options.branchId) params.branch_id = options.branchId;
+  if (options.sellerId) params.seller_id = options.sellerId;
+  if (options.search) params.search = options.search;
+  
+  const response = await api.get('/sales/export/', { params, responseType: 'blob' });
+  
+  // Nombre de archivo enviado por el backend en Content-Disposition
+  const disposition = response.headers['content-disposition'] || '';
+  const match = disposition.match(/filename="(.+)"/);
+  const fileName = match ? match[1] : `ventas.${exportFormat}`;
+  
+  const url = window.URL.createObjectURL(response.data);
+  const link = document.createElement('a');
+  link.href = url;
+  link.download = fileName;
+  document.body.appendChild(link);
+  link.click();
+  link.remove();
+  window.URL.revokeObjectURL(url);
+};
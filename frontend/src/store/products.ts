@@ -4,6 +4,8 @@ import { Database } from '../types/database.types';
 export type Product = Database['public']['Tables']['products']['Row'];
 
 export const productsAtom = atom<Product[]>([]);
+// Cursor de la última sincronización de productsAtom (?updated_since=)
+export const productsSyncAtom = atom<{ organizationId: string; syncedAt: string } | null>(null);
 export const loadingProductsAtom = atom<boolean>(false);
 export const searchProductsAtom = atom<string>('');
 export const productCategoryFilterAtom = atom<string>('');